@@ -0,0 +1,738 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# imdABCDJbatch.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Batch driver of imdABCDJhardfeatures: read a manifest of jobs and
+    spread F_computeOneFile over a pool of worker processes
+
+    The manifest is a text file with one job per line, each job being a json
+    object whose keys are the arguments of F_computeOneFile, e.g.
+        {"audioFileFull": "a.wav", "xmlFile": "a.xml", "jsonFile": "a.json"}
+    Empty lines and lines starting with '#' are skipped.
+
+    numpy/scipy are only imported inside the workers, after the BLAS thread
+    count has been set, so that nbWorker x nbThread does not oversubscribe
+    the cores.
+
+    With a journal (imdABCDJjournal), an interrupted run is resumed by running
+    the same command again: completed jobs are skipped, failed jobs are retried
+    up to maxAttempt times.
+
+    Scheduling: the duration analysed by each job is read from the wav headers,
+    its peak memory and time are estimated with a linear model of the duration
+    (MODEL_d, or a model calibrated on this machine with --calibrate); the jobs
+    are started longest first, as long as the sum of the estimated memory of the
+    running jobs stays below the memory budget.
+
+    With prefetching (nbPrefetch > 0), each worker process runs an imdABCDJpipeline: reader threads
+    parse the xml and decode the audio of its next jobs while it computes the current one, and a
+    writer thread writes the results. The workers take their jobs (longest first) from a shared
+    queue; the memory budget is replaced by the memory cap of the inputs read ahead by each worker.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import signal
+import json
+import time
+import traceback
+import multiprocessing
+import multiprocessing.util
+import multiprocessing.queues
+import resource
+import Queue
+
+import imdABCDJjournal
+import imdABCDJprofile
+import imdABCDJmetrics
+
+
+# --- environment variables read by the BLAS/OpenMP runtimes when numpy is loaded
+BLAS_ENV_l = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+              'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+
+def F_setBlasThread(nbThread):
+    """
+        Set the number of threads used by BLAS in the processes started from now on
+    """
+
+    for var in BLAS_ENV_l:
+        os.environ[var] = str(nbThread)
+    return
+
+
+# --- resource model of a job: value = a + b * duration of the analysed audio (sec)
+# --- peak resident memory of the worker (MB) and wall time (sec), measured on a reference machine
+MODEL_d = {'mem_mb': [70., 28.5], 'time_sec': [0.2, 0.6]}
+
+# --- average bytes per second of the compressed formats (their duration is not in their header)
+BYTERATE_d = {'.mp3': 16000., '.flac': 100000.}
+
+# --- bytes per second of decoded audio (mono float64 at 44.1 kHz)
+AUDIO_BYTERATE = 44100. * 8
+
+# --- time (seconds) after which the job of a dead worker process is failed (its status may still be on its way)
+DEAD_GRACE_sec = 5.
+
+# --- arguments of F_computeOneFile used by F_readInput
+READ_ARG_l = ['audioFileFull', 'audioFileExtract', 'xmlFile', 'startExtract', 'stopExtract', 'sliceExtract']
+
+
+def F_audioDuration(audioFile):
+    """
+        Duration (sec) of an audio file: read from the header of a wav file, estimated from the size otherwise
+    """
+
+    ext = os.path.splitext(audioFile)[1].lower()
+    if ext == '.wav':
+        import peeaudiolight
+        header_d = peeaudiolight.F_readWavHeader(audioFile)
+        return float(header_d['nbSample']) / header_d['sr_hz']
+    return os.path.getsize(audioFile) / BYTERATE_d.get(ext, 176400.)
+
+
+def F_jobDuration(job_d):
+    """
+        Duration (sec) of the audio analysed by a job (see F_computeOneFile)
+    """
+
+    audioFile = job_d.get('audioFileFull', '')
+    if len(job_d.get('audioFileExtract', '')) and not job_d.get('sliceExtract', False):
+        audioFile = job_d['audioFileExtract']
+    try:
+        duration = F_audioDuration(audioFile)
+    except (OSError, IOError, ValueError):
+        # --- the job will fail: it costs nothing
+        return 0.
+
+    if len(job_d.get('xmlFile', '')) and job_d.get('startExtract', -1.) >= 0 and not job_d.get('sliceExtract', False):
+        stop = job_d.get('stopExtract', -1.)
+        if stop < 0:
+            stop = duration
+        duration = max(min(stop, duration) - job_d['startExtract'], 0.)
+    return duration
+
+
+def F_estimate(job_d, model_d=MODEL_d):
+    """
+        Estimated peak memory (MB) and time (sec) of a job
+    """
+
+    duration = F_jobDuration(job_d)
+    return model_d['mem_mb'][0] + model_d['mem_mb'][1] * duration, model_d['time_sec'][0] + model_d['time_sec'][1] * duration
+
+
+def F_inputSize(job_d):
+    """
+        Estimated size (bytes) of the inputs of a job read ahead by the pipeline (see imdABCDJhardfeatures.F_readInput)
+    """
+
+    if len(job_d.get('audioFileExtract', '')):
+        return 0
+    return int(F_jobDuration(job_d) * AUDIO_BYTERATE)
+
+
+def F_memoryBudget():
+    """
+        Default memory budget (MB): 80% of the physical memory
+    """
+
+    return 0.8 * os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024. * 1024.)
+
+
+def F_calibrate(job_l, modelFile):
+    """
+        Fit the resource model on the profiles of jobs run with one job per worker process (see --calibrate)
+        and write it in modelFile
+    """
+
+    import numpy as np
+
+    duration_l, mem_l, time_l = [], [], []
+    for job_d in job_l:
+        profileFile = job_d.get('jsonFile', '') + '.profile.json'
+        if len(job_d.get('jsonFile', '')) == 0 or not os.path.exists(profileFile):
+            continue
+        with open(profileFile, 'r') as fid:
+            total_d = json.load(fid)['stage_l'][-1]
+        duration_l.append(F_jobDuration(job_d))
+        mem_l.append(total_d['peak_rss_kb'] / 1024.)
+        time_l.append(total_d['wall'])
+
+    if len(set(duration_l)) < 2:
+        raise Exception("calibration needs jobs of at least two different durations")
+
+    model_d = {'mem_mb': list(np.polyfit(duration_l, mem_l, 1)[::-1]), 'time_sec': list(np.polyfit(duration_l, time_l, 1)[::-1])}
+    with open(modelFile, 'w') as fid:
+        json.dump(model_d, fid, indent=4)
+    return model_d
+
+
+def F_readManifest(manifestFile):
+    """
+        Read the list of jobs (one json object per line)
+    """
+
+    job_l = []
+    with open(manifestFile, 'r') as fid:
+        for numLine, line in enumerate(fid):
+            line = line.strip()
+            if len(line) == 0 or line.startswith('#'):
+                continue
+            job_d = json.loads(line)
+            if 'id' not in job_d:
+                job_d['id'] = '%s:%d' % (os.path.basename(manifestFile), numLine+1)
+            job_l.append(job_d)
+    return job_l
+
+
+def F_initWorker(cacheDir='', cacheSize_mb=10240, sinkType='json', sinkDir='', journalFile='', seriesDir=''):
+    """
+        Initialization of a worker process: import the extraction modules once
+        (and open the cache shared by all the workers, the result sink of this worker, the journal and the time series store)
+    """
+
+    global imdABCDJhardfeatures, imdABCDJsink, myCache, mySink, myJournal, mySeries
+    import imdABCDJhardfeatures
+    import imdABCDJcache
+    import imdABCDJsink
+    myCache = None
+    if len(cacheDir):
+        myCache = imdABCDJcache.C_cache(cacheDir, cacheSize_mb)
+    mySink = imdABCDJsink.F_createSink(sinkType, sinkDir, column_l=imdABCDJhardfeatures.HARD_FEATURE_l)
+    # --- the sink is closed (its last rows written) when the worker exits after pool.close(), or is terminated
+    multiprocessing.util.Finalize(None, mySink.M_close, exitpriority=10)
+    myJournal = None
+    if len(journalFile):
+        myJournal = imdABCDJjournal.C_journal(journalFile, do_load=False)
+        # --- a job is journaled as done once its result is on disk (a bulk sink may keep it in memory for a while)
+        mySink.F_persist = F_persist
+    mySeries = None
+    if len(seriesDir):
+        import imdABCDJseries
+        mySeries = imdABCDJseries.C_seriesStore(seriesDir)
+        multiprocessing.util.Finalize(None, mySeries.M_close, exitpriority=10)
+    signal.signal(signal.SIGTERM, F_terminateWorker)
+    return
+
+
+def F_persist(record_d, output_l, append_l):
+    """
+        Called by the sink of the worker once the result of a job is on disk: journal the job as done
+    """
+
+    record_d = dict(record_d)
+    record_d.update({'state': 'done', 'error': '', 'output_l': output_l, 'append_l': append_l})
+    myJournal.M_append(record_d)
+    return
+
+
+def F_initPoolWorker(start_q, *initArg_t):
+    """
+        Initialization of a worker process of F_computePool: start_q receives (numJob, pid) when a job starts
+    """
+
+    global startQueue
+    startQueue = start_q
+    F_initWorker(*initArg_t)
+    return
+
+
+def F_runPoolJob(numJob, arg_t):
+    """
+        Run a job of F_computePool (see F_runJob), telling the batch process which worker runs it
+    """
+
+    startQueue.put((numJob, os.getpid()))
+    return F_runJob(arg_t)
+
+
+def F_terminateWorker(signum, frame):
+    """
+        SIGTERM handler of the worker processes (pool.terminate(), kill): write the rows kept in memory by the
+        sink and the time series store before exiting
+    """
+
+    if mySink is not None:
+        mySink.M_close()
+    if mySeries is not None:
+        mySeries.M_close()
+    os._exit(128 + signum)
+
+
+def F_runJob(arg_t, input_d=None, jobSink=None):
+    """
+        Run F_computeOneFile for one job, never raise: return its status
+        input_d: inputs of the job already read (F_readJob)
+        jobSink: sink of the result (default: the sink of the worker); the job is journaled as done by the sink
+            of the worker, once the result is on disk
+    """
+
+    job_d, TMP_DIR, do_profile = arg_t
+
+    param_d = dict((key, value) for key, value in job_d.items() if key not in ['id', 'fingerprint'])
+    if input_d is not None:
+        param_d['input_d'] = input_d
+    if jobSink is None:
+        jobSink = mySink
+    profileFile = param_d.pop('profileFile', '')
+    if do_profile and len(profileFile) == 0 and len(param_d.get('jsonFile', '')):
+        profileFile = param_d['jsonFile'] + '.profile.json'
+    # --- each worker gets its own temporary folder: intermediate files are named after the audio file only
+    param_d['TMP_DIR'] = TMP_DIR + 'worker-%d/' % (os.getpid())
+    if not os.path.exists(param_d['TMP_DIR']):
+        os.makedirs(param_d['TMP_DIR'])
+
+    status_d = {'id': job_d['id'], 'status': 'ok', 'error': '', 'pid': os.getpid()}
+    record_d = None
+    if 'fingerprint' in job_d:
+        status_d['fingerprint'] = job_d['fingerprint']
+        if myJournal is not None:
+            record_d = {'fingerprint': job_d['fingerprint'], 'id': job_d['id']}
+            myJournal.M_append(dict(record_d, state='running'))
+    # --- the stages are always measured: their wall time is part of the status (see imdABCDJmetrics)
+    myProfiler = imdABCDJprofile.F_enable(dict((key, param_d.get(key, '')) for key in ['audioFileFull', 'audioFileExtract', 'jsonFile']))
+    t = time.time()
+    try:
+        myBuffer = imdABCDJsink.C_bufferSink()
+        imdABCDJhardfeatures.F_computeOneFile(myCache=myCache, mySink=myBuffer, mySeries=mySeries, **param_d)
+        myBuffer.M_flush(jobSink, record_d)
+        if len(profileFile):
+            myProfiler.M_write(profileFile)
+    except Exception:
+        status_d['status'] = 'failed'
+        status_d['error'] = traceback.format_exc()
+    finally:
+        imdABCDJprofile.F_disable()
+    status_d['time'] = time.time() - t
+
+    status_d['stage_d'] = myProfiler.M_wallByStage()
+    status_d['stage_d']['total'] = status_d['time']
+    status_d['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if myCache is not None:
+        with myCache.lock:
+            status_d['cache_d'] = dict((namespace, list(count_l)) for namespace, count_l in myCache.count_d.items())
+
+    return status_d
+
+
+def F_readJob(job_d):
+    """
+        Read the inputs of a job (run by the reader threads of the pipeline)
+    """
+
+    param_d = dict((key, job_d[key]) for key in READ_ARG_l if key in job_d)
+    return imdABCDJhardfeatures.F_readInput(myCache=myCache, **param_d)
+
+
+def F_runPipeline(job_q, status_q, TMP_DIR, do_profile, nbReader, nbPrefetch, prefetchMem_mb, initArg_t):
+    """
+        Worker process with prefetching: run the jobs of job_q (until None) through an imdABCDJpipeline
+        and put their status in status_q once their result is written
+    """
+
+    F_initWorker(*initArg_t)
+    import imdABCDJpipeline
+    import imdABCDJsink
+
+    def F_read(job_d):
+        t = time.time()
+        return F_readJob(job_d), time.time() - t
+
+    def F_compute(job_d, input_t, error):
+        # --- if the inputs could not be read, F_computeOneFile reads them again (and reports the error)
+        input_d, readTime = input_t or (None, 0.)
+        myBuffer = imdABCDJsink.C_bufferSink()
+        status_d = F_runJob((job_d, TMP_DIR, do_profile), input_d, myBuffer)
+        if input_d is not None:
+            status_d['stage_d']['read'] = readTime
+        return status_d, myBuffer
+
+    def F_write(job_d, output_t):
+        status_d, myBuffer = output_t
+        try:
+            myBuffer.M_flush(mySink)
+        except Exception:
+            status_d['status'] = 'failed'
+            status_d['error'] = traceback.format_exc()
+        status_q.put(status_d)
+
+    myPipeline = imdABCDJpipeline.C_pipeline(F_read, F_compute, F_write, F_inputSize, nbReader=nbReader, depth=nbPrefetch, memCap_byte=int(prefetchMem_mb * 1024 * 1024))
+    myPipeline.M_run(iter(job_q.get, None))
+    return
+
+
+def F_computeBatch(job_l, nbWorker=1, nbThread=1, TMP_DIR='', reportFile='', cacheDir='', cacheSize_mb=10240, do_profile=False, sinkType='json', sinkDir='',
+                   journalFile='', maxAttempt=3, memBudget_mb=0., model_d=MODEL_d, maxTaskPerChild=None, nbPrefetch=0, prefetchMem_mb=1024., nbReader=1,
+                   metricsFile='', metricsInterval=10., seriesDir=''):
+    """
+        Compute all the jobs of the list with a pool of nbWorker processes,
+        each one using nbThread BLAS threads
+        If cacheDir is given, the intermediate results are shared through an imdABCDJcache
+        If do_profile, the stage profile of each job is written next to its jsonFile (<jsonFile>.profile.json)
+        sinkType: 'json' (one file per job: jsonFile), 'ndjson' or 'columnar' (bulk files in sinkDir, see imdABCDJsink)
+        journalFile: if given, the jobs already done (in a previous run) are skipped and the failed jobs are retried
+            up to maxAttempt times (see imdABCDJjournal); the status of the skipped jobs is 'done' or 'abandoned'
+        The jobs are started longest first (model_d, see F_estimate), as long as the estimated memory of the running jobs
+        stays below memBudget_mb (default: F_memoryBudget); a job larger than the budget runs alone
+        maxTaskPerChild: number of jobs after which a worker process is replaced (None: never)
+        nbPrefetch: if > 0, each worker reads the inputs of its next nbPrefetch jobs (with nbReader threads, at most prefetchMem_mb MB)
+            while computing the current one (see F_runPipeline); the jobs are still taken longest first, memBudget_mb is not used
+        metricsFile: if given, live metrics of the run are written in this file (Prometheus text format) every metricsInterval seconds
+            (see imdABCDJmetrics)
+        seriesDir: if given, the TimbreToolbox time series of the jobs are stored in this folder (see imdABCDJseries)
+    """
+
+    F_setBlasThread(nbThread)
+
+    status_l = []
+    myJournal = None
+    if len(journalFile):
+        myJournal = imdABCDJjournal.C_journal(journalFile)
+        job_l, done_l, abandon_l = myJournal.M_resume(job_l, maxAttempt)
+        for job_d in done_l:
+            status_l.append({'id': job_d['id'], 'status': 'done', 'error': '', 'time': 0.})
+        for job_d in abandon_l:
+            status_l.append({'id': job_d['id'], 'status': 'abandoned', 'error': myJournal.state_d[job_d['fingerprint']]['record'].get('error', ''), 'time': 0.})
+        print("F_computeBatch\t%d jobs done\t%d jobs abandoned (%d attempts)\t%d jobs to run" % (len(done_l), len(abandon_l), maxAttempt, len(job_l)))
+    nbJob = len(status_l) + len(job_l)
+
+    if len(reportFile):
+        fidReport = open(reportFile, 'a')
+
+    myMetrics = None
+    if len(metricsFile):
+        myMetrics = imdABCDJmetrics.C_metrics(metricsFile, metricsInterval, nbJob)
+        duration_d = dict((job_d['id'], F_jobDuration(job_d)) for job_d in job_l)
+        for status_d in status_l:
+            myMetrics.M_jobDone(status_d)
+
+    def F_record(status_d):
+        status_l.append(status_d)
+        if myMetrics is not None:
+            myMetrics.M_jobDone(status_d, duration_d[status_d['id']])
+        print("[%d/%d] %s\t%s\t%f" % (len(status_l), nbJob, status_d['status'], status_d['id'], status_d['time']))
+        # --- the done jobs are journaled by the workers, once their result is on disk (F_persist)
+        if myJournal is not None and status_d['status'] != 'ok':
+            myJournal.M_append({'fingerprint': status_d['fingerprint'], 'id': status_d['id'], 'state': 'failed', 'pid': status_d['pid'], 'error': status_d['error']})
+        if status_d['status'] != 'ok':
+            print(status_d['error'])
+        if len(reportFile):
+            fidReport.write(json.dumps(status_d) + '\n')
+            fidReport.flush()
+
+    if memBudget_mb <= 0:
+        memBudget_mb = F_memoryBudget()
+    # --- pending_l[num] = (estimated time, estimated memory, num, job_d), longest first
+    pending_l = sorted([F_estimate(job_d, model_d)[::-1] + (num, job_d) for num, job_d in enumerate(job_l)], reverse=True)
+    initArg_t = (cacheDir, cacheSize_mb, sinkType, sinkDir, journalFile, seriesDir)
+
+    t = time.time()
+    try:
+        if nbPrefetch > 0:
+            F_computePrefetch([job_d for time_sec, mem_mb, numJob, job_d in pending_l], F_record, nbWorker, TMP_DIR, do_profile, nbReader, nbPrefetch, prefetchMem_mb, initArg_t, myMetrics)
+        else:
+            F_computePool(pending_l, F_record, nbWorker, TMP_DIR, do_profile, memBudget_mb, maxTaskPerChild, initArg_t, myMetrics)
+    finally:
+        if myMetrics is not None:
+            myMetrics.M_update(0, 0, do_force=True)
+        if len(reportFile):
+            fidReport.close()
+        if myJournal is not None:
+            myJournal.M_close()
+
+    nbFailed = len([status_d for status_d in status_l if status_d['status'] not in ['ok', 'done']])
+    print("F_computeBatch\t%d jobs\t%d failed\t%f" % (len(status_l), nbFailed, time.time() - t))
+
+    return status_l
+
+
+def F_computePool(pending_l, F_record, nbWorker, TMP_DIR, do_profile, memBudget_mb, maxTaskPerChild, initArg_t, myMetrics=None):
+    """
+        Run the jobs of pending_l (estimated time, estimated memory, num, job_d) with a pool of worker processes,
+        longest first, as long as their estimated memory stays below memBudget_mb; F_record(status_d) is called for each job
+        The job of a worker process which died (e.g. killed when out of memory) is reported as failed
+        myMetrics: optional imdABCDJmetrics.C_metrics updated while the jobs run
+    """
+
+    # --- running_d[num] = estimated memory, job_d[num] = job, pid_d[num] = worker running the job, dead_d[num] = time its worker was found dead
+    running_d = {}
+    job_d = {}
+    pid_d = {}
+    dead_d = {}
+    is_lost = False
+    status_q = Queue.Queue()
+    # --- (written without a feeder thread: a worker may be killed right after starting its job)
+    start_q = multiprocessing.queues.SimpleQueue()
+
+    pool = multiprocessing.Pool(nbWorker, initializer=F_initPoolWorker, initargs=(start_q,) + initArg_t, maxtasksperchild=maxTaskPerChild)
+    try:
+        while len(pending_l) or len(running_d):
+            # --- start the longest pending jobs which fit in the budget (smaller ones fill the remaining memory)
+            num = 0
+            while num < len(pending_l) and len(running_d) < nbWorker:
+                time_sec, mem_mb, numJob, job_d[numJob] = pending_l[num]
+                if len(running_d) and sum(running_d.values()) + mem_mb > memBudget_mb:
+                    num += 1
+                    continue
+                running_d[numJob] = mem_mb
+                pool.apply_async(F_runPoolJob, (numJob, (job_d[numJob], TMP_DIR, do_profile)), callback=lambda status_d, numJob=numJob: status_q.put((numJob, status_d)))
+                del pending_l[num]
+                if myMetrics is not None:
+                    myMetrics.M_jobStart(job_d[numJob]['id'])
+
+            if myMetrics is not None:
+                myMetrics.M_update(len(pending_l), len(running_d), [process.pid for process in multiprocessing.active_children()])
+
+            # --- the pool replaces a dead worker, but its job never returns: it is failed once its worker has been dead for DEAD_GRACE_sec
+            while not start_q.empty():
+                numJob, pid = start_q.get()
+                if numJob in running_d:
+                    pid_d[numJob] = pid
+            alive_l = [process.pid for process in multiprocessing.active_children()]
+            for numJob, pid in list(pid_d.items()):
+                if pid in alive_l:
+                    continue
+                if time.time() - dead_d.setdefault(numJob, time.time()) < DEAD_GRACE_sec:
+                    continue
+                del running_d[numJob], pid_d[numJob], dead_d[numJob]
+                is_lost = True
+                status_d = {'id': job_d[numJob]['id'], 'status': 'failed', 'error': 'worker process %d died' % pid, 'pid': pid, 'time': 0.}
+                if 'fingerprint' in job_d[numJob]:
+                    status_d['fingerprint'] = job_d[numJob]['fingerprint']
+                F_record(status_d)
+
+            # --- (a timeout keeps the main thread interruptible)
+            try:
+                numJob, status_d = status_q.get(True, 1.)
+            except Queue.Empty:
+                continue
+            if numJob not in running_d:
+                # --- status of a job already failed
+                continue
+            del running_d[numJob]
+            pid_d.pop(numJob, None)
+            dead_d.pop(numJob, None)
+            F_record(status_d)
+        if is_lost:
+            # --- the pool would wait for the results of the lost jobs forever
+            pool.terminate()
+        else:
+            pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return
+
+
+def F_computePrefetch(job_l, F_record, nbWorker, TMP_DIR, do_profile, nbReader, nbPrefetch, prefetchMem_mb, initArg_t, myMetrics=None):
+    """
+        Run the jobs of job_l (in this order) with nbWorker processes running F_runPipeline; F_record(status_d) is called for each job
+        The jobs of a worker process which died (e.g. killed when out of memory) are reported as failed
+        myMetrics: optional imdABCDJmetrics.C_metrics updated while the jobs run (the jobs read ahead are counted as in flight)
+    """
+
+    job_q = multiprocessing.Queue()
+    status_q = multiprocessing.Queue()
+    for job_d in job_l:
+        job_q.put(job_d)
+    for num in range(nbWorker):
+        job_q.put(None)
+
+    process_l = [multiprocessing.Process(target=F_runPipeline, args=(job_q, status_q, TMP_DIR, do_profile, nbReader, nbPrefetch, prefetchMem_mb, initArg_t)) for num in range(nbWorker)]
+    for process in process_l:
+        process.start()
+
+    done_d = {}
+    try:
+        while len(done_d) < len(job_l):
+            if myMetrics is not None:
+                try:
+                    # --- (the end markers of the workers are still in the queue)
+                    nbPending = max(job_q.qsize() - nbWorker, 0)
+                except NotImplementedError:
+                    nbPending = 0
+                myMetrics.M_update(nbPending, len(job_l) - len(done_d) - nbPending, [process.pid for process in process_l if process.is_alive()])
+            # --- (a timeout keeps the main thread interruptible, and detects dead workers)
+            try:
+                status_d = status_q.get(True, 1.)
+            except Queue.Empty:
+                if len([process for process in process_l if process.is_alive()]) == 0:
+                    break
+                continue
+            done_d[status_d['id']] = True
+            F_record(status_d)
+        for process in process_l:
+            process.join()
+    except KeyboardInterrupt:
+        for process in process_l:
+            process.terminate()
+        raise
+
+    for job_d in job_l:
+        if job_d['id'] not in done_d:
+            status_d = {'id': job_d['id'], 'status': 'failed', 'error': 'worker process died', 'pid': -1, 'time': 0.}
+            if 'fingerprint' in job_d:
+                status_d['fingerprint'] = job_d['fingerprint']
+            F_record(status_d)
+    return
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJbatch.py -m ./jobs.ndjson -j 8 -t ./_tmp/ -r ./report.ndjson
+    """
+
+    try:
+        opts, args = getopt.getopt(argv, "hm:j:b:t:r:c:p", ["manifest=", "jobs=", "blasthreads=", "tmpdir=", "report=", "cachedir=", "cachesize=", "profile", "sink=", "sinkdir=",
+                                                     "journal=", "maxattempt=", "membudget=", "model=", "calibrate=", "prefetch=", "prefetchmem=", "readers=", "metrics=", "metricsinterval=", "budget=", "seriesdir="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    manifestFile = ''
+    nbWorker = multiprocessing.cpu_count()
+    nbThread = 1
+    TMP_DIR = ''
+    reportFile = ''
+    cacheDir = ''
+    cacheSize_mb = 10240
+    do_profile = False
+    sinkType = 'json'
+    sinkDir = ''
+    journalFile = ''
+    maxAttempt = 3
+    memBudget_mb = 0.
+    model_d = MODEL_d
+    calibrateFile = ''
+    nbPrefetch = 0
+    prefetchMem_mb = 1024.
+    nbReader = 1
+    metricsFile = ''
+    metricsInterval = 10.
+    budget_sec = 0.
+    seriesDir = ''
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt in ("-m", "--manifest"):
+            manifestFile = arg
+        elif opt in ("-j", "--jobs"):
+            nbWorker = int(arg)
+        elif opt in ("-b", "--blasthreads"):
+            nbThread = int(arg)
+        elif opt in ("-t", "--tmpdir"):
+            TMP_DIR = arg + '/'
+        elif opt in ("-r", "--report"):
+            reportFile = arg
+        elif opt in ("-c", "--cachedir"):
+            cacheDir = arg
+        elif opt == "--cachesize":
+            cacheSize_mb = float(arg)
+        elif opt in ("-p", "--profile"):
+            do_profile = True
+        elif opt == "--sink":
+            sinkType = arg
+        elif opt == "--sinkdir":
+            sinkDir = arg
+        elif opt == "--journal":
+            journalFile = arg
+        elif opt == "--maxattempt":
+            maxAttempt = int(arg)
+        elif opt == "--membudget":
+            memBudget_mb = float(arg)
+        elif opt == "--model":
+            with open(arg, 'r') as fid:
+                model_d = json.load(fid)
+        elif opt == "--calibrate":
+            calibrateFile = arg
+        elif opt == "--prefetch":
+            nbPrefetch = int(arg)
+        elif opt == "--prefetchmem":
+            prefetchMem_mb = float(arg)
+        elif opt == "--readers":
+            nbReader = int(arg)
+        elif opt == "--metrics":
+            metricsFile = arg
+        elif opt == "--metricsinterval":
+            metricsInterval = float(arg)
+        elif opt == "--budget":
+            budget_sec = float(arg)
+        elif opt == "--seriesdir":
+            seriesDir = arg
+
+    if len(manifestFile) == 0:
+        usage()
+        sys.exit(2)
+
+    job_l = F_readManifest(manifestFile)
+    if budget_sec > 0:
+        # --- default time budget of the jobs (see imdABCDJhardfeatures.C_deadline)
+        for job_d in job_l:
+            job_d.setdefault('budget_sec', budget_sec)
+    maxTaskPerChild = None
+    if len(calibrateFile):
+        # --- one job per worker process: the peak memory of a process is the one of its job
+        do_profile = True
+        maxTaskPerChild = 1
+        nbPrefetch = 0
+    status_l = F_computeBatch(job_l, nbWorker=nbWorker, nbThread=nbThread, TMP_DIR=TMP_DIR, reportFile=reportFile, cacheDir=cacheDir, cacheSize_mb=cacheSize_mb, do_profile=do_profile, sinkType=sinkType, sinkDir=sinkDir,
+                              journalFile=journalFile, maxAttempt=maxAttempt, memBudget_mb=memBudget_mb, model_d=model_d, maxTaskPerChild=maxTaskPerChild,
+                              nbPrefetch=nbPrefetch, prefetchMem_mb=prefetchMem_mb, nbReader=nbReader, metricsFile=metricsFile, metricsInterval=metricsInterval,
+                              seriesDir=seriesDir)
+    if len(calibrateFile):
+        model_d = F_calibrate(job_l, calibrateFile)
+        print("F_calibrate\tmem_mb = %f + %f * duration\ttime_sec = %f + %f * duration" % tuple(model_d['mem_mb'] + model_d['time_sec']))
+
+    if len([status_d for status_d in status_l if status_d['status'] not in ['ok', 'done']]):
+        sys.exit(1)
+
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJbatch.py -m <manifestFile> [-j <nbWorker>] [-b <nbBlasThread>] [-t <tmpDir>] [-r <reportFile>] [-c <cacheDir>] [--cachesize <MB>] [-p] [--sink json|ndjson|columnar --sinkdir <outDir>] [--journal <journalFile> [--maxattempt <n>]]')
+    print('                 [--membudget <MB>] [--model <modelFile> | --calibrate <modelFile>] [--prefetch <nbJob> [--prefetchmem <MB>] [--readers <nbThread>]]')
+    print('                 [--metrics <metricsFile> [--metricsinterval <sec>]] [--budget <sec>] [--seriesdir <storeDir>]')
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
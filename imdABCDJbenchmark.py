@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# imdABCDJbenchmark.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Benchmark of the time and memory of the audio stages against the duration of the track
+
+    For each duration, a wav file is built (looped alto_a_gref_mf_do4_12_m=72.wav or synthetic
+    signal) and each stage is run in a fresh python process, so that its peak memory is not
+    hidden by the previous stages. For each stage are reported: wall time, CPU time, peak memory
+    increase (kB) and the scaling exponents of time and memory with the duration
+    (slope of the log-log fit: 1 = linear).
+
+    The startup time (--startup) is measured as the median wall time of fresh processes running
+    'import imdABCDJhardfeatures', 'imdABCDJhardfeatures.py -h' and, if an xml file is given (-x),
+    a one-file run on LOOP_FILE; import and -h must stay within STARTUP_BUDGET_d.
+
+    The results can be saved as baseline (-s); a later run compared to the baseline (-b) fails
+    (exit status 1) if a stage exceeds its baseline time or memory by more than the margin (-m).
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import json
+import subprocess
+
+
+# --- stages measured (name: function of the wav file, see F_runStage)
+STAGE_l = ['C_AudioAnalysis', 'M_fitzGerald', 'F_representationFft', 'F_computeDescriptorEnv', 'F_computeAllDescriptor']
+
+DURATION_l = [10., 60., 300., 600.]
+
+# --- period (sec) of the sampling of the resident memory during a stage (see F_runStage)
+RSS_PERIOD = 0.005
+
+LOOP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alto_a_gref_mf_do4_12_m=72.wav')
+
+# --- startup time budget in seconds (median over runs)
+STARTUP_BUDGET_d = {'import': 0.3, 'help': 0.4}
+
+
+def F_buildAudio(source, duration_sec, TMP_DIR, sr_hz=44100):
+    """
+        Write a mono 16-bit wav file of duration_sec seconds
+        source: 'loop' (looped LOOP_FILE) or 'synthetic' (harmonic tones + noise, changing every second)
+    """
+
+    import numpy as np
+    import scipy.io.wavfile
+
+    wavFile = os.path.join(TMP_DIR, 'benchmark-%s-%d.wav' % (source, int(duration_sec)))
+    if os.path.exists(wavFile):
+        return wavFile
+
+    nbSample = int(duration_sec * sr_hz)
+    if source == 'loop':
+        sr_hz, loop_v = scipy.io.wavfile.read(LOOP_FILE)
+        if loop_v.ndim > 1:
+            loop_v = loop_v.mean(axis=1)
+        nbSample = int(duration_sec * sr_hz)
+        data_v = np.tile(loop_v, nbSample // len(loop_v) + 1)[0:nbSample]
+    else:
+        myRandom = np.random.RandomState(0)
+        time_v = np.arange(sr_hz) / float(sr_hz)
+        data_v = np.zeros(nbSample)
+        for start in xrange(0, nbSample, sr_hz):
+            f0_hz = 110. * 2. ** (myRandom.randint(0, 36) / 12.)
+            tone_v = sum([np.sin(2*np.pi*h*f0_hz*time_v) / h for h in xrange(1, 6)])
+            stop = min(start + sr_hz, nbSample)
+            data_v[start:stop] = tone_v[0:stop-start] + 0.1 * myRandom.randn(stop-start)
+        data_v = data_v / np.max(np.abs(data_v)) * 16000.
+
+    scipy.io.wavfile.write(wavFile + '.tmp', sr_hz, data_v.astype(np.int16))
+    os.rename(wavFile + '.tmp', wavFile)
+    return wavFile
+
+
+def F_runStage(stage, wavFile):
+    """
+        Run one stage on a wav file (in the current process) and return its measures
+        The input of the stage is prepared before the measure starts
+        mem_kb: peak memory increase during the stage (None if unknown); ru_maxrss is the peak of the whole
+            process, which the preparation may have set: the resident memory is then sampled by a thread
+            while the stage runs (mem_sampled, a peak shorter than RSS_PERIOD may be missed)
+    """
+
+    import resource
+    import time
+    import threading
+    import numpy as np
+    import peeaudiolight
+    import peeTimbreToolbox
+    import imdABCDJhardfeatures
+    import imdABCDJprofile
+
+    if stage != 'C_AudioAnalysis':
+        myAudio = peeaudiolight.C_AudioAnalysis(wavFile, do_stereo2mono=True)
+        audio_v = myAudio.data_v[0,:]
+        sr_hz = myAudio.x_sr_hz
+        norm_v = audio_v / (np.max(audio_v) + peeTimbreToolbox.EPS)
+
+    rss0_kb = imdABCDJprofile.F_rssKb()
+    peak_l = [rss0_kb]
+    stopEvent = threading.Event()
+
+    def F_sample():
+        while not stopEvent.wait(RSS_PERIOD):
+            peak_l[0] = max(peak_l[0], imdABCDJprofile.F_rssKb())
+
+    sampler = threading.Thread(target=F_sample)
+    sampler.daemon = True
+    sampler.start()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    peak0_kb = usage.ru_maxrss
+    wall0, cpu0 = time.time(), usage.ru_utime + usage.ru_stime
+
+    if stage == 'C_AudioAnalysis':
+        myAudio = peeaudiolight.C_AudioAnalysis(wavFile, do_stereo2mono=True)
+    elif stage == 'M_fitzGerald':
+        imdABCDJhardfeatures.F_computeHpss(myAudio)
+    elif stage == 'F_representationFft':
+        peeTimbreToolbox.F_representationFft(norm_v, np.array([sr_hz]))
+    elif stage == 'F_computeDescriptorEnv':
+        peeTimbreToolbox.F_computeDescriptorEnv(norm_v, np.array([sr_hz]))
+    elif stage == 'F_computeAllDescriptor':
+        peeTimbreToolbox.F_computeAllDescriptor(audio_v, sr_hz, imdABCDJhardfeatures.TTB_PLAN_d)
+    else:
+        raise Exception("unknown stage %s" % stage)
+
+    record_d = imdABCDJprofile.F_record(stage, wall0, cpu0)
+    stopEvent.set()
+    sampler.join()
+    record_d['mem_sampled'] = record_d['peak_rss_kb'] <= peak0_kb
+    if not record_d['mem_sampled']:
+        # --- the peak of the process was reached during the stage
+        record_d['mem_kb'] = max(0, record_d['peak_rss_kb'] - rss0_kb)
+    elif rss0_kb >= 0:
+        record_d['mem_kb'] = max(0, max(peak_l[0], record_d['rss_kb']) - rss0_kb)
+    else:
+        # --- (no /proc to sample)
+        record_d['mem_kb'] = None
+    return record_d
+
+
+def F_measure(stage, wavFile):
+    """
+        Run one stage in a fresh python process
+    """
+
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--run', stage, wavFile], stdout=subprocess.PIPE)
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        return {'stage': stage, 'failed': True}
+    return json.loads(out.strip().split('\n')[-1])
+
+
+def F_startup(xmlFile='', TMP_DIR='/tmp/', nbRun=5):
+    """
+        Median wall time of fresh processes: import of imdABCDJhardfeatures, -h, one-file run (if xmlFile)
+    """
+
+    import time
+    import numpy as np
+
+    scriptFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'imdABCDJhardfeatures.py')
+    command_d = {'import': [sys.executable, '-c', 'import imdABCDJhardfeatures'],
+                 'help': [sys.executable, scriptFile, '-h']}
+    if len(xmlFile):
+        command_d['oneFile'] = [sys.executable, scriptFile, '-a', LOOP_FILE, '-x', xmlFile, '-o', os.path.join(TMP_DIR, 'startup.json'), '-t', TMP_DIR]
+
+    startup_d = {}
+    with open(os.devnull, 'w') as devnull:
+        for name in ['import', 'help', 'oneFile']:
+            if name not in command_d:
+                continue
+            wall_l = []
+            for numRun in xrange(nbRun):
+                t = time.time()
+                subprocess.call(command_d[name], stdout=devnull, cwd=os.path.dirname(scriptFile))
+                wall_l.append(time.time() - t)
+            startup_d[name] = float(np.median(wall_l))
+            print("startup %-16s	wall %10.3f	budget %s" % (name, startup_d[name], STARTUP_BUDGET_d.get(name, '-')))
+    return startup_d
+
+
+def F_scalingExponent(duration_l, value_l):
+    """
+        Slope of the log-log linear fit of value against duration
+    """
+
+    import numpy as np
+
+    point_l = [(d, v) for d, v in zip(duration_l, value_l) if v > 0]
+    if len(point_l) < 2:
+        return float('nan')
+    x_v = np.log(np.array([d for d, v in point_l]))
+    y_v = np.log(np.array([v for d, v in point_l]))
+    return float(np.polyfit(x_v, y_v, 1)[0])
+
+
+def F_compareBaseline(result_d, baseline_d, margin):
+    """
+        List of the (stage, duration, measure, value, baseline) exceeding the baseline by more than margin
+    """
+
+    if baseline_d.get('source') != result_d['source']:
+        raise Exception("baseline computed on '%s' audio, not on '%s'" % (baseline_d.get('source'), result_d['source']))
+
+    failure_l = []
+    for name, wall in result_d.get('startup_d', {}).items():
+        if name in baseline_d.get('startup_d', {}) and wall > baseline_d['startup_d'][name] * (1. + margin):
+            failure_l.append(('startup', name, 'wall', wall, baseline_d['startup_d'][name]))
+    for stage in result_d['stage_d']:
+        for duration, record_d in result_d['stage_d'][stage]['record_d'].items():
+            if record_d.get('failed', False):
+                failure_l.append((stage, duration, 'failed', 1, 0))
+                continue
+            try:
+                base_d = baseline_d['stage_d'][stage]['record_d'][duration]
+            except KeyError:
+                continue
+            for measure in ['wall', 'mem_kb']:
+                if record_d.get(measure) is None or base_d.get(measure) is None:
+                    continue
+                if record_d[measure] > base_d[measure] * (1. + margin):
+                    failure_l.append((stage, duration, measure, record_d[measure], base_d[measure]))
+    return failure_l
+
+
+def F_benchmark(stage_l=STAGE_l, duration_l=DURATION_l, source='loop', TMP_DIR='/tmp/'):
+    """
+        Measure all the stages for all the durations
+        result_d['stage_d'][stage] = {'record_d': {duration: measures}, 'wall_exponent', 'mem_exponent'}
+    """
+
+    if not os.path.exists(TMP_DIR):
+        os.makedirs(TMP_DIR)
+
+    result_d = {'source': source, 'stage_d': {}}
+    for stage in stage_l:
+        result_d['stage_d'][stage] = {'record_d': {}}
+
+    for duration_sec in duration_l:
+        wavFile = F_buildAudio(source, duration_sec, TMP_DIR)
+        for stage in stage_l:
+            record_d = F_measure(stage, wavFile)
+            # --- json keys are strings
+            result_d['stage_d'][stage]['record_d']['%g' % duration_sec] = record_d
+            if record_d.get('failed', False):
+                print("%-24s %8gs\tfailed" % (stage, duration_sec))
+            else:
+                mem = '%10d kB' % record_d['mem_kb'] if record_d['mem_kb'] is not None else '   unknown'
+                print("%-24s %8gs\twall %10.3f\tcpu %10.3f\tmem %s" % (stage, duration_sec, record_d['wall'], record_d['cpu'], mem))
+
+    for stage in stage_l:
+        stage_d = result_d['stage_d'][stage]
+        ok_l = [(float(d), r) for d, r in stage_d['record_d'].items() if not r.get('failed', False)]
+        stage_d['wall_exponent'] = F_scalingExponent([d for d, r in ok_l], [r['wall'] for d, r in ok_l])
+        memOk_l = [(d, r) for d, r in ok_l if r['mem_kb'] is not None]
+        stage_d['mem_exponent'] = F_scalingExponent([d for d, r in memOk_l], [r['mem_kb'] for d, r in memOk_l])
+        print("%-24s scaling exponent\twall %.2f\tmem %.2f" % (stage, stage_d['wall_exponent'], stage_d['mem_exponent']))
+
+    return result_d
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJbenchmark.py -d 10,60,600 -t ./_tmp/ -b ./benchmark-baseline.json -m 0.25
+    """
+
+    if len(argv) == 3 and argv[0] == '--run':
+        print(json.dumps(F_runStage(argv[1], argv[2])))
+        return
+
+    try:
+        opts, args = getopt.getopt(argv, "hd:g:a:t:o:s:b:m:x:", ["durations=", "stages=", "audio=", "tmpdir=", "output=", "save=", "baseline=", "margin=", "startup", "ixmlfile="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    duration_l = DURATION_l
+    stage_l = STAGE_l
+    source = 'loop'
+    TMP_DIR = '/tmp/imdABCDJbenchmark/'
+    outputFile = ''
+    saveFile = ''
+    baselineFile = ''
+    margin = 0.25
+    do_startup = False
+    xmlFile = ''
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt in ("-d", "--durations"):
+            duration_l = [float(duration) for duration in arg.split(',')]
+        elif opt in ("-g", "--stages"):
+            stage_l = arg.split(',')
+        elif opt in ("-a", "--audio"):
+            source = arg
+        elif opt in ("-t", "--tmpdir"):
+            TMP_DIR = arg + '/'
+        elif opt in ("-o", "--output"):
+            outputFile = arg
+        elif opt in ("-s", "--save"):
+            saveFile = arg
+        elif opt in ("-b", "--baseline"):
+            baselineFile = arg
+        elif opt in ("-m", "--margin"):
+            margin = float(arg)
+        elif opt == "--startup":
+            do_startup = True
+        elif opt in ("-x", "--ixmlfile"):
+            xmlFile = os.path.abspath(arg)
+
+    failure_l = []
+    if do_startup:
+        if not os.path.exists(TMP_DIR):
+            os.makedirs(TMP_DIR)
+        result_d = {'source': source, 'stage_d': {}, 'startup_d': F_startup(xmlFile, TMP_DIR)}
+        for name, budget in STARTUP_BUDGET_d.items():
+            if result_d['startup_d'][name] > budget:
+                failure_l.append(('startup', name, 'wall', result_d['startup_d'][name], budget))
+    else:
+        result_d = F_benchmark(stage_l, duration_l, source, TMP_DIR)
+
+    for filename in [outputFile, saveFile]:
+        if len(filename):
+            with open(filename, 'w') as fid:
+                json.dump(result_d, fid, indent=1)
+
+    if len(baselineFile):
+        with open(baselineFile, 'r') as fid:
+            baseline_d = json.load(fid)
+        failure_l += F_compareBaseline(result_d, baseline_d, margin)
+
+    for stage, duration, measure, value, base in failure_l:
+        print("FAILED %s %s: %s %g > %g" % (stage, duration, measure, value, base))
+    if len(failure_l):
+        sys.exit(1)
+
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJbenchmark.py [-d <durations,...>] [-g <stages,...>] [-a loop|synthetic] [-t <tmpDir>] [-o <resultFile>] [-s <baselineFileToSave>] [-b <baselineFile>] [-m <margin>]')
+    print('imdABCDJbenchmark.py --startup [-x <inputXmlFile>] [-t <tmpDir>] [-o <resultFile>] [-s <baselineFileToSave>] [-b <baselineFile>] [-m <margin>]')
+    print('stages: %s' % ','.join(STAGE_l))
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJcache.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Content-addressed cache for the intermediate results of imdABCDJhardfeatures
+
+    An entry is identified by the hash of the content of its source file (audio or xml),
+    the analysis parameters and the version of the code that produced it.
+    Entries are grouped in namespaces:
+    - audio-derived: 'audio' (decoded signal), 'ttb' (TimbreToolbox time series), 'hpss' (HPSS ratios),
+      'frame' (frame-level HPSS and TimbreToolbox results of a full track, sliced for its excerpts)
+    - xml-derived: 'xml' (parsed imdABCDJ description)
+    The total size of the cache is bounded; the least recently used entries are evicted first.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import hashlib
+import json
+import shutil
+import threading
+import cPickle as pickle
+
+
+# --- version of the code producing each namespace: increase it to invalidate the corresponding entries
+CACHE_VERSION_d = {'audio': 2, 'ttb': 1, 'hpss': 1, 'xml': 1, 'frame': 1}
+
+# --- namespaces that can be invalidated together
+CACHE_GROUP_d = {'audio': ['audio', 'ttb', 'hpss', 'frame'], 'xml': ['xml']}
+
+
+def F_hashFile(filename, blockSize=1<<20):
+    """
+        Hash of the content of a file (sha1, hexadecimal)
+    """
+
+    h = hashlib.sha1()
+    with open(filename, 'rb') as fid:
+        while True:
+            block = fid.read(blockSize)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def F_key(namespace, contentHash, param_d={}):
+    """
+        Key of an entry: hash of the namespace, its code version, the source content and the parameters
+    """
+
+    desc = json.dumps([namespace, CACHE_VERSION_d[namespace], contentHash, param_d], sort_keys=True)
+    return hashlib.sha1(desc.encode('utf-8')).hexdigest()
+
+
+class C_cache:
+    """
+        class definition for the on-disk cache
+    """
+
+    cacheDir = ''
+    maxSize_byte = 0
+    size_byte = 0
+    nbHit = 0
+    nbMiss = 0
+    count_d = {}
+    lock = None
+
+    def __init__(self, cacheDir, maxSize_mb=10240):
+        self.cacheDir = cacheDir
+        self.maxSize_byte = int(maxSize_mb * 1024 * 1024)
+        self.nbHit = 0
+        self.nbMiss = 0
+        # --- count_d[namespace] = [nbHit, nbMiss]
+        self.count_d = {}
+        # --- the counters and the size are shared by the threads of the process (F_extract from a pool of threads)
+        self.lock = threading.Lock()
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+        self.size_byte = sum([size for path, mtime, size in self.M_listEntry()])
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_key(self, namespace, contentHash, param_d={}):
+        return F_key(namespace, contentHash, param_d)
+
+
+    def M_path(self, namespace, key):
+        return os.path.join(self.cacheDir, namespace, key[0:2], key + '.pickle')
+
+
+    def M_get(self, namespace, key):
+        """
+            Return the cached object or None (a hit refreshes the entry for the LRU eviction)
+        """
+
+        path = self.M_path(namespace, key)
+        try:
+            with open(path, 'rb') as fid:
+                obj = pickle.load(fid)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            with self.lock:
+                self.nbMiss += 1
+                self.count_d.setdefault(namespace, [0, 0])[1] += 1
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self.lock:
+            self.nbHit += 1
+            self.count_d.setdefault(namespace, [0, 0])[0] += 1
+        return obj
+
+
+    def M_put(self, namespace, key, obj):
+        """
+            Store an object (written to a temporary file then renamed, so readers never see partial entries)
+        """
+
+        path = self.M_path(namespace, key)
+        if not os.path.exists(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError:
+                pass
+        # --- several processes (and the threads of a process) may store the same entry
+        tmpPath = '%s.%d-%d.tmp' % (path, os.getpid(), threading.current_thread().ident)
+        with open(tmpPath, 'wb') as fid:
+            pickle.dump(obj, fid, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmpPath, path)
+
+        with self.lock:
+            self.size_byte += os.path.getsize(path)
+            if self.size_byte > self.maxSize_byte:
+                self.M_evict()
+        return
+
+
+    def M_listEntry(self):
+        """
+            List the entries as (path, last use, size)
+        """
+
+        entry_l = []
+        for root, dir_l, file_l in os.walk(self.cacheDir):
+            for name in file_l:
+                if name.endswith('.pickle'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entry_l.append((path, stat.st_mtime, stat.st_size))
+        return entry_l
+
+
+    def M_evict(self):
+        """
+            Remove the least recently used entries until the cache is under its size cap
+            (the cache may be shared by several processes: the size is re-measured on disk)
+        """
+
+        entry_l = sorted(self.M_listEntry(), key=lambda entry: entry[1])
+        self.size_byte = sum([size for path, mtime, size in entry_l])
+        for path, mtime, size in entry_l:
+            if self.size_byte <= self.maxSize_byte:
+                break
+            try:
+                os.remove(path)
+                self.size_byte -= size
+            except OSError:
+                pass
+        return
+
+
+    def M_invalidate(self, group):
+        """
+            Remove all the entries of a group of namespaces ('audio' or 'xml')
+        """
+
+        for namespace in CACHE_GROUP_d[group]:
+            shutil.rmtree(os.path.join(self.cacheDir, namespace), ignore_errors=True)
+        with self.lock:
+            self.size_byte = sum([size for path, mtime, size in self.M_listEntry()])
+        return
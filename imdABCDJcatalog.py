@@ -0,0 +1,658 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJcatalog.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Catalog of the features of many tracks (feature matrix) and nearest-neighbour index for similarity queries
+
+    catalogDir/catalog.json     {'column_l', 'nbRow', 'rowByte', 'count_l', 'sum_l', 'sumSq_l'}
+    catalogDir/feature.f32      feature matrix (nbRow, nbColumn) float32, memory-mapped (NaN: missing feature)
+    catalogDir/row.ndjson       non-numeric values of each row (filepath), one line per row
+    catalogDir/row.i64          offset of each line of row.ndjson
+    catalogDir/index-<name>/    C_index
+
+    The rows are only appended (C_catalog.M_append, from the results of F_extract or from the outputs of
+    imdABCDJhardfeatures: json files, NDJSON shards, columnar folders); catalog.json is rewritten last
+    (temporary file then rename), so that an interrupted append leaves the catalog as it was.
+    The columns are normalized (z-score) with the mean and standard deviation of all the rows, updated
+    incrementally from the count, sum and sum of squares of each column (missing values excluded).
+
+    C_index is an IVF (inverted file) index over a subset of the columns, each one weighted: the normalized and
+    weighted vectors are clustered by k-means into nlist lists and stored list by list (memory-mapped);
+    a query only scans the nprobe lists with the nearest centroids. The rows appended after the index was built
+    are scanned exhaustively until it is built again.
+    There is a single writer (append, build); any number of processes can query.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import json
+import time
+import shutil
+import fnmatch
+import numpy as np
+
+import imdABCDJsink
+
+
+# --- number of rows of the matrix processed at once
+CHUNK_ROW = 65536
+
+# --- number of distances computed at once by F_assign
+CHUNK_ELEM = 1 << 24
+
+# --- k-means of C_index: default number of lists sqrt(nbRow) (at most NLIST_MAX), trained on SAMPLE_PER_LIST rows per list
+NLIST_MAX = 4096
+SAMPLE_PER_LIST = 64
+
+
+# --- types of the numeric features (bool excluded; F_extract returns numpy scalars for some of them)
+NUMBER_TYPE_s = set([int, long, float, np.float64, np.float32, np.int64, np.int32])
+
+
+def F_isNumber(value):
+    return type(value) in NUMBER_TYPE_s
+
+
+def F_value(value):
+    """
+        Value of a feature in the matrix (NaN: missing, e.g. degraded by a time budget)
+    """
+
+    if type(value) in NUMBER_TYPE_s:
+        return float(value)
+    return np.nan
+
+
+# --- files of a folder which are outputs of imdABCDJhardfeatures: json files (but the profiles of imdABCDJbatch) and NDJSON shards
+#     of imdABCDJsink.C_ndjsonSink (not the manifests, journals, reports or time series indexes which may share the folder)
+RESULT_PATTERN_l = ['*.json', 'features-*.ndjson']
+NOT_RESULT_PATTERN_l = ['*.profile.json']
+
+
+def F_readResult(path):
+    """
+        Results (dict) of an output of imdABCDJhardfeatures: json file, NDJSON shard (imdABCDJsink.C_ndjsonSink),
+        folder of columnar chunks (imdABCDJsink.C_columnarSink) or folder of json files and NDJSON shards
+        (RESULT_PATTERN_l; the records of a folder without filepath are not results and are skipped)
+    """
+
+    if os.path.isdir(path):
+        data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(path)
+        if len(row_l):
+            for num in range(data_m.shape[0]):
+                result_d = dict(row_l[num])
+                result_d.update(zip(column_l, [float(value) for value in data_m[num, :]]))
+                yield result_d
+            return
+        for name in sorted(os.listdir(path)):
+            if not any(fnmatch.fnmatch(name, pattern) for pattern in RESULT_PATTERN_l) or any(fnmatch.fnmatch(name, pattern) for pattern in NOT_RESULT_PATTERN_l):
+                continue
+            for result_d in F_readResult(os.path.join(path, name)):
+                if isinstance(result_d, dict) and 'filepath' in result_d:
+                    yield result_d
+
+    elif path.endswith('.ndjson'):
+        with open(path, 'r') as fid:
+            for line in fid:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # --- line truncated by a crash
+                    continue
+
+    else:
+        with open(path, 'r') as fid:
+            yield json.load(fid)
+    return
+
+
+def F_truncate(fileName, size):
+    """
+        Remove what an interrupted append wrote after the first size bytes of fileName
+    """
+
+    if os.path.exists(fileName) and os.path.getsize(fileName) > size:
+        with open(fileName, 'r+b') as fid:
+            fid.truncate(size)
+    return
+
+
+class C_catalog:
+    """
+        class definition for the feature matrix of a catalog
+        column_l: columns of a new catalog (default: the numeric (or None) keys of the first result appended)
+    """
+
+    catalogDir = ''
+    column_l = []
+    nbRow = 0
+    rowByte = 0
+    count_v = None
+    sum_v = None
+    sumSq_v = None
+    row_d = None
+
+    def __init__(self, catalogDir, column_l=[]):
+        self.catalogDir = catalogDir
+        self.column_l = list(column_l)
+        self.nbRow = 0
+        # --- size of the complete lines of row.ndjson
+        self.rowByte = 0
+        self.count_v = np.zeros(len(self.column_l))
+        self.sum_v = np.zeros(len(self.column_l))
+        self.sumSq_v = np.zeros(len(self.column_l))
+        # --- row_d[filepath] = row (read on demand)
+        self.row_d = None
+        if os.path.exists(self.M_path('catalog.json')):
+            with open(self.M_path('catalog.json'), 'r') as fid:
+                catalog_d = json.load(fid)
+            self.column_l = catalog_d['column_l']
+            self.nbRow = catalog_d['nbRow']
+            self.rowByte = catalog_d['rowByte']
+            self.count_v = np.array(catalog_d['count_l'], dtype=np.float64)
+            self.sum_v = np.array(catalog_d['sum_l'], dtype=np.float64)
+            self.sumSq_v = np.array(catalog_d['sumSq_l'], dtype=np.float64)
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_path(self, name):
+        return os.path.join(self.catalogDir, name)
+
+
+    def M_save(self):
+        catalog_d = {'column_l': self.column_l, 'nbRow': self.nbRow, 'rowByte': self.rowByte,
+                     'count_l': self.count_v.tolist(), 'sum_l': self.sum_v.tolist(), 'sumSq_l': self.sumSq_v.tolist()}
+        with open(self.M_path('catalog.json.tmp'), 'w') as fid:
+            json.dump(catalog_d, fid)
+        os.rename(self.M_path('catalog.json.tmp'), self.M_path('catalog.json'))
+        return
+
+
+    def M_append(self, result_it):
+        """
+            Append results (dict: F_extract, F_readResult) to the catalog; a result whose filepath is already in the catalog is skipped
+            Return the number of rows appended
+        """
+
+        if not os.path.exists(self.catalogDir):
+            os.makedirs(self.catalogDir)
+        row_d = self.M_rowDict()
+        F_truncate(self.M_path('feature.f32'), self.nbRow * len(self.column_l) * 4)
+        F_truncate(self.M_path('row.ndjson'), self.rowByte)
+        F_truncate(self.M_path('row.i64'), self.nbRow * 8)
+
+        nbAppend = 0
+        value_l, line_l, offset_l = [], [], []
+        with open(self.M_path('feature.f32'), 'ab') as featureFid, open(self.M_path('row.ndjson'), 'ab') as rowFid, open(self.M_path('row.i64'), 'ab') as offsetFid:
+            for result_d in result_it:
+                if len(self.column_l) == 0:
+                    # --- a feature of the first result may be missing (None)
+                    self.column_l = [key for key, value in result_d.items() if F_isNumber(value) or value is None]
+                    self.count_v, self.sum_v, self.sumSq_v = np.zeros(len(self.column_l)), np.zeros(len(self.column_l)), np.zeros(len(self.column_l))
+                filepath = result_d.get('filepath', '')
+                if len(filepath) and filepath in row_d:
+                    continue
+
+                value_l.append([result_d.get(key) for key in self.column_l])
+                line = json.dumps(dict((key, value) for key, value in result_d.items() if type(value) not in NUMBER_TYPE_s and value is not None)) + '\n'
+                line_l.append(line)
+                offset_l.append(self.rowByte)
+                if len(filepath):
+                    row_d[filepath] = self.nbRow
+                self.nbRow += 1
+                self.rowByte += len(line)
+                nbAppend += 1
+
+                if len(value_l) == CHUNK_ROW:
+                    # --- checkpoint: the rows appended so far survive an interruption
+                    self.M_write(value_l, line_l, offset_l, featureFid, rowFid, offsetFid)
+                    value_l, line_l, offset_l = [], [], []
+                    self.M_save()
+            self.M_write(value_l, line_l, offset_l, featureFid, rowFid, offsetFid)
+
+        if len(self.column_l):
+            self.M_save()
+        return nbAppend
+
+
+    def M_write(self, value_l, line_l, offset_l, featureFid, rowFid, offsetFid):
+        """
+            Write rows and update the statistics of the columns
+        """
+
+        if len(value_l) == 0:
+            return
+        # --- non-numeric values (None, strings) are missing
+        value_m = np.array([[value if type(value) in NUMBER_TYPE_s else np.nan for value in row_l] for row_l in value_l], dtype=np.float64)
+        valid_m = ~np.isnan(value_m)
+        value_m[~valid_m] = 0.
+        self.count_v += np.sum(valid_m, axis=0)
+        self.sum_v += np.sum(value_m, axis=0)
+        self.sumSq_v += np.sum(value_m**2, axis=0)
+        value_m[~valid_m] = np.nan
+        featureFid.write(value_m.astype(np.float32).tostring())
+        rowFid.write(''.join(line_l))
+        offsetFid.write(np.array(offset_l, dtype=np.int64).tostring())
+        for fid in [featureFid, rowFid, offsetFid]:
+            fid.flush()
+        return
+
+
+    def M_matrix(self):
+        """
+            Feature matrix (nbRow, nbColumn), memory-mapped
+        """
+
+        if self.nbRow == 0:
+            return np.zeros((0, len(self.column_l)), dtype=np.float32)
+        return np.memmap(self.M_path('feature.f32'), dtype=np.float32, mode='r', shape=(self.nbRow, len(self.column_l)))
+
+
+    def M_mean(self):
+        return self.sum_v / np.maximum(self.count_v, 1)
+
+
+    def M_std(self):
+        mean_v = self.M_mean()
+        std_v = np.sqrt(np.maximum(self.sumSq_v / np.maximum(self.count_v, 1) - mean_v**2, 0.))
+        # --- constant columns are left unscaled
+        std_v[std_v < 1e-12] = 1.
+        return std_v
+
+
+    def M_normalize(self, data_m):
+        """
+            Normalized rows of the feature matrix (missing values: 0, the mean)
+        """
+
+        norm_m = (np.asarray(data_m, dtype=np.float64) - self.M_mean()) / self.M_std()
+        norm_m[np.isnan(norm_m)] = 0.
+        return norm_m
+
+
+    def M_vector(self, result_d):
+        """
+            Row of the feature matrix of a result (dict)
+        """
+
+        return np.array([F_value(result_d.get(key)) for key in self.column_l], dtype=np.float32)
+
+
+    def M_rowDict(self):
+        if self.row_d is None:
+            self.row_d = {}
+            if self.nbRow > 0:
+                with open(self.M_path('row.ndjson'), 'r') as fid:
+                    for num in range(self.nbRow):
+                        filepath = json.loads(fid.readline()).get('filepath', '')
+                        if len(filepath):
+                            self.row_d[filepath] = num
+        return self.row_d
+
+
+    def M_find(self, filepath):
+        """
+            Row of a track (-1 if it is not in the catalog)
+        """
+
+        return self.M_rowDict().get(filepath, -1)
+
+
+    def M_row(self, num):
+        """
+            Non-numeric values (filepath) of a row
+        """
+
+        offset_v = np.memmap(self.M_path('row.i64'), dtype=np.int64, mode='r', shape=(self.nbRow,))
+        with open(self.M_path('row.ndjson'), 'r') as fid:
+            fid.seek(int(offset_v[num]))
+            return json.loads(fid.readline())
+
+
+def F_assign(data_m, centroid_m):
+    """
+        Nearest centroid of each row of data_m
+    """
+
+    norm_v = np.sum(centroid_m**2, axis=1)
+    label_v = np.zeros(data_m.shape[0], dtype=np.int32)
+    step = max(CHUNK_ELEM // max(centroid_m.shape[0], 1), 1)
+    for start in range(0, data_m.shape[0], step):
+        # --- |x-c|^2 = |x|^2 - 2 x.c + |c|^2, |x|^2 does not change the nearest centroid
+        dist_m = norm_v[np.newaxis, :] - 2. * np.dot(data_m[start:start+step], centroid_m.T)
+        label_v[start:start+step] = np.argmin(dist_m, axis=1)
+    return label_v
+
+
+def F_kmeans(data_m, nbCluster, nbIter=10, random=np.random):
+    """
+        k-means (Lloyd) of the rows of data_m; an empty cluster is given a random row
+    """
+
+    centroid_m = data_m[random.choice(data_m.shape[0], nbCluster, replace=False)].astype(np.float64)
+    for num in range(nbIter):
+        label_v = F_assign(data_m, centroid_m)
+        count_v = np.bincount(label_v, minlength=nbCluster)
+        for dim in range(data_m.shape[1]):
+            centroid_m[:, dim] = np.bincount(label_v, weights=data_m[:, dim], minlength=nbCluster) / np.maximum(count_v, 1)
+        empty_v = np.where(count_v == 0)[0]
+        if len(empty_v):
+            centroid_m[empty_v] = data_m[random.choice(data_m.shape[0], len(empty_v), replace=False)]
+    return centroid_m
+
+
+class C_index:
+    """
+        class definition for the IVF nearest-neighbour index of a catalog
+        catalogDir/index-<name>/index.json      {'name', 'column_l', 'weight_l', 'mean_l', 'std_l', 'nbRow', 'nlist', 'time'}
+        catalogDir/index-<name>/centroid.npy    (nlist, nbDim)
+        catalogDir/index-<name>/offset.npy      (nlist+1): the rows of the list num are [offset_v[num], offset_v[num+1][
+        catalogDir/index-<name>/vector.npy      (nbRow, nbDim) float32 normalized and weighted vectors, list by list
+        catalogDir/index-<name>/row.npy         (nbRow) row of the catalog of each vector
+    """
+
+    myCatalog = None
+    name = ''
+    indexDir = ''
+    index_d = {}
+    column_v = None
+    mean_v = None
+    scale_v = None
+    centroid_m = None
+    offset_v = None
+    vector_m = None
+    row_v = None
+
+    def __init__(self, myCatalog, name='default'):
+        self.myCatalog = myCatalog
+        self.name = name
+        self.indexDir = myCatalog.M_path('index-%s' % name)
+        self.index_d = {}
+        self.column_v = None
+        self.mean_v = None
+        self.scale_v = None
+        self.centroid_m = None
+        self.offset_v = None
+        self.vector_m = None
+        self.row_v = None
+        if os.path.exists(os.path.join(self.indexDir, 'index.json')):
+            self.M_load()
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_load(self):
+        with open(os.path.join(self.indexDir, 'index.json'), 'r') as fid:
+            self.index_d = json.load(fid)
+        self.column_v = np.array([self.myCatalog.column_l.index(key) for key in self.index_d['column_l']])
+        self.mean_v = np.array(self.index_d['mean_l'])
+        self.scale_v = np.array(self.index_d['weight_l']) / np.array(self.index_d['std_l'])
+        self.centroid_m = np.load(os.path.join(self.indexDir, 'centroid.npy'))
+        self.offset_v = np.load(os.path.join(self.indexDir, 'offset.npy'))
+        self.vector_m = np.load(os.path.join(self.indexDir, 'vector.npy'), mmap_mode='r')
+        self.row_v = np.load(os.path.join(self.indexDir, 'row.npy'), mmap_mode='r')
+        return
+
+
+    def M_vector(self, data_m):
+        """
+            Normalized and weighted vectors of rows of the feature matrix (missing values: 0)
+        """
+
+        vector_m = (np.asarray(data_m, dtype=np.float64)[:, self.column_v] - self.mean_v) * self.scale_v
+        vector_m[np.isnan(vector_m)] = 0.
+        return vector_m.astype(np.float32)
+
+
+    def M_build(self, feature_l=['*'], weight_l=[], nlist=0, nbIter=10, seed=0):
+        """
+            Build (or rebuild) the index over all the rows of the catalog
+            feature_l: patterns (fnmatch) of the columns used, e.g. ['TT*', 'MFCC_*']
+            weight_l: list of (pattern, weight): weight of the columns matching the pattern (the first one which matches; default 1.)
+            nlist: number of lists (0: sqrt(nbRow), at most NLIST_MAX)
+        """
+
+        myCatalog = self.myCatalog
+        column_l = [key for key in myCatalog.column_l if any([fnmatch.fnmatchcase(key, pattern) for pattern in feature_l])]
+        if len(column_l) == 0:
+            raise Exception("imdABCDJcatalog: no column matches %s" % ','.join(feature_l))
+        nbRow = myCatalog.nbRow
+        if nbRow == 0:
+            raise Exception("imdABCDJcatalog: the catalog is empty")
+        column_v = np.array([myCatalog.column_l.index(key) for key in column_l])
+        self.index_d = {'name': self.name, 'column_l': column_l,
+                        'weight_l': [([float(weight) for pattern, weight in weight_l if fnmatch.fnmatchcase(key, pattern)] + [1.])[0] for key in column_l],
+                        'mean_l': myCatalog.M_mean()[column_v].tolist(), 'std_l': myCatalog.M_std()[column_v].tolist(),
+                        'nbRow': nbRow, 'nlist': 0, 'time': time.time()}
+        self.column_v = column_v
+        self.mean_v = np.array(self.index_d['mean_l'])
+        self.scale_v = np.array(self.index_d['weight_l']) / np.array(self.index_d['std_l'])
+
+        """ k-means on a sample of the rows """
+        if nlist <= 0:
+            nlist = min(int(np.sqrt(nbRow)), NLIST_MAX)
+        nlist = max(min(nlist, nbRow), 1)
+        self.index_d['nlist'] = nlist
+        random = np.random.RandomState(seed)
+        data_m = myCatalog.M_matrix()
+        sample_v = np.sort(random.choice(nbRow, min(nbRow, SAMPLE_PER_LIST * nlist), replace=False))
+        self.centroid_m = F_kmeans(self.M_vector(data_m[sample_v]), nlist, nbIter, random).astype(np.float32)
+
+        """ lists """
+        list_v = np.zeros(nbRow, dtype=np.int32)
+        for start in range(0, nbRow, CHUNK_ROW):
+            list_v[start:start+CHUNK_ROW] = F_assign(self.M_vector(data_m[start:start+CHUNK_ROW]), self.centroid_m)
+        row_v = np.argsort(list_v, kind='mergesort').astype(np.int64)
+        offset_v = np.concatenate(([0], np.cumsum(np.bincount(list_v, minlength=nlist)))).astype(np.int64)
+        list_v = None
+
+        """ written in a temporary folder, which then replaces the index """
+        tmpDir = self.indexDir + '.%d.tmp' % os.getpid()
+        if os.path.exists(tmpDir):
+            shutil.rmtree(tmpDir)
+        os.makedirs(tmpDir)
+        np.save(os.path.join(tmpDir, 'centroid.npy'), self.centroid_m)
+        np.save(os.path.join(tmpDir, 'offset.npy'), offset_v)
+        np.save(os.path.join(tmpDir, 'row.npy'), row_v)
+        vector_m = np.lib.format.open_memmap(os.path.join(tmpDir, 'vector.npy'), mode='w+', dtype=np.float32, shape=(nbRow, len(column_l)))
+        for start in range(0, nbRow, CHUNK_ROW):
+            vector_m[start:start+CHUNK_ROW] = self.M_vector(data_m[row_v[start:start+CHUNK_ROW]])
+        vector_m.flush()
+        vector_m = None
+        with open(os.path.join(tmpDir, 'index.json'), 'w') as fid:
+            json.dump(self.index_d, fid)
+
+        if os.path.exists(self.indexDir):
+            oldDir = self.indexDir + '.%d.old' % os.getpid()
+            os.rename(self.indexDir, oldDir)
+            os.rename(tmpDir, self.indexDir)
+            shutil.rmtree(oldDir)
+        else:
+            os.rename(tmpDir, self.indexDir)
+        self.M_load()
+        return
+
+
+    def M_query(self, query, k=10, nprobe=8):
+        """
+            k nearest rows of query: a row of the catalog (int), the filepath of a track of the catalog, or a result (dict, e.g. F_extract)
+            nprobe: number of lists scanned (nlist: exhaustive search)
+            Return a list of (row, distance), nearest first (a row of the catalog is not its own neighbour)
+        """
+
+        myCatalog = self.myCatalog
+        if self.centroid_m is None:
+            raise Exception("imdABCDJcatalog: index '%s' is not built" % self.name)
+        exclude = -1
+        if isinstance(query, dict):
+            data_v = myCatalog.M_vector(query)
+        else:
+            exclude = myCatalog.M_find(query) if isinstance(query, basestring) else int(query)
+            if exclude < 0 or exclude >= myCatalog.nbRow:
+                raise Exception("imdABCDJcatalog: '%s' is not in the catalog" % query)
+            data_v = myCatalog.M_matrix()[exclude]
+        vector_v = self.M_vector(data_v[np.newaxis, :])[0]
+
+        """ lists with the nearest centroids """
+        nprobe = min(nprobe, self.centroid_m.shape[0])
+        dist_v = np.sum((self.centroid_m - vector_v)**2, axis=1)
+        probe_v = np.argpartition(dist_v, nprobe-1)[:nprobe] if nprobe < len(dist_v) else np.arange(len(dist_v))
+
+        row_l, dist_l = [], []
+        for num in probe_v:
+            start, stop = self.offset_v[num], self.offset_v[num+1]
+            if stop > start:
+                row_l.append(np.asarray(self.row_v[start:stop]))
+                dist_l.append(np.sum((self.vector_m[start:stop] - vector_v)**2, axis=1))
+
+        """ rows appended since the index was built: exhaustive """
+        data_m = myCatalog.M_matrix()
+        for start in range(self.index_d['nbRow'], myCatalog.nbRow, CHUNK_ROW):
+            stop = min(start + CHUNK_ROW, myCatalog.nbRow)
+            row_l.append(np.arange(start, stop))
+            dist_l.append(np.sum((self.M_vector(data_m[start:stop]) - vector_v)**2, axis=1))
+
+        if len(row_l) == 0:
+            return []
+        row_v = np.concatenate(row_l)
+        dist_v = np.concatenate(dist_l)
+        keep_v = row_v != exclude
+        row_v, dist_v = row_v[keep_v], dist_v[keep_v]
+        if k < len(dist_v):
+            best_v = np.argpartition(dist_v, k-1)[:k]
+            row_v, dist_v = row_v[best_v], dist_v[best_v]
+        order_v = np.argsort(dist_v, kind='mergesort')
+        return [(int(row_v[num]), float(np.sqrt(dist_v[num]))) for num in order_v]
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJcatalog.py -c ./catalog/ -a ./_out/ -a ./track.hardFeatures.json
+                  ./imdABCDJcatalog.py -c ./catalog/ -b timbre -f 'TT*,MFCC_*' -w 'MFCC_*=0.5'
+                  ./imdABCDJcatalog.py -c ./catalog/ -q ./audio/track.mp3 -i timbre -k 20
+    """
+
+    try:
+        opts, args = getopt.getopt(argv, "hc:a:b:f:w:q:i:k:", ["catalog=", "add=", "build=", "features=", "weights=", "nlist=", "query=", "index=", "nprobe="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    catalogDir = ''
+    path_l = []
+    buildName = ''
+    feature_l = ['*']
+    weight_l = []
+    nlist = 0
+    query = None
+    indexName = 'default'
+    k = 10
+    nprobe = 8
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt in ("-c", "--catalog"):
+            catalogDir = arg
+        elif opt in ("-a", "--add"):
+            path_l.append(arg)
+        elif opt in ("-b", "--build"):
+            buildName = arg
+        elif opt in ("-f", "--features"):
+            feature_l = arg.split(',')
+        elif opt in ("-w", "--weights"):
+            weight_l = [(item.split('=')[0], float(item.split('=')[1])) for item in arg.split(',')]
+        elif opt == "--nlist":
+            nlist = int(arg)
+        elif opt in ("-q", "--query"):
+            query = arg
+        elif opt in ("-i", "--index"):
+            indexName = arg
+        elif opt == "-k":
+            k = int(arg)
+        elif opt == "--nprobe":
+            nprobe = int(arg)
+
+    if len(catalogDir) == 0:
+        usage()
+        sys.exit(2)
+
+    myCatalog = C_catalog(catalogDir)
+    for path in path_l:
+        nbAppend = myCatalog.M_append(F_readResult(path))
+        print("M_append\t%s\t%d rows" % (path, nbAppend))
+
+    if len(buildName):
+        t = time.time()
+        myIndex = C_index(myCatalog, buildName)
+        myIndex.M_build(feature_l, weight_l, nlist)
+        print("M_build\t%s\t%d rows\t%d columns\t%d lists\t%.1f sec" % (buildName, myCatalog.nbRow, len(myIndex.index_d['column_l']), myIndex.index_d['nlist'], time.time()-t))
+
+    if query is not None:
+        if query.endswith('.json') and os.path.exists(query):
+            query = next(F_readResult(query))
+        elif query.isdigit():
+            query = int(query)
+        myIndex = C_index(myCatalog, indexName)
+        t = time.time()
+        result_l = myIndex.M_query(query, k, nprobe)
+        print("M_query\t%.2f ms" % (1000. * (time.time()-t)))
+        for rank, (row, distance) in enumerate(result_l):
+            print("%d\t%f\t%s" % (rank+1, distance, myCatalog.M_row(row).get('filepath', row)))
+
+    print("catalog\t%d rows\t%d columns" % (myCatalog.nbRow, len(myCatalog.column_l)))
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJcatalog.py -c <catalogDir> [-a <jsonFile|ndjsonFile|outputDir> ...]')
+    print('                   [-b <indexName> [-f <pattern,...>] [-w <pattern=weight,...>] [--nlist <n>]]')
+    print('                   [-q <filepath|row|jsonFile> [-i <indexName>] [-k <k>] [--nprobe <n>]]')
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# imdABCDJdaemon.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Daemon mode of imdABCDJhardfeatures: a pool of warm worker processes (numpy/scipy and
+    the extraction modules imported once) accepting jobs over a Unix socket
+
+    Protocol: one json object per line in both directions.
+    The client sends jobs (the keys are the arguments of F_computeOneFile, plus an optional 'id'),
+    then closes its writing side; the server answers with one status per job
+    ({'id', 'status': 'ok'|'failed', 'error', 'pid', 'time'}), in order of completion,
+    then closes the connection.
+    Commands: {"cmd": "ping"} and {"cmd": "stop"} (stop the daemon once the running jobs are done).
+
+    The client part only uses the standard library, so that submitting a job is cheap.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import json
+import socket
+import threading
+import multiprocessing
+
+import imdABCDJbatch
+
+
+class C_daemon:
+    """
+        class definition for the server: a Unix socket in front of a pool of warm workers
+    """
+
+    socketFile = ''
+    TMP_DIR = ''
+    do_profile = False
+    pool = None
+    mySocket = None
+    stopEvent = None
+    nbJob = 0
+    countLock = None
+
+    def __init__(self, socketFile, nbWorker=1, nbThread=1, TMP_DIR='', cacheDir='', cacheSize_mb=10240, do_profile=False, sinkType='json', sinkDir=''):
+        self.socketFile = socketFile
+        self.TMP_DIR = TMP_DIR
+        self.do_profile = do_profile
+        self.stopEvent = threading.Event()
+        self.nbJob = 0
+        # --- nbJob is incremented by the threads of all the connections
+        self.countLock = threading.Lock()
+
+        # --- the workers import the extraction modules once, with nbThread BLAS threads each
+        imdABCDJbatch.F_setBlasThread(nbThread)
+        self.pool = multiprocessing.Pool(nbWorker, initializer=imdABCDJbatch.F_initWorker, initargs=(cacheDir, cacheSize_mb, sinkType, sinkDir))
+
+        if os.path.exists(socketFile):
+            os.remove(socketFile)
+        self.mySocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.mySocket.bind(socketFile)
+        self.mySocket.listen(64)
+        # --- periodically leave accept() to check the stop request
+        self.mySocket.settimeout(1.0)
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_serve(self):
+        """
+            Accept connections until a stop command (or KeyboardInterrupt)
+        """
+
+        print("imdABCDJdaemon: listening on %s" % self.socketFile)
+        try:
+            while not self.stopEvent.is_set():
+                try:
+                    connection, address = self.mySocket.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                thread = threading.Thread(target=self.M_handle, args=(connection,))
+                thread.daemon = True
+                thread.start()
+            self.pool.close()
+        except KeyboardInterrupt:
+            self.pool.terminate()
+        finally:
+            self.pool.join()
+            self.mySocket.close()
+            if os.path.exists(self.socketFile):
+                os.remove(self.socketFile)
+        print("imdABCDJdaemon: stopped after %d jobs" % self.nbJob)
+        return
+
+
+    def M_handle(self, connection):
+        """
+            Read the jobs of a connection, run them in the pool and send back their status
+        """
+
+        lock = threading.Lock()
+
+        def F_reply(status_d):
+            with lock:
+                try:
+                    connection.sendall(json.dumps(status_d) + '\n')
+                except socket.error:
+                    pass
+
+        result_l = []
+        fid = connection.makefile('r')
+        for numLine, line in enumerate(fid):
+            line = line.strip()
+            if len(line) == 0:
+                continue
+            try:
+                job_d = json.loads(line)
+            except ValueError:
+                F_reply({'id': 'line:%d' % (numLine+1), 'status': 'failed', 'error': 'invalid json'})
+                continue
+
+            if 'cmd' in job_d:
+                if job_d['cmd'] == 'stop':
+                    self.stopEvent.set()
+                F_reply({'id': job_d.get('id', job_d['cmd']), 'status': 'ok', 'nbJob': self.nbJob})
+                continue
+
+            if 'id' not in job_d:
+                job_d['id'] = job_d.get('jsonFile', 'line:%d' % (numLine+1))
+            with self.countLock:
+                self.nbJob += 1
+            result_l.append(self.pool.apply_async(imdABCDJbatch.F_runJob, ((job_d, self.TMP_DIR, self.do_profile),), callback=F_reply))
+        fid.close()
+
+        for result in result_l:
+            result.wait()
+        connection.close()
+        return
+
+
+def F_submit(socketFile, job_l):
+    """
+        Send jobs (or commands) to the daemon and return their status (in order of completion)
+    """
+
+    mySocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    mySocket.connect(socketFile)
+    mySocket.sendall(''.join([json.dumps(job_d) + '\n' for job_d in job_l]))
+    mySocket.shutdown(socket.SHUT_WR)
+
+    status_l = []
+    fid = mySocket.makefile('r')
+    for line in fid:
+        status_l.append(json.loads(line))
+    fid.close()
+    mySocket.close()
+    return status_l
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJdaemon.py --serve -s /tmp/imdABCDJ.sock -j 4 -t ./_tmp/
+                  ./imdABCDJdaemon.py -s /tmp/imdABCDJ.sock -a $InFullPathToWavFile -x $InFullPathToXmlFile -o $OutFullPathToJsonFile
+    """
+
+    try:
+        opts, args = getopt.getopt(argv, "hs:j:b:t:c:pa:x:o:m:", ["serve", "socket=", "jobs=", "blasthreads=", "tmpdir=", "cachedir=", "cachesize=", "profile",
+                                                                 "iaudiofile=", "ixmlfile=", "ojsonfile=", "manifest=", "ping", "stop", "sink=", "sinkdir="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    do_serve = False
+    socketFile = ''
+    nbWorker = multiprocessing.cpu_count()
+    nbThread = 1
+    TMP_DIR = ''
+    cacheDir = ''
+    cacheSize_mb = 10240
+    do_profile = False
+    sinkType = 'json'
+    sinkDir = ''
+    job_d = {}
+    manifestFile = ''
+    command = ''
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt == "--serve":
+            do_serve = True
+        elif opt in ("-s", "--socket"):
+            socketFile = arg
+        elif opt in ("-j", "--jobs"):
+            nbWorker = int(arg)
+        elif opt in ("-b", "--blasthreads"):
+            nbThread = int(arg)
+        elif opt in ("-t", "--tmpdir"):
+            TMP_DIR = arg + '/'
+        elif opt in ("-c", "--cachedir"):
+            cacheDir = arg
+        elif opt == "--cachesize":
+            cacheSize_mb = float(arg)
+        elif opt in ("-p", "--profile"):
+            do_profile = True
+        elif opt == "--sink":
+            sinkType = arg
+        elif opt == "--sinkdir":
+            sinkDir = arg
+        elif opt in ("-a", "--iaudiofile"):
+            job_d['audioFileFull'] = os.path.abspath(arg)
+        elif opt in ("-x", "--ixmlfile"):
+            job_d['xmlFile'] = os.path.abspath(arg)
+        elif opt in ("-o", "--ojsonfile"):
+            job_d['jsonFile'] = os.path.abspath(arg)
+        elif opt in ("-m", "--manifest"):
+            manifestFile = arg
+        elif opt in ("--ping", "--stop"):
+            command = opt[2:]
+
+    if len(socketFile) == 0:
+        usage()
+        sys.exit(2)
+
+    if do_serve:
+        myDaemon = C_daemon(socketFile, nbWorker=nbWorker, nbThread=nbThread, TMP_DIR=TMP_DIR, cacheDir=cacheDir, cacheSize_mb=cacheSize_mb, do_profile=do_profile, sinkType=sinkType, sinkDir=sinkDir)
+        myDaemon.M_serve()
+        return
+
+    if len(command):
+        job_l = [{'cmd': command}]
+    elif len(manifestFile):
+        job_l = imdABCDJbatch.F_readManifest(manifestFile)
+    elif len(job_d):
+        job_l = [job_d]
+    else:
+        usage()
+        sys.exit(2)
+
+    status_l = F_submit(socketFile, job_l)
+    for status_d in status_l:
+        print("%s\t%s\t%f" % (status_d['status'], status_d['id'], status_d.get('time', 0.)))
+        if status_d['status'] != 'ok':
+            print(status_d['error'])
+
+    if len([status_d for status_d in status_l if status_d['status'] != 'ok']) or len(status_l) != len(job_l):
+        sys.exit(1)
+
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJdaemon.py --serve -s <socketFile> [-j <nbWorker>] [-b <nbBlasThread>] [-t <tmpDir>] [-c <cacheDir>] [--cachesize <MB>] [-p] [--sink json|ndjson|columnar --sinkdir <outDir>]')
+    print('imdABCDJdaemon.py -s <socketFile> -a <inputAudioFile> -x <inputXmlFile> -o <outputJsonFile>')
+    print('imdABCDJdaemon.py -s <socketFile> -m <manifestFile>')
+    print('imdABCDJdaemon.py -s <socketFile> --ping|--stop')
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -34,87 +34,145 @@
 
 import glob
 import os
-import xmltodict
-import json
 import numpy as np
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import getopt
+import subprocess
 import sys
+import time
+import signal
+import threading
+import traceback
+import cPickle as pickle
 
 #import ipdb
 #import xlrd
 
 import peeaudiolight
 import peeTimbreToolbox
+import imdABCDJxml
+import imdABCDJcache
+import imdABCDJprofile
+import imdABCDJsink
+import imdABCDJseries
+from imdABCDJprofile import F_stage
+
+# --- the stages of the TimbreToolbox are measured by the profiler of imdABCDJhardfeatures
+peeTimbreToolbox.F_setStage(F_stage)
 
 
 exec_d = {}
 exec_d['MPG123'] = '/opt/local/bin/mpg123'
 # exec_d['MPG123'] = '/usr/local/bin/mpg123'
 exec_d['imdABCDJ'] = './_bin/imdABCDJ-1.1.0'
+exec_d['FLAC'] = '/opt/local/bin/flac'
+
+# --- decoders of the compressed formats: exec_d[name] + arguments + audioFile writes a wav stream on stdout
+DECODER_d = {'.mp3': ['MPG123', '-q', '-w', '-'],
+             '.flac': ['FLAC', '-d', '-s', '-c']}
+
+# --- configuration of an extraction (given explicitly to F_extract, F_computeOneFile and the functions they call):
+#     exec_d: paths of the executables, ttb_s: peeTimbreToolbox.desc_settings, TMP_DIR: directory of the temporary files of imdABCDJ,
+#     do_verbose: progress messages on stdout
+hard_settings = namedtuple('hard_settings', 'exec_d ttb_s TMP_DIR do_verbose')
+config_s = hard_settings(exec_d=exec_d, ttb_s=peeTimbreToolbox.config_s, TMP_DIR='', do_verbose=False)
+
+
+def F_decoder(audioFile, exec_d=exec_d):
+    """
+        Command line (without audioFile) of the decoder of audioFile ([] for a .wav file)
+    """
+
+    if audioFile.endswith('.wav'):
+        return []
+    ext = os.path.splitext(audioFile)[1].lower()
+    if ext not in DECODER_d:
+        raise Exception("file '%s': no decoder for '%s' files" % (audioFile, ext))
+    return [exec_d[DECODER_d[ext][0]]] + DECODER_d[ext][1:]
+
 
 
+def F_buildHarmonicTable():
+    """
+        Build the key/chord names and the chord-in-key matrix (done once, at import)
+    """
+
+    root_l = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab',
+              'A', 'Bb', 'B']
+    mode_l = ['Maj', 'min']
+    type_l = ['maj', 'min', 'dim', 'aug']
+    nbRoot = len(root_l)
+    nbMode = len(mode_l)
+    nbType = len(type_l)
+
+    nbChroma = 12
+    templateKey_m = np.zeros((nbChroma, nbMode))
+    # --- Major mode
+    templateKey_m[[0, 2, 4, 5, 7, 9, 11], 0] = 1
+    # --- Minor mode
+    templateKey_m[[0, 2, 3, 5, 7, 8, 10], 1] = 1
+
+    templateChord_m = np.zeros((nbChroma, nbType))
+    # --- Major chord
+    templateChord_m[[0, 4, 7], 0] = 1
+    # --- minor chord
+    templateChord_m[[0, 3, 7], 1] = 1
+    # --- diminished chord
+    templateChord_m[[0, 3, 6], 2] = 1
+    # --- augmented chord
+    templateChord_m[[0, 4, 8], 3] = 1
+
+    keyName_l = []
+    chordName_l = []
+
+    matKey_m = np.zeros((nbChroma, nbRoot*nbMode))
+    matChord_m = np.zeros((nbChroma, nbRoot*nbType))
+
+    count = 0
+    for numMode in range(0, nbMode):
+        for numRoot in range(0, nbRoot):
+            keyName_l.append(root_l[numRoot] + mode_l[numMode])
+            matKey_m[:, count] = np.roll(templateKey_m[:, numMode], numRoot)
+            count += 1
+
+    count = 0
+    for numType in range(0, nbType):
+        for numRoot in range(0, nbRoot):
+            chordName_l.append(root_l[numRoot] + type_l[numType])
+            matChord_m[:, count] = np.roll(templateChord_m[:, numType], numRoot)
+            count += 1
+
+    # --- a chord is in the key if its 3 notes belong to the key
+    matChordKey_m = 1.0*(np.dot(matChord_m.T, matKey_m) == 3)
+
+    # --- chordIndex_d[chordName] = position in chordName_l (the root note is position % 12)
+    chordIndex_d = dict((chordName, numChord) for numChord, chordName in enumerate(chordName_l))
+
+    return {'root_l': root_l, 'keyName_l': keyName_l, 'chordName_l': chordName_l,
+            'matChordKey_m': matChordKey_m, 'chordIndex_d': chordIndex_d}
+
+
+HARMONIC_TABLE_d = F_buildHarmonicTable()
+
 
 class C_harmonicInformation:
     """
         class definition for chord/harmonic information
+        (the tables are shared: they are built once in HARMONIC_TABLE_d)
     """
 
     root_l = []
     keyName_l = []
     chordName_l = []
     matChordKey_m = []
+    chordIndex_d = {}
 
     def __init__(self):
-        self.root_l = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab',
-                  'A', 'Bb', 'B']
-        mode_l = ['Maj', 'min']
-        type_l = ['maj', 'min', 'dim', 'aug']
-        nbRoot = len(self.root_l)
-        nbMode = len(mode_l)
-        nbType = len(type_l)
-
-        nbChroma = 12
-        templateKey_m = np.zeros((nbChroma, nbMode))
-        # --- Major mode
-        templateKey_m[[0, 2, 4, 5, 7, 9, 11], 0] = 1
-        # --- Minor mode
-        templateKey_m[[0, 2, 3, 5, 7, 8, 10], 1] = 1
-
-        templateChord_m = np.zeros((nbChroma, nbType))
-        # --- Major chord
-        templateChord_m[[0, 4, 7], 0] = 1
-        # --- minor chord
-        templateChord_m[[0, 3, 7], 1] = 1
-        # --- diminished chord
-        templateChord_m[[0, 3, 6], 2] = 1
-        # --- augmented chord
-        templateChord_m[[0, 4, 8], 3] = 1
-
-        self.keyName_l = []
-        self.chordName_l = []
-
-        matKey_m = np.zeros((nbChroma, nbRoot*nbMode))
-        matChord_m = np.zeros((nbChroma, nbRoot*nbType))
-        self.matChordKey_m = np.zeros((nbRoot*nbType, nbRoot*nbMode))
-
-        count = 0
-        for numMode in range(0, nbMode):
-            for numRoot in range(0, nbRoot):
-                self.keyName_l.append(self.root_l[numRoot] + mode_l[numMode])
-                matKey_m[:, count] = np.roll(templateKey_m[:, numMode], numRoot)
-                count += 1
-
-        count = 0
-        for numType in range(0, nbType):
-            for numRoot in range(0, nbRoot):
-                self.chordName_l.append(self.root_l[numRoot] + type_l[numType])
-                matChord_m[:, count] = np.roll(templateChord_m[:, numType], numRoot)
-                count += 1
-
-        for numChord in range(0, nbRoot*nbType):
-            for numKey in range(0, nbRoot*nbMode):
-                self.matChordKey_m[numChord,numKey] = np.sum(np.multiply(matChord_m[:, numChord], matKey_m[:,numKey]))==3
+        self.root_l = HARMONIC_TABLE_d['root_l']
+        self.keyName_l = HARMONIC_TABLE_d['keyName_l']
+        self.chordName_l = HARMONIC_TABLE_d['chordName_l']
+        self.matChordKey_m = HARMONIC_TABLE_d['matChordKey_m']
+        self.chordIndex_d = HARMONIC_TABLE_d['chordIndex_d']
 
         #[self.chordName_l[num] for num in range(0,4*12) if self.matChordKey_m[num,0] ]
 
@@ -126,63 +184,603 @@ class C_harmonicInformation:
             raise Exception("self.%s note part of the fields" % attrName)
 
 
+class C_progressionMatcher:
+    """
+        Count chord progressions in a sequence of root notes.
+        A progression is given by the successive root intervals, in half-tones down
+        (i.e. F_isIntervalDown(rootNotePrev, rootNoteNext, interval) for each pair of chords).
+        The patterns are compiled once into a matrix, and all of them are counted in a single pass.
+    """
+
+    name_l = []
+    pattern_m = []
+    mask_m = []
+
+    def __init__(self, progression_l):
+        self.name_l = [name for name, interval_l in progression_l]
+        maxLength = max([len(interval_l) for name, interval_l in progression_l])
+
+        # --- pattern_m (nbPattern, maxLength): intervals of each pattern, -1 after its end
+        self.pattern_m = -np.ones((len(progression_l), maxLength), int)
+        for numPattern, (name, interval_l) in enumerate(progression_l):
+            self.pattern_m[numPattern, 0:len(interval_l)] = interval_l
+        self.mask_m = self.pattern_m >= 0
 
-def F_computeTimbre(audioFile, outTTBFile, myResult):
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_count(self, rootNote_v):
+        """
+            Return the number of occurrences of each pattern in rootNote_v (nbChord, )
+        """
+
+        nbPattern, maxLength = self.pattern_m.shape
+        rootNote_v = np.asarray(rootNote_v, int)
+        if len(rootNote_v) < 2:
+            return np.zeros(nbPattern, int)
+
+        # --- intervalDown_v (nbChord-1, ): interval in half-tones down between successive chords
+        intervalDown_v = (rootNote_v[:-1] - rootNote_v[1:]) % 12
+        nbInterval = len(intervalDown_v)
+
+        # --- window_m (nbInterval, maxLength): the maxLength intervals starting at each chord
+        # --- (padded with -2, which never matches a pattern interval)
+        pad_v = np.concatenate((intervalDown_v, -2*np.ones(maxLength-1, int)))
+        window_m = np.lib.stride_tricks.as_strided(pad_v, shape=(nbInterval, maxLength), strides=(pad_v.strides[0], pad_v.strides[0]))
+
+        # --- match_3m (nbInterval, nbPattern, maxLength)
+        match_3m = (window_m[:, np.newaxis, :] == self.pattern_m[np.newaxis, :, :]) | ~self.mask_m[np.newaxis, :, :]
+
+        return np.sum(np.all(match_3m, axis=2), axis=0)
+
+
+# --- chord progressions counted by F_parseChord: feature name, root intervals in half-tones down
+PROGRESSION_l = [('Chords_Cad_01', [7]),                # V -> I
+                 ('Chords_Cad_02', [10, 7]),            # IV -> V -> I
+                 ('Chords_Cad_03', [7, 7]),             # II -> V -> I
+                 ('Chords_Turn_01', [7, 7, 7]),         # VI -> II -> V -> I
+                 ('Chords_Turn_02', [7, 5, 5, 2, 5]),   # I -> IV -> I -> V -> IV -> I
+                 ('Chords_Turn_03', [5, 5, 9])]         # I -> V -> II -> IV
+
+PROGRESSION_MATCHER = C_progressionMatcher(PROGRESSION_l)
+
+
+
+# --- parameters of the HPSS analysis (they are part of the cache key of its results)
+HPSS_PARAM_d = {'L_sec': 4096./44100., 'window_shape': 'blackman', 'zp_factor': 1, 'mask_L_sec': 0.08, 'mask_STEP_sec': 0.02}
+
+
+def F_windowParam(param_d, window_t):
     """
-        Compute features from the TimbreToolbox (TTB)
+        Cache parameters of a result computed on the excerpt window_t=(start_sec, stop_sec) only
+        (unchanged for the whole track)
     """
 
-    if os.path.exists(outTTBFile)==False:
-        my = peeaudiolight.C_AudioAnalysis(audioFile, do_stereo2mono=True)
+    if window_t[0] < 0:
+        return param_d
+    param_d = dict(param_d)
+    param_d['window_t'] = [float(window_t[0]), float(window_t[1])]
+    return param_d
 
-        descHub_d = peeTimbreToolbox.F_computeAllDescriptor(my.data_v[0,:], my.x_sr_hz)
-        descHub_d = peeTimbreToolbox.F_temporalModeling(descHub_d)
 
-        peeTimbreToolbox.F_save(descHub_d, outTTBFile)
+def F_loadAudio(audioFile, myCache=None, audioHash='', window_t=(-1., -1.), exec_d=exec_d, wavFile=''):
+    """
+        Decode the audio file to mono (or get the decoded signal from the cache)
+        window_t=(start_sec, stop_sec): only read the samples of the excerpt (start_sec < 0: whole track)
+        mp3/flac files are decoded through a pipe (F_decoder)
+        wavFile: wav file already decoded from audioFile by its decoder (C_imdJob.M_wavFile), read instead of decoding it again
+    """
 
-    descHub_d = peeTimbreToolbox.F_load(outTTBFile)
+    decoder_l = F_decoder(audioFile, exec_d)
+    if myCache is not None:
+        param_d = {'do_stereo2mono': True}
+        if len(decoder_l):
+            param_d['decoder_l'] = decoder_l
+        key = myCache.M_key('audio', audioHash, F_windowParam(param_d, window_t))
+        cache_t = myCache.M_get('audio', key)
+        if cache_t is not None:
+            sr_hz, data_v, x_start = cache_t
+            return peeaudiolight.C_Descriptor('audio', data_v, 'Time [sec]', sr_hz, x_start, 'Audio-value', 1., 0.)
+
+    with F_stage('audio'):
+        if len(wavFile):
+            myAudio = peeaudiolight.C_AudioAnalysis(wavFile, do_stereo2mono=True, start_sec=window_t[0], stop_sec=window_t[1])
+        else:
+            myAudio = peeaudiolight.C_AudioAnalysis(audioFile, do_stereo2mono=True, start_sec=window_t[0], stop_sec=window_t[1], decoder_l=decoder_l)
 
-    # --- 2018/07/09: remove pickle file (request from Stefano)
-    os.remove(outTTBFile)
+    if myCache is not None:
+        myCache.M_put('audio', key, (myAudio.x_sr_hz, myAudio.data_v, myAudio.x_start))
 
-    if True:
+    return myAudio
+
+
+def F_computeHpss(myAudio, do_frame=False):
+    """
+        Compute the Harmonic/Percussive/Residual ratios (FitzGerald)
+        do_frame: return the energies of each frame and their times instead (ener_m (4, nbFrame), time_v)
+    """
+
+    L1 = HPSS_PARAM_d['L_sec']
+    with F_stage('framing'):
+        myFrame = myAudio.M_frameAnalysis(window_shape=HPSS_PARAM_d['window_shape'], L_sec=L1, STEP_sec=L1/4., )
+    with F_stage('fft'):
+        mySpectrum = myFrame.M_cplxFft(zp_factor=HPSS_PARAM_d['zp_factor'])
+    with F_stage('median'):
+        if do_frame:
+            ener_m = mySpectrum.M_fitzGeraldFrame(L_sec=HPSS_PARAM_d['mask_L_sec'], STEP_sec=HPSS_PARAM_d['mask_STEP_sec'])
+            return ener_m, mySpectrum.x_start + np.arange(0, ener_m.shape[1]) / mySpectrum.x_sr_hz
+        return mySpectrum.M_fitzGerald(L_sec=HPSS_PARAM_d['mask_L_sec'], STEP_sec=HPSS_PARAM_d['mask_STEP_sec'])
+
+
+# --- computation time (sec) per second of audio of the audio stages (HPSS and each TimbreToolbox family), measured on a reference machine
+COST_d = {'hpss': 0.3, 'TEE': 0.02, 'STFTmag': 0.1, 'STFTpow': 0.1, 'AS': 0.85, 'ERBfft': 0.5, 'ERBgam': 0.5, 'Harmonic': 0.9}
+
+# --- TimbreToolbox families dropped first when a job exceeds its time budget (in this order)
+TTB_OPTIONAL_l = ['Harmonic', 'AS', 'ERBfft', 'ERBgam']
+
+# --- excerpt sampling: duration of each excerpt (also the minimum duration analysed)
+SAMPLE_SEGMENT_sec = 10.
+
+# --- time (sec) kept for the stages following the audio stages (temporal modeling, json)
+BUDGET_MARGIN_sec = 0.5
+
+
+class C_deadline:
+    """
+        class definition for the time budget of a job (F_computeOneFile with budget_sec)
+        When the projected cost of the audio stages exceeds the remaining time, they are degraded:
+            1) the optional TimbreToolbox families (TTB_OPTIONAL_l) are skipped (their features are None)
+            2) HPSS and TimbreToolbox are computed on evenly spaced excerpts of SAMPLE_SEGMENT_sec (excerpt sampling)
+        The projection uses COST_d, rescaled by the speed observed on the first stage computed
+    """
+
+    budget_sec = 0.
+    time0 = 0.
+    scale = 1.
+    duration_sec = 0.
+    analysed_d = {}
+    skip_l = []
+    feature_l = []
+
+    def __init__(self, budget_sec):
+        self.budget_sec = budget_sec
+        self.time0 = time.time()
+        # --- speed of this machine relative to the reference machine of COST_d
+        self.scale = 1.
+        self.duration_sec = 0.
+        # --- analysed_d[stage] = duration (sec) of audio analysed by the stage
+        self.analysed_d = {}
+        self.skip_l = []
+        self.feature_l = []
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_remaining(self):
+        return self.budget_sec - (time.time() - self.time0) - BUDGET_MARGIN_sec
+
+
+    def M_plan(self, duration_sec, stage_l):
+        """
+            Degradation of the stages of stage_l ('hpss' and TimbreToolbox families) on duration_sec of audio
+            Return the families to skip and the duration of audio to analyse (duration_sec: no sampling)
+        """
+
+        self.duration_sec = duration_sec
+        remaining = self.M_remaining()
+        stage_l = list(stage_l)
+        skip_l = []
+        for family in TTB_OPTIONAL_l:
+            if self.scale * sum([COST_d[stage] for stage in stage_l]) * duration_sec <= remaining:
+                break
+            if family in stage_l:
+                stage_l.remove(family)
+                skip_l.append(family)
+
+        rate = self.scale * sum([COST_d[stage] for stage in stage_l])
+        if rate * duration_sec <= remaining:
+            return skip_l, duration_sec
+        # --- at least one excerpt is analysed, even if it exceeds the budget
+        return skip_l, min(max(remaining / rate, SAMPLE_SEGMENT_sec), duration_sec)
+
+
+    def M_observe(self, stage_l, analysed_sec, wall_sec):
+        """
+            Rescale the cost model with the time taken by stage_l on analysed_sec of audio
+        """
+
+        if analysed_sec >= SAMPLE_SEGMENT_sec:
+            self.scale = wall_sec / (sum([COST_d[stage] for stage in stage_l]) * analysed_sec)
+        return
+
+
+    def M_degrade(self, stage, analysed_sec, skip_l=[]):
+        """
+            Record the degradation of a stage ('hpss' or 'ttb')
+        """
+
+        self.analysed_d[stage] = analysed_sec
+        if stage == 'hpss' and analysed_sec < self.duration_sec:
+            self.feature_l += ['DecSinus', 'DecNoise', 'DecTrans']
+        elif stage == 'ttb':
+            self.skip_l = list(skip_l)
+            self.feature_l += [nom for nom in TTB_FEATURE_l if analysed_sec < self.duration_sec or TTB_FAMILY_d[nom[0:3]] in skip_l]
+        return
+
+
+    def M_report(self):
+        """
+            Degradation of the job, as written in its json output
+        """
+
+        return OrderedDict([('budget_sec', self.budget_sec),
+                            ('elapsed_sec', time.time() - self.time0),
+                            ('duration_sec', self.duration_sec),
+                            ('analysed_sec', self.analysed_d),
+                            ('skipped_family_l', self.skip_l),
+                            ('feature_l', self.feature_l)])
+
+
+def F_sampleAudio(myAudio, analysed_sec):
+    """
+        Excerpt sampling: concatenation of evenly spaced excerpts of SAMPLE_SEGMENT_sec, analysed_sec in total
+    """
+
+    sr_hz = myAudio.x_sr_hz
+    nbSample = myAudio.data_v.shape[1]
+    L = int(SAMPLE_SEGMENT_sec * sr_hz)
+    nbSegment = max(int(round(analysed_sec / SAMPLE_SEGMENT_sec)), 1)
+    if nbSegment * L >= nbSample:
+        return myAudio
+    # --- each excerpt is centred in one of nbSegment equal parts of the signal
+    start_v = ((np.arange(nbSegment) + 0.5) * nbSample / nbSegment - L / 2.).astype(int)
+    data_v = np.concatenate([myAudio.data_v[:, start:start+L] for start in start_v], axis=1)
+    return peeaudiolight.C_Descriptor('audio', data_v, 'Time [sec]', sr_hz, myAudio.x_start, 'Audio-value', 1., 0.)
+
+
+class C_forkCall:
+    """
+        class definition for a function run in a forked child process (F_computeAudioStage with do_parallel)
+        The child reads the memory of the parent as it was at the fork (e.g. the decoded audio) through
+        copy-on-write pages which it never writes: the audio is neither copied nor pickled, only the result is
+        (os.fork rather than multiprocessing: the daemonic workers of imdABCDJbatch cannot start a multiprocessing.Process)
+        The caller must be single-threaded (see F_computeAudioStage)
+    """
+
+    pid = 0
+    fid = None
+
+    def __init__(self, F_function, arg_t):
+        fdRead, fdWrite = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            """ child: send (success, result or traceback) and exit """
+            status = 0
+            try:
+                os.close(fdRead)
+                with os.fdopen(fdWrite, 'wb') as fid:
+                    try:
+                        result_t = (True, F_function(*arg_t))
+                    except BaseException:
+                        result_t = (False, traceback.format_exc())
+                    pickle.dump(result_t, fid, pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                status = 1
+            # --- neither the atexit handlers nor the stdio buffers of the parent are run in the child
+            os._exit(status)
+        os.close(fdWrite)
+        self.fid = os.fdopen(fdRead, 'rb')
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_wait(self):
+        """
+            Wait for the child and return the result of F_function (its exception is raised in the parent)
+        """
+
+        try:
+            success, result = pickle.load(self.fid)
+        except (EOFError, pickle.UnpicklingError):
+            success, result = False, 'child process %d died' % self.pid
+        os.waitpid(self.pid, 0)
+        self.pid = 0
+        self.M_cancel()
+        if not success:
+            raise Exception("imdABCDJhardfeatures: %s" % result)
+        return result
+
+
+    def M_cancel(self):
+        """
+            Kill the child if it is still running
+        """
+
+        if self.pid > 0:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            os.waitpid(self.pid, 0)
+            self.pid = 0
+        if self.fid is not None:
+            self.fid.close()
+            self.fid = None
+        return
+
+
+def F_computeAudioStage(audioFile, myCache=None, audioHash='', window_t=(-1., -1.), myAudio=None, myDeadline=None, do_parallel=False, config_s=config_s, wavFile=''):
+    """
+        Compute the audio-derived results: HPSS ratios and TimbreToolbox time series
+        The audio is decoded once (and only if one of them is not in the cache)
+        window_t=(start_sec, stop_sec): compute them on the excerpt only (start_sec < 0: whole track)
+        myAudio: audio already decoded (F_readInput), window_t included
+        myDeadline: optional C_deadline; the degraded results are not cached
+        do_parallel: HPSS is computed in a forked child process (C_forkCall) while TimbreToolbox is computed,
+            so that the latency is that of the slower of the two (sequential on a single core: they would
+            only share it, and the time budget of myDeadline assumes they really run in parallel);
+            the 'hpss' stage of the profile is then the time spent waiting for the child.
+            Only used in a single-threaded process: a lock held by another thread at the fork (cache, sink,
+            profiler, reader threads of imdABCDJpipeline, heartbeat of imdABCDJqueue, daemon) would stay held
+            in the child; they are computed one after the other otherwise
+        config_s: hard_settings of the extraction
+        wavFile: wav file already decoded from audioFile (see F_loadAudio)
+    """
+
+    hpss_t, descHub_d = None, None
+    if myCache is not None:
+        hpssKey = myCache.M_key('hpss', audioHash, F_windowParam(HPSS_PARAM_d, window_t))
+        hpss_t = myCache.M_get('hpss', hpssKey)
+        ttbKey = myCache.M_key('ttb', audioHash, F_windowParam({'config': config_s.ttb_s._asdict(), 'plan': TTB_PLAN_d}, window_t))
+        descHub_d = myCache.M_get('ttb', ttbKey)
+
+    if hpss_t is None or descHub_d is None:
+        """ AUDIO: decoded once, shared by HPSS and TimbreToolbox """
+        if myAudio is None:
+            myAudio = F_loadAudio(audioFile, myCache, audioHash, window_t, config_s.exec_d, wavFile)
+        duration_sec = myAudio.data_v.shape[1] / float(myAudio.x_sr_hz)
+        do_parallel = do_parallel and hpss_t is None and descHub_d is None and os.sysconf('SC_NPROCESSORS_ONLN') > 1 and threading.active_count() == 1
+        myHpssCall = None
+
+        try:
+            if hpss_t is None:
+                """ HPSS """
+                analysed_sec = duration_sec
+                if myDeadline is not None:
+                    # --- planned with the TimbreToolbox (unless they run in parallel), so that HPSS leaves it its share of the budget
+                    skip_l, analysed_sec = myDeadline.M_plan(duration_sec, ['hpss'] + (list(TTB_PLAN_d.keys()) if descHub_d is None and not do_parallel else []))
+                mySample = F_sampleAudio(myAudio, analysed_sec)
+                hpssAnalysed_sec = mySample.data_v.shape[1] / float(myAudio.x_sr_hz)
+                if do_parallel:
+                    myHpssCall = C_forkCall(F_computeHpss, (mySample,))
+                else:
+                    t = time.time()
+                    with F_stage('hpss'):
+                        hpss_t = F_computeHpss(mySample)
+                    if myDeadline is not None:
+                        myDeadline.M_observe(['hpss'], hpssAnalysed_sec, time.time() - t)
+                        myDeadline.M_degrade('hpss', hpssAnalysed_sec)
+                    if myCache is not None and hpssAnalysed_sec == duration_sec:
+                        myCache.M_put('hpss', hpssKey, hpss_t)
+                mySample = None
+
+            if descHub_d is None:
+                """ TimbreToolbox: time series (their statistics are computed by F_computeTimbre) """
+                plan_d, skip_l, analysed_sec = TTB_PLAN_d, [], duration_sec
+                if myDeadline is not None:
+                    skip_l, analysed_sec = myDeadline.M_plan(duration_sec, list(TTB_PLAN_d.keys()))
+                    plan_d = dict((family, desc_d) for family, desc_d in TTB_PLAN_d.items() if family not in skip_l)
+                mySample = F_sampleAudio(myAudio, analysed_sec)
+                analysed_sec = mySample.data_v.shape[1] / float(myAudio.x_sr_hz)
+                if config_s.do_verbose:
+                    print("ttb %s" % (audioFile))
+                with F_stage('ttb'):
+                    descHub_d = peeTimbreToolbox.F_computeAllDescriptor(mySample.data_v[0,:], myAudio.x_sr_hz, plan_d, config_s.ttb_s)
+                if myDeadline is not None:
+                    myDeadline.M_degrade('ttb', analysed_sec, skip_l)
+                if myCache is not None and analysed_sec == duration_sec and len(skip_l) == 0:
+                    myCache.M_put('ttb', ttbKey, descHub_d)
+
+            if myHpssCall is not None:
+                with F_stage('hpss'):
+                    hpss_t = myHpssCall.M_wait()
+                if myDeadline is not None:
+                    myDeadline.M_degrade('hpss', hpssAnalysed_sec)
+                if myCache is not None and hpssAnalysed_sec == duration_sec:
+                    myCache.M_put('hpss', hpssKey, hpss_t)
+        finally:
+            if myHpssCall is not None:
+                myHpssCall.M_cancel()
+
+    return hpss_t, descHub_d
+
+
+class C_trackFrame:
+    """
+        class definition for the frame-level HPSS energies and TimbreToolbox time series of a full track,
+        from which the results of any excerpt [start_sec, stop_sec[ are obtained by slicing (M_slice)
+        instead of analysing the excerpt again
+        The results differ from an analysis of the excerpt near its boundaries (context of the frames, median filters)
+    """
 
-        map1_d = {'TTT': 'TEE', 'TTF': 'ERBfft', 'TTG': 'ERBgam', 'TTH': 'Harmonic', 'TTM': 'STFTmag', 'TTP': 'STFTpow'}
-        map2_d = {'En': 'RMSEnv',
+    sr_hz = 0
+    hpssEner_m = None
+    hpssTime_v = None
+    descHub_d = {}
+    blockMax_v = None
+    maxValue = 0.
+
+    # --- number of samples of the blocks in which the maximum of the signal is kept
+    BLOCK_n = 256
+
+    def __init__(self, myAudio, config_s=config_s):
+        self.sr_hz = myAudio.x_sr_hz
+        with F_stage('hpss'):
+            self.hpssEner_m, self.hpssTime_v = F_computeHpss(myAudio, do_frame=True)
+        with F_stage('ttb'):
+            self.descHub_d = peeTimbreToolbox.F_computeAllDescriptor(myAudio.data_v[0,:], myAudio.x_sr_hz, TTB_PLAN_d, config_s.ttb_s)
+
+        # --- TimbreToolbox normalizes the signal by its maximum: keep the maximum of each block to renormalize the slices
+        audio_v = myAudio.data_v[0,:]
+        nbBlock = int(np.ceil(len(audio_v) / float(self.BLOCK_n)))
+        pad_v = np.concatenate((audio_v, -np.inf * np.ones(nbBlock*self.BLOCK_n - len(audio_v))))
+        self.blockMax_v = np.max(np.reshape(pad_v, (nbBlock, self.BLOCK_n)), axis=1)
+        self.maxValue = np.max(audio_v)
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_slice(self, start_sec, stop_sec):
+        """
+            HPSS ratios and TimbreToolbox time series of [start_sec, stop_sec[ (stop_sec < 0: until the end of the track)
+            Return hpss_t, descHub_d (as F_computeAudioStage)
+        """
+
+        start, stop = np.searchsorted(self.hpssTime_v, [start_sec, stop_sec])
+        if stop_sec < 0:
+            stop = len(self.hpssTime_v)
+        start = min(start, len(self.hpssTime_v)-1)
+        hpss_t = peeaudiolight.F_hpssRatio(self.hpssEner_m[:, start:max(stop, start+1)])
+
+        start = min(int(start_sec * self.sr_hz) // self.BLOCK_n, len(self.blockMax_v)-1)
+        stop = len(self.blockMax_v)
+        if stop_sec >= 0:
+            stop = int(np.ceil(stop_sec * self.sr_hz / self.BLOCK_n))
+        stop = max(stop, start+1)
+        gain = (self.maxValue + peeTimbreToolbox.EPS) / (np.max(self.blockMax_v[start:stop]) + peeTimbreToolbox.EPS)
+        descHub_d = peeTimbreToolbox.F_sliceDescriptor(self.descHub_d, self.sr_hz, start_sec, stop_sec, gain)
+
+        return hpss_t, descHub_d
+
+
+def F_computeTrackFrame(audioFile, myCache=None, audioHash='', myAudio=None, config_s=config_s, wavFile=''):
+    """
+        Compute (or get from the cache) the C_trackFrame of a full track
+        myAudio: audio of the full track already decoded (F_readInput)
+        wavFile: wav file already decoded from audioFile (see F_loadAudio)
+    """
+
+    if myCache is not None:
+        key = myCache.M_key('frame', audioHash, {'hpss': HPSS_PARAM_d, 'config': config_s.ttb_s._asdict(), 'plan': TTB_PLAN_d})
+        myTrackFrame = myCache.M_get('frame', key)
+        if myTrackFrame is not None:
+            return myTrackFrame
+
+    if myAudio is None:
+        myAudio = F_loadAudio(audioFile, myCache, audioHash, exec_d=config_s.exec_d, wavFile=wavFile)
+    myTrackFrame = C_trackFrame(myAudio, config_s)
+
+    if myCache is not None:
+        myCache.M_put('frame', key, myTrackFrame)
+    return myTrackFrame
+
+
+# --- TimbreToolbox features: TT<family>_<descriptor><statistic> (TTA_<dim><statistic> for the auto-correlation),
+#     <statistic>: a key of TTB_STAT_d or p<NN> for the NN-th percentile (e.g. TTM_Scp90)
+TTB_FAMILY_d = {'TTT': 'TEE', 'TTA': 'AS', 'TTF': 'ERBfft', 'TTG': 'ERBgam', 'TTH': 'Harmonic', 'TTM': 'STFTmag', 'TTP': 'STFTpow'}
+TTB_DESCRIPTOR_d = {'En': 'RMSEnv',
                     'Sd': 'SpecDecr', 'Sv': 'SpecVar', 'Fe': 'FrameErg', 'Sk': 'SpecKurt', 'Ss': 'SpecSpread', 'Sf': 'SpecFlat', 'Sw': 'SpecSkew', 'Sc': 'SpecCent', 'Sl': 'SpecSlope', 'Sr': 'SpecRollOff', 'St': 'SpecCrest',
                     'He': 'HarmErg', 'No': 'Noisiness', 'F0': 'F0', 'Ih': 'InHarm', 'Hd': 'HarmDev', 'T3': 'TriStim3'}
-        map3_d = {'mi': 'min', 'ma': 'max', 'me': 'mean', 'st': 'std'}
-
-        nom_d = ['TTT_Enmi', 'TTT_Enme', 'TTT_Enst']
-        for nom in nom_d:
-            family = map1_d[nom[0:3]]
-            descriptor = map2_d[nom[4:6]]
-            temporalModeling = map3_d[nom[6:]]
-            num = 0
-            #print("%s -> %s/%s/%s/%d" % (nom, family, descriptor, temporalModeling, num))
-            myResult[nom] = descHub_d[family][descriptor][temporalModeling][num]
+TTB_STAT_d = {'mi': 'min', 'ma': 'max', 'me': 'mean', 'st': 'std', 'md': 'median', 'iq': 'iqr', 'cr': 'crest'}
 
-        nom_d = ['TTA_01mi', 'TTA_01ma', 'TTA_02ma', 'TTA_02me', 'TTA_08mi', 'TTA_08me', 'TTA_12mi', 'TTA_12ma']
-        nom_d = []
-        for nom in nom_d:
-            family = 'AS'
-            descriptor = 'AutoCorr'
-            temporalModeling = map3_d[nom[6:]]
-            num = int(nom[4:6])-1
-            #print("%s -> %s/%s/%s/%d" % (nom, 'AS', 'AutoCorr', temporalModeling, num))
-            myResult[nom] = descHub_d[family][descriptor][temporalModeling][num]
+# --- exported TimbreToolbox features (in output order)
+TTB_FEATURE_l = ['TTT_Enmi', 'TTT_Enme', 'TTT_Enst',
+                 #'TTA_01mi', 'TTA_01ma', 'TTA_02ma', 'TTA_02me', 'TTA_08mi', 'TTA_08me', 'TTA_12mi', 'TTA_12ma',
+                 #'TTF_Sdme', 'TTF_Svma', 'TTF_Svme', 'TTF_Femi', 'TTF_Fema', 'TTF_Feme', 'TTF_Fest', 'TTF_Sfme',
+                 #'TTG_Fema', 'TTG_Feme', 'TTG_Fest', 'TTG_Skst', 'TTG_Ssme', 'TTG_Svmi', 'TTG_Swme', 'TTG_Swst',
+                 #'TTH_Heme', 'TTH_Noma', 'TTH_Nome', 'TTH_Nost', 'TTH_F0st', 'TTH_Ihma', 'TTH_Ihst', 'TTH_Scmi', 'TTH_Scst', 'TTH_Slma', 'TTH_Slme', 'TTH_Slmi', 'TTH_Slst', 'TTH_Svme', 'TTH_Svst', 'TTH_Swmi', 'TTH_T3me', 'TTH_T3st', 'TTH_Hdma', 'TTH_Hdme',
+                 'TTM_Fema', 'TTM_Feme', 'TTM_Fest', 'TTM_Scme', 'TTM_Sdmi', 'TTM_Sfma', 'TTM_Skme', 'TTM_Slme', 'TTM_Srme', 'TTM_Srst', 'TTM_Ssme', 'TTM_Ssmi', 'TTM_Stma', 'TTM_Stmi',
+                 'TTP_Fema', 'TTP_Femi', 'TTP_Fest', 'TTP_Sdst', 'TTP_Sfme', 'TTP_Slme', 'TTP_Srmi', 'TTP_Ssmi', 'TTP_Stmi', 'TTP_Stst', 'TTP_Svmi', 'TTP_Swst']
+
+
+def F_timbreAddress(nom):
+    """
+        Location of a TimbreToolbox feature in descHub_d: (family, descriptor, statistic, dimension)
+    """
+
+    family = TTB_FAMILY_d[nom[0:3]]
+    if nom[6] == 'p' and nom[7:].isdigit():
+        temporalModeling = nom[6:]
+    else:
+        temporalModeling = TTB_STAT_d[nom[6:]]
+    if family == 'AS':
+        return family, 'AutoCorr', temporalModeling, int(nom[4:6])-1
+    return family, TTB_DESCRIPTOR_d[nom[4:6]], temporalModeling, 0
 
-        nom_d = [#'TTF_Sdme', 'TTF_Svma', 'TTF_Svme', 'TTF_Femi', 'TTF_Fema', 'TTF_Feme', 'TTF_Fest', 'TTF_Sfme',
-                    #'TTG_Fema', 'TTG_Feme', 'TTG_Fest', 'TTG_Skst', 'TTG_Ssme', 'TTG_Svmi', 'TTG_Swme', 'TTG_Swst',
-                    #'TTH_Heme', 'TTH_Noma', 'TTH_Nome', 'TTH_Nost', 'TTH_F0st', 'TTH_Ihma', 'TTH_Ihst', 'TTH_Scmi', 'TTH_Scst', 'TTH_Slma', 'TTH_Slme', 'TTH_Slmi', 'TTH_Slst', 'TTH_Svme', 'TTH_Svst', 'TTH_Swmi', 'TTH_T3me', 'TTH_T3st', 'TTH_Hdma', 'TTH_Hdme',
-                    'TTM_Fema', 'TTM_Feme', 'TTM_Fest', 'TTM_Scme', 'TTM_Sdmi', 'TTM_Sfma', 'TTM_Skme', 'TTM_Slme', 'TTM_Srme', 'TTM_Srst', 'TTM_Ssme', 'TTM_Ssmi', 'TTM_Stma', 'TTM_Stmi',
-                    'TTP_Fema', 'TTP_Femi', 'TTP_Fest', 'TTP_Sdst', 'TTP_Sfme', 'TTP_Slme', 'TTP_Srmi', 'TTP_Ssmi', 'TTP_Stmi', 'TTP_Stst', 'TTP_Svmi', 'TTP_Swst']
-        for nom in nom_d:
-            family = map1_d[nom[0:3]]
-            descriptor = map2_d[nom[4:6]]
-            temporalModeling = map3_d[nom[6:]]
-            num = 0
+
+def F_planTimbre(feature_l=TTB_FEATURE_l):
+    """
+        Plan of the TimbreToolbox computation for a list of features:
+        plan_d[family][descriptor] = list of the statistics needed
+        (the families and descriptors which are not in the plan are not computed)
+    """
+
+    plan_d = {}
+    for nom in feature_l:
+        family, descriptor, temporalModeling, num = F_timbreAddress(nom)
+        stat_l = plan_d.setdefault(family, {}).setdefault(descriptor, [])
+        if temporalModeling not in stat_l:
+            stat_l.append(temporalModeling)
+    return plan_d
+
+
+TTB_PLAN_d = F_planTimbre(TTB_FEATURE_l)
+
+# --- numeric features of the output of F_computeOneFile but the tags (their names come from the dictionary of imdABCDJ):
+#     the fixed columns of the columnar sink (imdABCDJsink.C_columnarSink), whatever the results (degraded, Usage 1 or 2)
+HARD_FEATURE_l = ['ICS_Part_Sequence_Total', 'ICS_Part_Sequence_Unique',
+                  'ICB_Meter23', 'ICB_Meter32', 'ICB_BPM_Mean', 'ICB_BPM_SD', 'ICB_perc_norm', 'ICB_complex_norm', 'ICB_speed_norm_A', 'ICB_speed_norm_B', 'ICB_periodicity',
+                  'ICK_Key_Pcminor'] + ['ICK_Key_PC%d' % (x+1) for x in range(0, 11)] + \
+                 ['Chords_Num_01', 'Chords_Num_02', 'Chords_Mode_01', 'Chords_Mode_02', 'Chords_Mode_03', 'Chords_Func'] + [name for name, interval_l in PROGRESSION_l] + \
+                 ['Chords_TonicDist', 'MonoCompatibility', 'DecSinus', 'DecNoise', 'DecTrans', 'Sharpness_Mean', 'Sharpness_SD', 'Dist_Loud_Mean', 'Dist_Loud_SD',
+                  'MFCC_Band_01_MEAN', 'MFCC_Band_02_MEAN', 'MFCC_Band_03_MEAN', 'MFCC_Band_08_MEAN', 'MFCC_Band_09_MEAN', 'MFCC_Band_01_SD', 'MFCC_Band_02_SD', 'MFCC_Band_05_SD'] + \
+                 TTB_FEATURE_l + ['intensity', 'pop-appeal']
+
+
+def F_computeTimbre(descHub_d, myResult, feature_l=TTB_FEATURE_l):
+    """
+        Compute features from the TimbreToolbox (TTB)
+        descHub_d contains the time series computed by peeTimbreToolbox.F_computeAllDescriptor
+        (the features of the families which are not in descHub_d, skipped by C_deadline, are None, as the statistics
+        undefined for their series, see peeTimbreToolbox.F_computeStatistic)
+        feature_l: features to compute (e.g. from the time series of imdABCDJseries)
+    """
+
+    plan_d = TTB_PLAN_d
+    if feature_l is not TTB_FEATURE_l:
+        plan_d = F_planTimbre(feature_l)
+    with F_stage('temporalModeling'):
+        descHub_d = peeTimbreToolbox.F_temporalModeling(descHub_d, plan_d)
+
+    if True:
+
+        for nom in feature_l:
+            family, descriptor, temporalModeling, num = F_timbreAddress(nom)
             #print("%s -> %s/%s/%s/%d" % (nom, family, descriptor, temporalModeling, num))
+            # --- (a statistic undefined for the series, e.g. the crest of a single frame, is None too)
+            if family not in descHub_d or descriptor not in descHub_d[family] or temporalModeling not in descHub_d[family][descriptor]:
+                myResult[nom] = None
+                continue
             myResult[nom] = descHub_d[family][descriptor][temporalModeling][num]
 
     else:
@@ -222,44 +820,25 @@ def F_computeTimbre(audioFile, outTTBFile, myResult):
     return myResult
 
 
-def F_parseStruct(jsonData, myResult, startExtract=-1., stopExtract=--1.):
+def F_parseStruct(myDescription, myResult, startExtract=-1., stopExtract=--1.):
     """
         Compute features related to structure
     """
 
-    struct_l = []
-
-    if type(jsonData['musicdescription']['segment']) is list:
-        """ there are several segments => list """
-
-        if (startExtract > -1.) and (stopExtract > -1.):
-            """ Look for segment changes in the interval [start, stop] """
-            seg_l = []
-            for seg in jsonData['musicdescription']['segment']:
-                if 'structtype' in seg.keys():
-                    start = float(seg['@time'])
-                    stop = float(seg['@time']) + float(seg['@length'])
-                    if (startExtract <= start) & (start <= stopExtract):
-                        # the segment starts in [startExtract, stopExtract]
-                        seg_l.append(seg)
-                    elif (startExtract <= stop) & (stop <= stopExtract):
-                        # the segment stops in [startExtract, stopExtract]
-                        seg_l.append(seg)
-                    elif (start < startExtract) & (stopExtract < stop):
-                        # the segment crosses [startExtract, stopExtract] without stopping
-                        seg_l.append(seg)
-        else:
-            seg_l = [seg for seg in jsonData['musicdescription']['segment'] if ('structtype' in seg.keys())]
-
-
-        nbSeg = len(seg_l)
-        for numSeg in range(0, nbSeg):
-            struct_l.append( seg_l[numSeg]['structtype']['@value'] )
-
-    else:
-        """ there is only one segment => no list """
-
-        struct_l.append(jsonData['musicdescription']['segment']['structtype']['@value'])
+    seg_d = myDescription.M_segment('structtype')
+    struct_l = seg_d['value_l']
+
+    if (startExtract > -1.) and (stopExtract > -1.):
+        """ Look for segment changes in the interval [start, stop] """
+        start_v = seg_d['time_v']
+        stop_v = seg_d['time_v'] + seg_d['length_v']
+        # the segment starts in [startExtract, stopExtract]
+        # or the segment stops in [startExtract, stopExtract]
+        # or the segment crosses [startExtract, stopExtract] without stopping
+        keep_v = ((startExtract <= start_v) & (start_v <= stopExtract)) \
+                 | ((startExtract <= stop_v) & (stop_v <= stopExtract)) \
+                 | ((start_v < startExtract) & (stopExtract < stop_v))
+        struct_l = [struct_l[numSeg] for numSeg in np.flatnonzero(keep_v)]
 
     myResult['ICS_Part_Sequence_Total'] = len(struct_l)
     myResult['ICS_Part_Sequence_Unique'] = len(set(struct_l))
@@ -267,39 +846,41 @@ def F_parseStruct(jsonData, myResult, startExtract=-1., stopExtract=--1.):
     return myResult
 
 
-def F_parseRhythm(jsonData, myResult):
+def F_parseRhythm(myDescription, myResult):
     """
         Compute features related to rhythm
     """
 
-    ###myResult['IRC_Length'] = float(jsonData['musicdescription']['global']['@length'])
-    ###myResult['ICB_Meter'] = jsonData['musicdescription']['global']['rhythmtype']['meter']
+    rhythm_d = myDescription.global_d['rhythmtype']
+
+    ###myResult['IRC_Length'] = myDescription.length_sec
+    ###myResult['ICB_Meter'] = rhythm_d['meter']
 
     myResult['ICB_Meter23'] = myResult['ICB_Meter32'] = 0
-    if jsonData['musicdescription']['global']['rhythmtype']['meter'] == '23':
+    if rhythm_d['meter'] == '23':
         myResult['ICB_Meter23'] = 1
-    if jsonData['musicdescription']['global']['rhythmtype']['meter'] == '32':
+    if rhythm_d['meter'] == '32':
         myResult['ICB_Meter32'] = 1
 
-    myResult['ICB_BPM_Mean'] = float(jsonData['musicdescription']['global']['rhythmtype']['bpm_mean'])
-    myResult['ICB_BPM_SD'] = float(jsonData['musicdescription']['global']['rhythmtype']['bpm_std'])
-    myResult['ICB_perc_norm'] = float(jsonData['musicdescription']['global']['rhythmtype']['percussivity'])
-    myResult['ICB_complex_norm'] = float(jsonData['musicdescription']['global']['rhythmtype']['complexity'])
-    myResult['ICB_speed_norm_A'] = float(jsonData['musicdescription']['global']['rhythmtype']['speedA'])
-    myResult['ICB_speed_norm_B'] = float(jsonData['musicdescription']['global']['rhythmtype']['speedB'])
-    myResult['ICB_periodicity'] = float(jsonData['musicdescription']['global']['rhythmtype']['periodicity'])
+    myResult['ICB_BPM_Mean'] = float(rhythm_d['bpm_mean'])
+    myResult['ICB_BPM_SD'] = float(rhythm_d['bpm_std'])
+    myResult['ICB_perc_norm'] = float(rhythm_d['percussivity'])
+    myResult['ICB_complex_norm'] = float(rhythm_d['complexity'])
+    myResult['ICB_speed_norm_A'] = float(rhythm_d['speedA'])
+    myResult['ICB_speed_norm_B'] = float(rhythm_d['speedB'])
+    myResult['ICB_periodicity'] = float(rhythm_d['periodicity'])
     ###myResult['AccentStruct'] = -999
 
     return myResult
 
 
-def F_parseKeyMode(jsonData, myResult, myHarmonicInformation):
+def F_parseKeyMode(myDescription, myResult, myHarmonicInformation):
     """
         Compute features related to key and mode
     """
 
-    key = jsonData['musicdescription']['global']['harmonictype']['key']
-    mode = jsonData['musicdescription']['global']['harmonictype']['mode']
+    key = myDescription.global_d['harmonictype']['key']
+    mode = myDescription.global_d['harmonictype']['mode']
 
     myResult['ICK_Key_PC'] = myHarmonicInformation.keyName_l.index(key+mode)
     ###myResult['ICK_Key_KN'] = key
@@ -328,31 +909,17 @@ def F_isIntervalDown(rootNotePrev, rootNoteNext, nbHalfDown):
     return ((rootNotePrev - rootNoteNext) == nbHalfDown) | ((rootNoteNext - rootNotePrev) == (12-nbHalfDown))
 
 
-def F_parseChord(jsonData, myResult, myHarmonicInformation):
+def F_parseChord(myDescription, myResult, myHarmonicInformation):
     """
         Compute features derived from chord estimation (ircamchord)
     """
 
     do_verbose = False
 
-    duration_sec = float(jsonData['musicdescription']['global']['@length'])
-    samplingRate = float(jsonData['musicdescription']['global']['@samplingrate'])
-
-    chord_l = []
-    if type(jsonData['musicdescription']['segment']) is list:
-        seg_l = [seg for seg in jsonData['musicdescription']['segment'] if 'chordtype' in seg.keys()]
-
-        nbSeg = len(seg_l)
-
-        for numSeg in range(0, nbSeg):
-            seg_l[numSeg]['@time']
-            seg_l[numSeg]['@length']
-            chord_l.append(seg_l[numSeg]['chordtype']['@value'])
+    duration_sec = myDescription.length_sec
+    samplingRate = myDescription.samplingRate
 
-    else: # --- there is only one segment
-        jsonData['musicdescription']['segment']['@time']
-        jsonData['musicdescription']['segment']['@length']
-        chord_l.append(jsonData['musicdescription']['segment']['chordtype']['@value'])
+    chord_l = myDescription.M_segment('chordtype')['value_l']
 
     nbChord = 1.0*len(chord_l)
     nbUniqChord = 1.0*len(set(chord_l))
@@ -385,9 +952,8 @@ def F_parseChord(jsonData, myResult, myHarmonicInformation):
     """ Ratio of functional chords / non-functional chords.
     Functional is defined as root note of the chord is on the degree I, ii, iii, IV, V or iv
     where song key mode is 'major or root note of chord is on degree i, III, iv, v, V, VI or VII where song key mode is "minor". """
-    nbChordInKey = 0.0
-    for chord in chord_l:
-        nbChordInKey += myHarmonicInformation.matChordKey_m[myHarmonicInformation.chordName_l.index(chord), myResult['ICK_Key_PC']]
+    chordIndex_v = np.array([myHarmonicInformation.chordIndex_d[chord] for chord in chord_l], int)
+    nbChordInKey = float(np.sum(myHarmonicInformation.matChordKey_m[chordIndex_v, myResult['ICK_Key_PC']]))
     #myResult['Chords_Func'] = nbChordInKey / (nbChord-nbChordInKey)
     myResult['Chords_Func'] = nbChordInKey / (nbChord)
 
@@ -407,181 +973,87 @@ def F_parseChord(jsonData, myResult, myHarmonicInformation):
     #chord_l = ['Dmaj', 'Gmaj', 'Cmaj']
     #chord_l = ['Amaj', 'Fmaj', 'Cmaj', 'Amaj', 'Fmaj', 'Cmaj', 'Cmaj', 'Amaj', 'Amaj', 'Fmaj', 'Cmaj', 'Cmaj', 'Amaj']
 
-    """ Perfect cadence type 1: Ratio of total number of successions [5, 1] / total
+    """ Cadences and turnarounds (see PROGRESSION_l): Ratio of total number of successions / total
     number of harmony changes (i.e. two subsequent chords having a different root note) """
-    """ count number of V -> I """
-    rootNoteChanges = 0
-    count = 0
-    for numChord in range(1, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        rootNoteChanges += rootNote2 != rootNote1
-
-        if F_isIntervalDown(rootNote1, rootNote2, 7):
-            if do_verbose: print "(%d) V -> I: %s -> %s" % (numChord, chord_l[numChord-1], chord_l[numChord])
-            count += 1
+    rootNote_v = chordIndex_v % 12
 
+    rootNoteChanges = int(np.sum(np.diff(rootNote_v) != 0))
     if rootNoteChanges==0: rootNoteChanges = 1
 
-    myResult['Chords_Cad_01'] = 1.0*count / (1.0*rootNoteChanges)
-
-    """ count number of IV -> V -> I """
-    count = 0
-    for numChord in range(2, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-2]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote3 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        if F_isIntervalDown(rootNote1, rootNote2, 10) & F_isIntervalDown(rootNote2, rootNote3, 7):
-            if do_verbose: print "(%d) IV -> V -> I: %s -> %s -> %s" % (numChord, chord_l[numChord-2], chord_l[numChord-1], chord_l[numChord])
-            count += 1
-
-    myResult['Chords_Cad_02'] = 1.0*count / (1.0*rootNoteChanges)
-
-    """ count number of II -> V -> I """
-    count = 0
-    for numChord in range(2, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-2]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote3 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        if F_isIntervalDown(rootNote1, rootNote2, 7) & F_isIntervalDown(rootNote2, rootNote3, 7):
-            if do_verbose: print "(%d) II -> V -> I: %s -> %s -> %s" % (numChord, chord_l[numChord-2], chord_l[numChord-1], chord_l[numChord])
-            count += 1
-
-    myResult['Chords_Cad_03'] = 1.0*count / (1.0*rootNoteChanges)
-
-    """ count number of VI -> II -> V -> I """
-    count = 0
-    for numChord in range(3, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-3]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord-2]) % 12
-        rootNote3 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote4 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        if F_isIntervalDown(rootNote1, rootNote2, 7) & F_isIntervalDown(rootNote2, rootNote3, 7) & F_isIntervalDown(rootNote3, rootNote4, 7):
-            if do_verbose: print "(%d) VI -> II -> V -> I: %s -> %s -> %s -> %s" % (numChord, chord_l[numChord-3], chord_l[numChord-2], chord_l[numChord-1], chord_l[numChord])
-            count += 1
-
-    myResult['Chords_Turn_01'] = 1.0*count / (1.0*rootNoteChanges)
-
-    """ count number of 1, 4, 1, 5, 4, 1 """
-    count = 0
-    for numChord in range(5, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-5]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord-4]) % 12
-        rootNote3 = myHarmonicInformation.chordName_l.index(chord_l[numChord-3]) % 12
-        rootNote4 = myHarmonicInformation.chordName_l.index(chord_l[numChord-2]) % 12
-        rootNote5 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote6 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        if F_isIntervalDown(rootNote1, rootNote2, 7) & F_isIntervalDown(rootNote2, rootNote3, 5) & F_isIntervalDown(rootNote3, rootNote4, 5) & F_isIntervalDown(rootNote4, rootNote5, 2) & F_isIntervalDown(rootNote5, rootNote6, 5):
-            if do_verbose: print "(%d) 1, 4, 1, 5, 4, 1: %s -> %s -> %s -> %s -> %s -> %s" % (numChord, chord_l[numChord-5], chord_l[numChord-4], chord_l[numChord-3], chord_l[numChord-2], chord_l[numChord-1], chord_l[numChord])
-            count += 1
-
-    myResult['Chords_Turn_02'] = 1.0*count / (1.0*rootNoteChanges)
-
-    """ count number of I ->V -> II -> IV """
-    count = 0
-    for numChord in range(3, len(chord_l)):
-        rootNote1 = myHarmonicInformation.chordName_l.index(chord_l[numChord-3]) % 12
-        rootNote2 = myHarmonicInformation.chordName_l.index(chord_l[numChord-2]) % 12
-        rootNote3 = myHarmonicInformation.chordName_l.index(chord_l[numChord-1]) % 12
-        rootNote4 = myHarmonicInformation.chordName_l.index(chord_l[numChord]) % 12
-
-        if F_isIntervalDown(rootNote1, rootNote2, 5) & F_isIntervalDown(rootNote2, rootNote3, 5) & F_isIntervalDown(rootNote3, rootNote4, 9):
-            if do_verbose: print "(%d) I ->V -> II -> IV: %s -> %s -> %s -> %s" % (numChord, chord_l[numChord-3], chord_l[numChord-2], chord_l[numChord-1], chord_l[numChord])
-            count += 1
-
-    myResult['Chords_Turn_03'] = 1.0*count / (1.0*rootNoteChanges)
+    count_v = PROGRESSION_MATCHER.M_count(rootNote_v)
+    for name, count in zip(PROGRESSION_MATCHER.name_l, count_v):
+        if do_verbose: print "%s: %d" % (name, count)
+        myResult[name] = 1.0*count / (1.0*rootNoteChanges)
 
 
     firstDegree = myResult['ICK_Key_PC'] % 12
-    rootNote_l = [myHarmonicInformation.chordName_l.index(chord) % 12 for chord in chord_l]
 
     """ compute average length between two successive tonics """
-    length_l = F_getInterval(rootNote_l, firstDegree, do_verbose)
+    length_l = F_getInterval(rootNote_v, firstDegree, do_verbose)
     if len(length_l) & False:
-        myResult['Chords_TonicDist'] = sum(length_l) / len(length_l)
+        myResult['Chords_TonicDist'] = sum(length_l) // len(length_l)
     else:
         #myResult['Chords_TonicDist'] = -999
         # Get most frequency chord
-        count_v = np.zeros(12,)
-        for numChord in range(0, len(rootNote_l)): count_v[rootNote_l[numChord]] = count_v[rootNote_l[numChord]] + 1
+        count_v = np.bincount(rootNote_v, minlength=12)
         firstDegree = np.argmax(count_v)
-        length_l = F_getInterval(rootNote_l, firstDegree, do_verbose)
+        length_l = F_getInterval(rootNote_v, firstDegree, do_verbose)
         if len(length_l)==0:
             myResult['Chords_TonicDist'] = 0
         else:
-            myResult['Chords_TonicDist'] = sum(length_l) / len(length_l)
+            myResult['Chords_TonicDist'] = sum(length_l) // len(length_l)
 
     return myResult
 
 
-def F_getInterval(rootNote_l, firstDegree, do_verbose):
+def F_getInterval(rootNote_v, firstDegree, do_verbose):
     """
         Compute the length between two successive tonics chords
     """
 
-    start = -1
-    length_l = []
-    for numChord in range(0, len(rootNote_l)):
-        if rootNote_l[numChord] == firstDegree:
-            if start == -1:
-                start = numChord
-            else:
-                stop = numChord
-                length_l.append(stop-start)
-                if do_verbose: print length_l
-                start = numChord
+    length_l = [int(length) for length in np.diff(np.flatnonzero(np.asarray(rootNote_v) == firstDegree))]
+    if do_verbose: print length_l
     return length_l
 
 
 
 
-def F_computeMfcc(jsonData, myResult):
+def F_computeMfcc(myDescription, myResult):
     """
         Compute MFCC features
     """
 
-    mean_v = [float(aaa) for aaa in jsonData['musicdescription']['global']['lowleveltype'][3]['#text'].split(' ')]
+    mean_v = myDescription.lowlevel_l[3]
     list_l = ['MFCC_Band_01_MEAN', 'MFCC_Band_02_MEAN', 'MFCC_Band_03_MEAN', 'MFCC_Band_04_MEAN', 'MFCC_Band_05_MEAN', 'MFCC_Band_06_MEAN', 'MFCC_Band_07_MEAN', 'MFCC_Band_08_MEAN', 'MFCC_Band_09_MEAN', 'MFCC_Band_10_MEAN', 'MFCC_Band_11_MEAN', 'MFCC_Band_12_MEAN', 'MFCC_Band_13_MEAN']
     #for num in range(0, 12):
     #for num in range(0, 13):
     for num in [0,1,2,7,8]:
-        myResult[list_l[num]] = mean_v[num]
+        myResult[list_l[num]] = float(mean_v[num])
 
-    std_v = [float(aaa) for aaa in jsonData['musicdescription']['global']['lowleveltype'][4]['#text'].split(' ')]
+    std_v = myDescription.lowlevel_l[4]
     list_l = ['MFCC_Band_01_SD', 'MFCC_Band_02_SD', 'MFCC_Band_03_SD', 'MFCC_Band_04_SD', 'MFCC_Band_05_SD', 'MFCC_Band_06_SD', 'MFCC_Band_07_SD', 'MFCC_Band_08_SD', 'MFCC_Band_09_SD', 'MFCC_Band_10_SD', 'MFCC_Band_11_SD', 'MFCC_Band_12_SD', 'MFCC_Band_13_SD']
     #for num in range(0, 12):
     #for num in range(0, 13):
     for num in [0,1,4]:
-        myResult[list_l[num]] = std_v[num]
+        myResult[list_l[num]] = float(std_v[num])
 
     return myResult
 
 
-def F_parseTag(jsonData, myResult):
+def F_parseTag(myDescription, myResult):
     """
         Parse Tag (genre, mood, ...) information
     """
 
-    myLocalResult = OrderedDict()
-
     list_l = ['genre', 'instrumentation', 'intensity', 'pop-appeal', 'styles', 'timbre', 'vocals-1', 'vocals-2']
     for numDD in range(0,8):
-        oneDescriptionDefinition = jsonData['musicdescription']['descriptiondefinition'][numDD+4]
-        label_l = [label['@name'] for label in oneDescriptionDefinition['dictionary']['label']]
-        ID = oneDescriptionDefinition['@id']
+        ID, label_l = myDescription.descriptionDefinition_l[numDD+4]
         # print list_l[numDD]
         # print label_l
 
-        tagtype_l = [tagtype for tagtype in jsonData['musicdescription']['global']['tagtype'] if tagtype['@id']==ID]
         value_l = []
         for label in label_l:
-            subtagtype_l = [subtagtype for subtagtype in tagtype_l if subtagtype['@value'] == label]
-            confidence = float(subtagtype_l[0]['@confidence'])
+            confidence = myDescription.tagtype_d[(ID, label)]
             myResult[list_l[numDD] + '-' + label.replace('&','N')] = confidence
             value_l.append(confidence)
 
@@ -593,143 +1065,365 @@ def F_parseTag(jsonData, myResult):
     return myResult
 
 
-def F_decodeAndCompute(audioFile, TMP_DIR):
+class C_imdJob:
+    """
+        class definition for the imdABCDJ analysis of an audio file, run in the background
+        The executable is started by __init__ (if its XML is neither in the cache nor in TMP_DIR),
+        M_wait waits for it and parses the XML: the audio-only stages can run in between
+        The temporary files are named after the content of audioFile (and the executables used),
+        so that a file found in TMP_DIR is always a valid result
+        mp3/flac files are decoded to a temporary wav file for imdABCDJ (removed afterwards); until M_wait, F_loadAudio
+        reads it (M_wavFile) instead of decoding the file again
+    """
+
+    info_d = {}
+    xmlKey = ''
+    tmpXmlFile = ''
+    processAudioFile = ''
+    process = None
+    myCache = None
+
+    def __init__(self, audioFile, TMP_DIR, myCache=None, exec_d=exec_d):
+        if not os.path.exists(TMP_DIR):
+            os.makedirs(TMP_DIR)
+
+        rootFileExtract = audioFile.split('/')[-1]
+        audioHash = imdABCDJcache.F_hashFile(audioFile)
+
+        self.xmlKey = imdABCDJcache.F_key('xml', audioHash, {'imdABCDJ': exec_d['imdABCDJ']})
+        xmlFile = TMP_DIR + self.xmlKey + '.imd.xml'
+        jsonFile = TMP_DIR + rootFileExtract + '.hardFeatures.json'
+        self.info_d = {'audioFile': audioFile, 'audioHash': audioHash, 'xmlFile': xmlFile, 'description': None, 'jsonFile': jsonFile}
+        self.myCache = myCache
+        # --- two jobs may analyse the same content at the same time (same xmlFile): each one writes its own temporary file
+        self.tmpXmlFile = '%s.%d-%d.tmp' % (xmlFile, os.getpid(), id(self))
+        self.processAudioFile = ''
+        self.process = None
+
+        if myCache is not None:
+            self.info_d['description'] = myCache.M_get('xml', self.xmlKey)
+
+        if self.info_d['description'] is None and os.path.exists(xmlFile) is False:
+            self.processAudioFile = audioFile
+            decoder_l = F_decoder(audioFile, exec_d)
+            try:
+                if len(decoder_l):
+                    self.processAudioFile = '%s-%d-%d-converted.wav' % (TMP_DIR + self.xmlKey, os.getpid(), id(self))
+                    with F_stage('decode'):
+                        with open(self.processAudioFile, 'wb') as fid:
+                            subprocess.check_call(decoder_l + [audioFile], stdout=fid)
+                self.process = subprocess.Popen([exec_d['imdABCDJ'], '-i', self.processAudioFile, '-o', self.tmpXmlFile])
+            except Exception:
+                self.M_cancel()
+                raise
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_wavFile(self):
+        """
+            Temporary wav file decoded from audioFile for imdABCDJ ('' if audioFile is a wav file, or imdABCDJ is not run)
+        """
+
+        if self.processAudioFile != self.info_d['audioFile'] and os.path.exists(self.processAudioFile):
+            return self.processAudioFile
+        return ''
+
+
+    def M_wait(self):
+        """
+            Wait for imdABCDJ and parse its XML
+            Return info_d = {'audioFile', 'audioHash', 'xmlFile', 'description', 'jsonFile'}
+        """
+
+        if self.info_d['description'] is not None:
+            return self.info_d
+
+        xmlFile = self.info_d['xmlFile']
+        if self.process is not None:
+            # --- only the time spent waiting for the executable is measured
+            with F_stage('imdABCDJ'):
+                returnCode = self.process.wait()
+            self.process = None
+            self.M_cancel()
+            if returnCode != 0:
+                raise Exception("imdABCDJ failed (%d) on '%s'" % (returnCode, self.info_d['audioFile']))
+            if not os.path.exists(self.tmpXmlFile):
+                raise Exception("imdABCDJ wrote no output for '%s' (expected '%s')" % (self.info_d['audioFile'], self.tmpXmlFile))
+            os.rename(self.tmpXmlFile, xmlFile)
+
+        with F_stage('xml'):
+            self.info_d['description'] = imdABCDJxml.F_parseXml(xmlFile)
+        if self.myCache is not None:
+            self.myCache.M_put('xml', self.xmlKey, self.info_d['description'])
+        return self.info_d
+
+
+    def M_cancel(self):
+        """
+            Stop imdABCDJ if it is still running and remove the temporary wav file
+        """
+
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+            if os.path.exists(self.tmpXmlFile):
+                os.remove(self.tmpXmlFile)
+        if self.processAudioFile != self.info_d['audioFile'] and os.path.exists(self.processAudioFile):
+            os.remove(self.processAudioFile)
+        return
+
+
+def F_decodeAndCompute(audioFile, TMP_DIR, myCache=None, exec_d=exec_d):
     """
-        Perform the audio decoding (mp3 to wav), imdABCDJ computation and assign the filepaths
+        Perform the imdABCDJ computation and assign the filepaths (see C_imdJob)
     """
 
-    if not os.path.exists(TMP_DIR):
-        os.makedirs(TMP_DIR)
+    myJob = C_imdJob(audioFile, TMP_DIR, myCache, exec_d)
+    try:
+        return myJob.M_wait()
+    finally:
+        myJob.M_cancel()
 
-    rootFileExtract = audioFile.split('/')[-1]
 
-    if audioFile.endswith('.mp3'):
-        processAudioFile = TMP_DIR + rootFileExtract.replace('.mp3', '-converted.wav')
-        if not os.path.isfile(processAudioFile):
-            os.system('%s -w "%s" "%s"' % (exec_d['MPG123'], processAudioFile, audioFile))
-        audioFile = processAudioFile
+def F_readInput(audioFileFull='', audioFileExtract='', xmlFile='', startExtract=-1., stopExtract=-1., myCache=None, sliceExtract=False, config_s=config_s):
+    """
+        Read the inputs of F_computeOneFile (the I/O part of the job): parse xmlFile and decode the audio it needs
+        (the excerpt [startExtract, stopExtract[, or the full track with sliceExtract)
+        Return input_d {'description', 'audioHash', 'myAudio'} to be given to F_computeOneFile,
+        or None for Usage 1 (the files are read by the imdABCDJ binary)
+    """
 
-    xmlFile = TMP_DIR + rootFileExtract + '.imd.xml'
-    pickleFile = TMP_DIR + rootFileExtract + '.ttb.pickle'
-    jsonFile = TMP_DIR + rootFileExtract + '.hardFeatures.json'
+    if len(audioFileExtract):
+        return None
 
-    if os.path.exists(xmlFile) is False:
-        os.system('%s -i "%s" -o "%s"' % (exec_d['imdABCDJ'], audioFile, xmlFile))
-    with open(xmlFile, 'r') as f:
-        xmlData = f.read()
-    jsonData = xmltodict.parse(xmlData)
+    audioHash = ''
+    if myCache is not None:
+        audioHash = imdABCDJcache.F_hashFile(audioFileFull)
+    window_t = (-1., -1.)
+    if startExtract >= 0 and not sliceExtract:
+        window_t = (startExtract, stopExtract)
 
-    info_d = {'audioFile': audioFile, 'xmlFile': xmlFile, 'jsonData': jsonData, 'pickleFile': pickleFile, 'jsonFile':jsonFile}
-    return info_d
+    return {'description': imdABCDJxml.F_parseXml(xmlFile),
+            'audioHash': audioHash,
+            'myAudio': F_loadAudio(audioFileFull, myCache, audioHash, window_t, config_s.exec_d)}
 
 
-def F_computeOneFile(audioFileFull='', audioFileExtract='', xmlFile='', startExtract=-1., stopExtract=-1, jsonFile='', TMP_DIR=''):
+def F_computeOneFile(audioFileFull='', audioFileExtract='', xmlFile='', startExtract=-1., stopExtract=-1, jsonFile='', TMP_DIR='', myCache=None, profileFile='', mySink=None,
+                     sliceExtract=False, input_d=None, budget_sec=0., do_parallel=False, config_s=config_s, mySeries=None):
     """
         Compute features for a single (pair of) audioFile (full duration and extract)
+        myCache: optional imdABCDJcache.C_cache for the intermediate results
+        profileFile: optional json sidecar in which the wall/cpu time and memory of each stage are written
+        mySink: optional imdABCDJsink where myResult is written (default: jsonFile)
+        startExtract, stopExtract: with xmlFile, HPSS and TimbreToolbox are only computed on this excerpt of audioFileFull
+            (a .wav file: the samples are read directly, the rest of the track is never loaded);
+            the features parsed from xmlFile remain those of the whole track
+        sliceExtract: HPSS and TimbreToolbox of the extract are obtained by slicing the frame-level results of audioFileFull
+            at [startExtract, stopExtract[ (C_trackFrame, computed once per full track and kept in myCache)
+            instead of analysing the extract
+        input_d: inputs already read by F_readInput (with the same arguments)
+        budget_sec: if > 0, time budget of the job (see C_deadline): when the projected cost of HPSS and TimbreToolbox exceeds
+            the remaining time, they are degraded and the degraded features are listed in myResult['degradation']
+            (the C_trackFrame of sliceExtract is never degraded)
+        do_parallel: low-latency mode, HPSS and TimbreToolbox are computed in parallel (see F_computeAudioStage)
+        config_s: hard_settings of the extraction (its TMP_DIR is not used: see TMP_DIR)
+        mySeries: optional imdABCDJseries.C_seriesStore where the TimbreToolbox time series are written
+            (unless they are degraded by budget_sec)
     """
 
-    import time
-    t = time.time()
+    if len(profileFile):
+        imdABCDJprofile.F_enable({'audioFileFull': audioFileFull, 'audioFileExtract': audioFileExtract, 'jsonFile': jsonFile})
+    # --- the profiler is disabled even if the job fails: its records would be those of the next job of the process
+    try:
+        myResult = OrderedDict()
+        myHarmonicInformation = C_harmonicInformation()
+        hpss_t, descHub_d = None, None
+        if input_d is None:
+            input_d = {}
+        myDeadline = None
+        if budget_sec > 0:
+            myDeadline = C_deadline(budget_sec)
+
+        if len(audioFileFull) and len(audioFileExtract):
+            """
+                Usage 1: F_computeOneFile(audioFileFull, audioFileExtract, start, stop, jsonFile)
+                    extract the content from audioFileFull for structure and map it (using start and stop) to audioFileExtract
+                    extract the rest of the content from audioFileExtract
+            """
+            # --- the jobs are created in the try: if the second one fails to start, the first one is stopped
+            job_l = []
+            try:
+                fullJob = C_imdJob(audioFileFull, TMP_DIR, myCache, config_s.exec_d)
+                job_l.append(fullJob)
+                extractJob = C_imdJob(audioFileExtract, TMP_DIR, myCache, config_s.exec_d)
+                job_l.append(extractJob)
+                """ HPSS and TimbreToolbox only need the audio: computed while imdABCDJ is running (from the wav decoded for it) """
+                if sliceExtract:
+                    myTrackFrame = F_computeTrackFrame(fullJob.info_d['audioFile'], myCache, fullJob.info_d['audioHash'], config_s=config_s, wavFile=fullJob.M_wavFile())
+                    hpss_t, descHub_d = myTrackFrame.M_slice(startExtract, stopExtract)
+                else:
+                    hpss_t, descHub_d = F_computeAudioStage(extractJob.info_d['audioFile'], myCache, extractJob.info_d['audioHash'], myDeadline=myDeadline, do_parallel=do_parallel, config_s=config_s,
+                                                            wavFile=extractJob.M_wavFile())
+                full_d = fullJob.M_wait()
+                extract_d = extractJob.M_wait()
+            finally:
+                for myJob in job_l:
+                    myJob.M_cancel()
+            myResult['filepath'] = audioFileExtract
+
+            """ STRUCTURE """
+            myResult = F_parseStruct(full_d['description'], myResult, startExtract, stopExtract)
+            data_d = extract_d
+
+        elif False:
+            """
+            Usage 2: F_computeOneFile(audioFileFull, jsonFile)
+                extract the content of the whole audioFileFull
+            """
+
+            full_d = F_decodeAndCompute(audioFileFull, TMP_DIR, myCache, config_s.exec_d)
+            myResult['filepath'] = audioFileFull
+
+            """ STRUCTURE """
+            ###myResult = F_parseStruct(full_d['description'], myResult)
+            data_d = full_d
+
+        else:
+            if 'description' in input_d:
+                myDescription = input_d['description']
+                audioHash = input_d['audioHash']
+            else:
+                with F_stage('xml'):
+                    myDescription = imdABCDJxml.F_parseXml(xmlFile)
+
+                audioHash = ''
+                if myCache is not None:
+                    audioHash = imdABCDJcache.F_hashFile(audioFileFull)
 
-    myResult = OrderedDict()
-    myHarmonicInformation = C_harmonicInformation()
+            full_d = {'audioFile': audioFileFull, 'audioHash': audioHash, 'xmlFile': xmlFile, 'description': myDescription, 'jsonFile':jsonFile}
+            if startExtract >= 0:
+                full_d['window_t'] = (startExtract, stopExtract)
+                if sliceExtract:
+                    myTrackFrame = F_computeTrackFrame(audioFileFull, myCache, audioHash, input_d.get('myAudio'), config_s)
+                    hpss_t, descHub_d = myTrackFrame.M_slice(startExtract, stopExtract)
 
-    if len(audioFileFull) and len(audioFileExtract):
-        """
-            Usage 1: F_computeOneFile(audioFileFull, audioFileExtract, start, stop, jsonFile)
-                extract the content from audioFileFull for structure and map it (using start and stop) to audioFileExtract
-                extract the rest of the content from audioFileExtract
-        """
-        full_d = F_decodeAndCompute(audioFileFull, TMP_DIR)
-        extract_d = F_decodeAndCompute(audioFileExtract, TMP_DIR)
-        myResult['filepath'] = audioFileExtract
+            myResult['filepath'] = audioFileFull
 
-        """ STRUCTURE """
-        myResult = F_parseStruct(full_d['jsonData'], myResult, startExtract, stopExtract)
-        data_d = extract_d
+            """ STRUCTURE """
+            ###myResult = F_parseStruct(full_d['description'], myResult)
+            data_d = full_d
 
-    elif False:
-        """
-        Usage 2: F_computeOneFile(audioFileFull, jsonFile)
-            extract the content of the whole audioFileFull
-        """
 
-        full_d = F_decodeAndCompute(audioFileFull, TMP_DIR)
-        myResult['filepath'] = audioFileFull
+        """ BEAT """
+        myResult = F_parseRhythm(data_d['description'], myResult)
 
-        """ STRUCTURE """
-        ###myResult = F_parseStruct(full_d['jsonData'], myResult)
-        data_d = full_d
+        """ KEY """
+        myResult = F_parseKeyMode(data_d['description'], myResult, myHarmonicInformation)
 
-    else:
-        rootFileExtract = audioFileFull.split('/')[-1]
-        pickleFile = TMP_DIR + rootFileExtract + '.ttb.pickle'
+        """ CHORD """
+        myResult = F_parseChord(data_d['description'], myResult, myHarmonicInformation)
 
-        with open(xmlFile, 'r') as f:
-            xmlData = f.read()
-        jsonData = xmltodict.parse(xmlData)
+        del myResult['ICK_Key_PC']
 
-        full_d = {'audioFile': audioFileFull, 'xmlFile': xmlFile, 'jsonData': jsonData, 'pickleFile': pickleFile, 'jsonFile':jsonFile}
+        """ MELODY """
+        # print "melody %s" % (audioFile)
+        # outMelodyFile = OUTPUT_DIR + rootFile + '.melody.yaml'
+        # if os.path.exists(outMelodyFile) is False:
+        #    F_computeMelodia(audioFile, outMelodyFile, outMelodyFile + '.txt')
 
-        myResult['filepath'] = audioFileFull
+        """ AUDIO QUALITY """
+        lowlevel_l = data_d['description'].lowlevel_l
+        ###myResult['MonoCompatibility_Mean'] = float(lowlevel_l[5][0])
+        myResult['MonoCompatibility'] = int(np.round(lowlevel_l[5][0]))
+        ###myResult['SamplingRate'] = data_d['description'].samplingRate
 
-        """ STRUCTURE """
-        ###myResult = F_parseStruct(full_d['jsonData'], myResult)
-        data_d = full_d
+        """ HPSS and TimbreToolbox time series """
+        if hpss_t is None:
+            hpss_t, descHub_d = F_computeAudioStage(data_d['audioFile'], myCache, data_d['audioHash'], data_d.get('window_t', (-1., -1.)), input_d.get('myAudio'), myDeadline, do_parallel, config_s)
 
+        """ HPSS """
+        myResult['DecSinus'], myResult['DecNoise'], myResult['DecTrans'] = hpss_t
 
-    """ BEAT """
-    myResult = F_parseRhythm(data_d['jsonData'], myResult)
+        myResult['Sharpness_Mean'] = float(lowlevel_l[6][0])
+        myResult['Sharpness_SD'] = float(lowlevel_l[7][0])
+        myResult['Dist_Loud_Mean'] = float(lowlevel_l[0][0])
+        myResult['Dist_Loud_SD'] = float(lowlevel_l[1][0])
 
-    """ KEY """
-    myResult = F_parseKeyMode(data_d['jsonData'], myResult, myHarmonicInformation)
+        """ MFCC """
+        myResult = F_computeMfcc(data_d['description'], myResult)
 
-    """ CHORD """
-    myResult = F_parseChord(data_d['jsonData'], myResult, myHarmonicInformation)
+        """ TimbreToolbox """
+        if mySeries is not None and (myDeadline is None or len([nom for nom in myDeadline.feature_l if nom in TTB_FEATURE_l]) == 0):
+            with F_stage('series'):
+                mySeries.M_write(descHub_d, myResult['filepath'], data_d.get('window_t', (-1., -1.)))
+        myResult = F_computeTimbre(descHub_d, myResult)
 
-    del myResult['ICK_Key_PC']
 
-    """ MELODY """
-    # print "melody %s" % (audioFile)
-    # outMelodyFile = OUTPUT_DIR + rootFile + '.melody.yaml'
-    # if os.path.exists(outMelodyFile) is False:
-    #    F_computeMelodia(audioFile, outMelodyFile, outMelodyFile + '.txt')
+        """ TAGS """
+        myResult = F_parseTag(data_d['description'], myResult)
 
-    """ AUDIO QUALITY """
-    ###myResult['MonoCompatibility_Mean'] = data_d['jsonData']['musicdescription']['global']['lowleveltype'][5]['#text']
-    myResult['MonoCompatibility'] = int(np.round(float(data_d['jsonData']['musicdescription']['global']['lowleveltype'][5]['#text'])))
-    ###myResult['SamplingRate'] = float(data_d['jsonData']['musicdescription']['global']['@samplingrate'])
+        if myDeadline is not None:
+            myResult['degradation'] = myDeadline.M_report()
 
-    """ HPSS """
-    L1 = 4096./44100.
-    tt = time.time()
-    myResult['DecSinus'], myResult['DecNoise'], myResult['DecTrans'] = peeaudiolight.C_AudioAnalysis(data_d['audioFile'], do_stereo2mono=True).M_frameAnalysis(window_shape="blackman", L_sec=L1, STEP_sec=L1/4., ).M_cplxFft(zp_factor=1).M_fitzGerald(L_sec=0.08, STEP_sec=0.02)
-    print("HPSS %f\n" % (time.time() - tt))
+        if len(jsonFile) == 0:
+            jsonFile = data_d['jsonFile']
+        if mySink is None:
+            mySink = imdABCDJsink.C_jsonSink()
+        with F_stage('json'):
+            mySink.M_write(myResult, jsonFile)
 
-    myResult['Sharpness_Mean'] = float(data_d['jsonData']['musicdescription']['global']['lowleveltype'][6]['#text'])
-    myResult['Sharpness_SD'] = float(data_d['jsonData']['musicdescription']['global']['lowleveltype'][7]['#text'])
-    myResult['Dist_Loud_Mean'] = float(data_d['jsonData']['musicdescription']['global']['lowleveltype'][0]['#text'])
-    myResult['Dist_Loud_SD'] = float(data_d['jsonData']['musicdescription']['global']['lowleveltype'][1]['#text'])
+        if len(profileFile):
+            imdABCDJprofile.PROFILER.M_write(profileFile)
+    finally:
+        if len(profileFile):
+            imdABCDJprofile.F_disable()
 
-    """ MFCC """
-    myResult = F_computeMfcc(data_d['jsonData'], myResult)
+    return
 
-    """ TimbreToolbox """
-    print("ttb %s" % (data_d['audioFile']))
-    myResult = F_computeTimbre(data_d['audioFile'], data_d['pickleFile'], myResult)
 
+def F_extract(audioFile, xmlFile, startExtract=-1., stopExtract=-1., sliceExtract=False, config_s=config_s, myCache=None, budget_sec=0.):
+    """
+        Library entry point: features of audioFile (described by the imdABCDJ xmlFile), returned as an OrderedDict
+        (the content of the json file of F_computeOneFile)
+        Reentrant: the configuration is only read from config_s (hard_settings) and a call shares nothing with the others
+        but myCache (thread-safe), so that several files can be processed by a pool of threads of one process
+        (most of the computation is done by numpy/scipy, which release the GIL);
+        nothing is written, neither in files nor on stdout (unless config_s.do_verbose)
+    """
 
-    """ TAGS """
-    myResult = F_parseTag(data_d['jsonData'], myResult)
+    mySink = imdABCDJsink.C_bufferSink()
+    F_computeOneFile(audioFileFull=audioFile, xmlFile=xmlFile, startExtract=startExtract, stopExtract=stopExtract, TMP_DIR=config_s.TMP_DIR,
+                     myCache=myCache, mySink=mySink, sliceExtract=sliceExtract, budget_sec=budget_sec, config_s=config_s)
+    return mySink.result_l[0][0]
 
-    if len(jsonFile) == 0:
-        jsonFile = data_d['jsonFile']
-    with open(jsonFile, 'w') as fid:
-        json.dump(myResult, fid, indent=4)
 
-    print("F_computeOneFile\t%f" % (time.time() - t))
+def F_computeExtractList(audioFileFull, window_l, myCache=None, config_s=config_s):
+    """
+        HPSS and TimbreToolbox features of several excerpts of a full track, analysed once
+        window_l: list of (start_sec, stop_sec)
+        Return a list of OrderedDict (one per excerpt)
+    """
 
-    return
+    audioHash = ''
+    if myCache is not None:
+        audioHash = imdABCDJcache.F_hashFile(audioFileFull)
+    myTrackFrame = F_computeTrackFrame(audioFileFull, myCache, audioHash, config_s=config_s)
+
+    result_l = []
+    for start_sec, stop_sec in window_l:
+        hpss_t, descHub_d = myTrackFrame.M_slice(start_sec, stop_sec)
+        myResult = OrderedDict()
+        myResult['DecSinus'], myResult['DecNoise'], myResult['DecTrans'] = hpss_t
+        result_l.append(F_computeTimbre(descHub_d, myResult))
+    return result_l
 
 
 def F_computeAllFile(audioFile_d, TMP_DIR=''):
@@ -837,11 +1531,25 @@ def main(argv):
     """
 
     try:
-        opts, args = getopt.getopt(argv, "ha:x:o:t:", ["iaudiofile=", "ixmlfile=", "ojsonfile=", "tmpdir="])
+        opts, args = getopt.getopt(argv, "ha:x:o:t:c:p:", ["iaudiofile=", "ixmlfile=", "ojsonfile=", "tmpdir=", "cachedir=", "cachesize=", "profile=", "start=", "stop=", "slice", "budget=", "parallel", "seriesdir=", "invalidate="])
     except getopt.GetoptError:
         usage()
         sys.exit(2)
 
+    inputAudioFile = ''
+    inputXmlFile = ''
+    outputJsonFile = ''
+    TMP_DIR = ''
+    cacheDir = ''
+    cacheSize_mb = 10240
+    profileFile = ''
+    startExtract = -1.
+    stopExtract = -1.
+    sliceExtract = False
+    budget_sec = 0.
+    do_parallel = False
+    seriesDir = ''
+    invalidate_l = []
     for opt, arg in opts:
         if opt == '-h':
             usage()
@@ -855,11 +1563,50 @@ def main(argv):
         elif opt in ("-t", "--tmpdir"):
             TMP_DIR = arg
             TMP_DIR = TMP_DIR + '/'
+        elif opt in ("-c", "--cachedir"):
+            cacheDir = arg
+        elif opt == "--cachesize":
+            cacheSize_mb = float(arg)
+        elif opt in ("-p", "--profile"):
+            profileFile = arg
+        elif opt == "--start":
+            startExtract = float(arg)
+        elif opt == "--stop":
+            stopExtract = float(arg)
+        elif opt == "--slice":
+            sliceExtract = True
+        elif opt == "--budget":
+            budget_sec = float(arg)
+        elif opt == "--parallel":
+            do_parallel = True
+        elif opt == "--seriesdir":
+            seriesDir = arg
+        elif opt == "--invalidate":
+            if arg not in imdABCDJcache.CACHE_GROUP_d:
+                usage()
+                sys.exit(2)
+            invalidate_l.append(arg)
     #audioFile_d = F_createProcessingList()
     #F_computeAllFile(audioFile_d, TMP_DIR=TMP_DIR)
 
+    myCache = None
+    if len(cacheDir):
+        myCache = imdABCDJcache.C_cache(cacheDir, cacheSize_mb)
+        for group in invalidate_l:
+            myCache.M_invalidate(group)
+    elif len(invalidate_l):
+        usage()
+        sys.exit(2)
+    mySeries = None
+    if len(seriesDir):
+        mySeries = imdABCDJseries.C_seriesStore(seriesDir)
+
     if len(inputAudioFile) and len(outputJsonFile):
-        F_computeOneFile(audioFileFull=inputAudioFile, xmlFile=inputXmlFile, jsonFile=outputJsonFile, TMP_DIR=TMP_DIR)
+        F_computeOneFile(audioFileFull=inputAudioFile, xmlFile=inputXmlFile, jsonFile=outputJsonFile, TMP_DIR=TMP_DIR, myCache=myCache, profileFile=profileFile,
+                         startExtract=startExtract, stopExtract=stopExtract, sliceExtract=sliceExtract, budget_sec=budget_sec, do_parallel=do_parallel,
+                         config_s=config_s._replace(do_verbose=True), mySeries=mySeries)
+    if mySeries is not None:
+        mySeries.M_close()
 
     return
 
@@ -868,7 +1615,8 @@ def usage():
     """
         Usage function
     """
-    print 'imdABCDJhardfeatures.py -a <inputAudioFile> -x <inputXmlFile> -o <outputJsonFile -t <tmpDir>'
+    print 'imdABCDJhardfeatures.py -a <inputAudioFile> -x <inputXmlFile> -o <outputJsonFile -t <tmpDir> [-c <cacheDir>] [--cachesize <MB>] [-p <profileFile>] [--start <sec> [--stop <sec>] [--slice]] [--budget <sec>] [--parallel] [--seriesdir <storeDir>]'
+    print '                        [-c <cacheDir> --invalidate audio|xml]'
     return
 
 
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJjournal.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Append-only journal of the jobs of imdABCDJbatch, used to resume an interrupted run
+
+    One json object per line:
+        {"fingerprint", "id", "state": "running"|"done"|"failed", "time", "pid", "error", "output_l", "append_l"}
+    A job is identified by its fingerprint: the path, size and modification time of its input files
+    (audioFileFull, audioFileExtract, xmlFile) and its other arguments; a modified input is a new job.
+
+    When resuming (M_resume), a job is
+        - skipped if its last state is "done" and its outputs are unchanged: the files of output_l [path, size] have
+          the same size, the files of append_l [path, size] (NDJSON shards) are at least as long
+        - given up if it failed maxAttempt times (a "running" state never followed by "done" or
+          "failed", i.e. a job which killed its worker or was interrupted, counts as a failure)
+        - run otherwise
+
+    A job is journaled as done by the worker, once its result is on disk (imdABCDJsink, F_persist): a result still
+    kept in memory by a bulk sink when the worker dies is not done.
+
+    Each line is written with a single os.write on a file opened in append mode, so that the
+    batch process and its workers can share the journal.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import time
+import json
+import hashlib
+
+
+# --- arguments of F_computeOneFile which are input files
+INPUT_l = ['audioFileFull', 'audioFileExtract', 'xmlFile']
+
+
+def F_fingerprint(job_d):
+    """
+        Fingerprint of a job: its input files (path, size, mtime) and its other arguments
+    """
+
+    input_l = []
+    for key in INPUT_l:
+        if len(job_d.get(key, '')) == 0:
+            continue
+        path = os.path.abspath(job_d[key])
+        try:
+            stat = os.stat(path)
+            input_l.append([key, path, stat.st_size, int(stat.st_mtime)])
+        except OSError:
+            input_l.append([key, path, -1, -1])
+    param_d = dict((key, value) for key, value in job_d.items() if key not in INPUT_l + ['id', 'fingerprint'])
+    desc = json.dumps([input_l, param_d], sort_keys=True)
+    return hashlib.sha1(desc.encode('utf-8')).hexdigest()
+
+
+def F_outputList(path_l):
+    """
+        [path, size] of the output files (size -1 if the file does not exist)
+    """
+
+    output_l = []
+    for path in path_l:
+        try:
+            output_l.append([path, os.path.getsize(path)])
+        except OSError:
+            output_l.append([path, -1])
+    return output_l
+
+
+class C_journal:
+    """
+        class definition for the journal of a batch run
+    """
+
+    journalFile = ''
+    fd = -1
+    state_d = {}
+
+    def __init__(self, journalFile, do_load=True):
+        self.journalFile = journalFile
+        # --- state_d[fingerprint] = {'state', 'nbFailed', 'record'} (last record of the job)
+        self.state_d = {}
+        if do_load and os.path.exists(journalFile):
+            self.M_load()
+        self.fd = os.open(journalFile, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if do_load and os.path.getsize(journalFile) > 0:
+            # --- terminate a line truncated by a crash, so that it does not swallow the next record
+            with open(journalFile, 'rb') as fid:
+                fid.seek(-1, os.SEEK_END)
+                if fid.read(1) != b'\n':
+                    os.write(self.fd, b'\n')
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_load(self):
+        """
+            Replay the journal
+        """
+
+        with open(self.journalFile, 'r') as fid:
+            for line in fid:
+                try:
+                    record_d = json.loads(line)
+                except ValueError:
+                    # --- line truncated by a crash
+                    continue
+                self.M_update(record_d)
+        return
+
+
+    def M_update(self, record_d):
+        key = record_d['fingerprint']
+        if key not in self.state_d:
+            self.state_d[key] = {'state': '', 'nbFailed': 0, 'record': {}}
+        state_d = self.state_d[key]
+        if record_d['state'] == 'failed' or (record_d['state'] == 'running' and state_d['state'] == 'running'):
+            state_d['nbFailed'] += 1
+        state_d['state'] = record_d['state']
+        state_d['record'] = record_d
+        return
+
+
+    def M_append(self, record_d):
+        """
+            Append a record (fingerprint, id, state, ...) to the journal
+        """
+
+        record_d = dict(record_d)
+        record_d['time'] = time.time()
+        if 'pid' not in record_d:
+            record_d['pid'] = os.getpid()
+        os.write(self.fd, (json.dumps(record_d) + '\n').encode('utf-8'))
+        self.M_update(record_d)
+        return
+
+
+    def M_isDone(self, key):
+        """
+            The last state of the job is "done" and its outputs are unchanged
+            (a job without outputs, journaled before they were checked, is not done)
+        """
+
+        if key not in self.state_d or self.state_d[key]['state'] != 'done':
+            return False
+        output_l = self.state_d[key]['record'].get('output_l', [])
+        append_l = self.state_d[key]['record'].get('append_l', [])
+        if len(output_l) + len(append_l) == 0:
+            return False
+        if F_outputList([path for path, size in output_l]) != output_l:
+            return False
+        return all(current >= size for (path, size), (path, current) in zip(append_l, F_outputList([path for path, size in append_l])))
+
+
+    def M_nbFailed(self, key):
+        if key not in self.state_d:
+            return 0
+        # --- an attempt which never ended counts as a failure
+        return self.state_d[key]['nbFailed'] + int(self.state_d[key]['state'] == 'running')
+
+
+    def M_resume(self, job_l, maxAttempt=3):
+        """
+            Split the jobs into the jobs to run, the jobs already done and the jobs given up
+            The fingerprint of each job is added to it (job_d['fingerprint'])
+        """
+
+        todo_l, done_l, abandon_l = [], [], []
+        for job_d in job_l:
+            job_d['fingerprint'] = F_fingerprint(job_d)
+            if self.M_isDone(job_d['fingerprint']):
+                done_l.append(job_d)
+            elif self.M_nbFailed(job_d['fingerprint']) >= maxAttempt:
+                abandon_l.append(job_d)
+            else:
+                todo_l.append(job_d)
+        return todo_l, done_l, abandon_l
+
+
+    def M_close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        return
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJmetrics.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Live metrics of a batch run, written as a Prometheus text-format file
+    (e.g. for the textfile collector of node_exporter)
+
+    The file is rewritten (temporary file then rename) every interval seconds while the batch runs,
+    and at its end. It is computed by the batch process from the status of the jobs
+    (which carry the wall time of their stages, the cache counters and the memory of their worker)
+    and from the memory of the live worker processes.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import time
+import collections
+
+import imdABCDJprofile
+
+
+# --- upper bounds (sec) of the buckets of the latency histograms
+BUCKET_l = [0.01, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60., 120., 300., 600.]
+
+# --- the throughput gauges are computed over the jobs completed in the last RATE_WINDOW seconds
+RATE_WINDOW = 60.
+
+# --- METRIC_d[name] = (type, help)
+METRIC_d = collections.OrderedDict([
+    ('imdABCDJ_batch_jobs', ('gauge', 'Number of jobs of the batch')),
+    ('imdABCDJ_batch_jobs_completed_total', ('counter', 'Number of completed jobs, by status')),
+    ('imdABCDJ_batch_audio_seconds_total', ('counter', 'Seconds of audio analysed by the successful jobs')),
+    ('imdABCDJ_batch_files_per_second', ('gauge', 'Completed jobs per wall second (last %d seconds)' % RATE_WINDOW)),
+    ('imdABCDJ_batch_audio_seconds_per_second', ('gauge', 'Seconds of audio analysed per wall second (last %d seconds)' % RATE_WINDOW)),
+    ('imdABCDJ_batch_queue_depth', ('gauge', 'Number of jobs waiting to be started')),
+    ('imdABCDJ_batch_inflight_jobs', ('gauge', 'Number of jobs started and not completed')),
+    ('imdABCDJ_batch_inflight_oldest_seconds', ('gauge', 'Age of the oldest job started and not completed')),
+    ('imdABCDJ_batch_stage_seconds', ('histogram', 'Wall time of the stages of the jobs (stage="total": whole job)')),
+    ('imdABCDJ_batch_cache_requests_total', ('counter', 'Cache requests of the workers, by namespace and result')),
+    ('imdABCDJ_batch_cache_hit_ratio', ('gauge', 'Fraction of the cache requests which are hits, by namespace')),
+    ('imdABCDJ_batch_worker_rss_bytes', ('gauge', 'Resident memory of the live worker processes')),
+    ('imdABCDJ_batch_worker_peak_rss_bytes', ('gauge', 'Peak resident memory of the worker processes (at their last job)')),
+    ('imdABCDJ_batch_elapsed_seconds', ('gauge', 'Wall time since the start of the batch')),
+])
+
+
+def F_label(label_t):
+    """
+        Prometheus label set of a tuple of (name, value) (backslash, double-quote and line feed escaped in the values)
+    """
+
+    if len(label_t) == 0:
+        return ''
+    return '{%s}' % ','.join(['%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in label_t])
+
+
+class C_metrics:
+    """
+        class definition for the metrics of a batch run
+    """
+
+    metricsFile = ''
+    interval = 0.
+    time0 = 0.
+    timeWrite = 0.
+    value_d = {}
+    histo_d = {}
+    done_l = []
+    start_d = {}
+    cache_d = {}
+    peak_d = {}
+
+    def __init__(self, metricsFile, interval=10., nbJob=0):
+        self.metricsFile = metricsFile
+        self.interval = interval
+        self.time0 = time.time()
+        self.timeWrite = 0.
+        # --- value_d[(name, label_t)] = value (counters and gauges)
+        self.value_d = {}
+        # --- histo_d[(name, label_t)] = [count of each bucket of BUCKET_l + +Inf, sum]
+        self.histo_d = {}
+        # --- done_l[num] = (time of completion, seconds of audio) of the jobs of the last RATE_WINDOW seconds
+        self.done_l = collections.deque()
+        # --- start_d[id] = time at which the job was started
+        self.start_d = {}
+        # --- cache_d[pid] = {namespace: [nbHit, nbMiss]} (cumulative counters of each worker)
+        self.cache_d = {}
+        # --- peak_d[pid] = peak resident memory (kB)
+        self.peak_d = {}
+        self.M_set('imdABCDJ_batch_jobs', nbJob)
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_set(self, name, value, **label_d):
+        self.value_d[(name, tuple(sorted(label_d.items())))] = value
+        return
+
+
+    def M_inc(self, name, value=1., **label_d):
+        key = (name, tuple(sorted(label_d.items())))
+        self.value_d[key] = self.value_d.get(key, 0.) + value
+        return
+
+
+    def M_observe(self, name, value, **label_d):
+        key = (name, tuple(sorted(label_d.items())))
+        if key not in self.histo_d:
+            self.histo_d[key] = [0] * (len(BUCKET_l) + 1) + [0.]
+        histo_l = self.histo_d[key]
+        for num, bound in enumerate(BUCKET_l):
+            if value <= bound:
+                histo_l[num] += 1
+        histo_l[len(BUCKET_l)] += 1
+        histo_l[-1] += value
+        return
+
+
+    def M_jobStart(self, jobId):
+        self.start_d[jobId] = time.time()
+        return
+
+
+    def M_jobDone(self, status_d, duration_sec=0.):
+        """
+            Account for a completed job (status_d of imdABCDJbatch.F_runJob) which analysed duration_sec seconds of audio
+        """
+
+        self.start_d.pop(status_d['id'], None)
+        self.M_inc('imdABCDJ_batch_jobs_completed_total', status=status_d['status'])
+        if status_d['status'] == 'ok':
+            self.M_inc('imdABCDJ_batch_audio_seconds_total', duration_sec)
+            self.done_l.append((time.time(), duration_sec))
+            for stage, wall in status_d.get('stage_d', {}).items():
+                self.M_observe('imdABCDJ_batch_stage_seconds', wall, stage=stage)
+        if 'cache_d' in status_d:
+            self.cache_d[status_d['pid']] = status_d['cache_d']
+        if 'peak_rss_kb' in status_d:
+            self.peak_d[status_d['pid']] = status_d['peak_rss_kb']
+        return
+
+
+    def M_update(self, nbPending, nbInflight, pid_l=[], do_force=False):
+        """
+            Update the gauges (queue, live workers) and rewrite the file if interval seconds have elapsed since the last write
+        """
+
+        now = time.time()
+        if not do_force and now - self.timeWrite < self.interval:
+            return
+
+        self.M_set('imdABCDJ_batch_queue_depth', nbPending)
+        self.M_set('imdABCDJ_batch_inflight_jobs', nbInflight)
+        if nbInflight == 0:
+            self.M_set('imdABCDJ_batch_inflight_oldest_seconds', 0.)
+        elif len(self.start_d):
+            self.M_set('imdABCDJ_batch_inflight_oldest_seconds', now - min(self.start_d.values()))
+        else:
+            # --- start of the jobs unknown (taken by the workers themselves)
+            self.value_d.pop(('imdABCDJ_batch_inflight_oldest_seconds', ()), None)
+        self.M_set('imdABCDJ_batch_elapsed_seconds', now - self.time0)
+
+        while len(self.done_l) and self.done_l[0][0] < now - RATE_WINDOW:
+            self.done_l.popleft()
+        window = min(RATE_WINDOW, max(now - self.time0, 1e-3))
+        self.M_set('imdABCDJ_batch_files_per_second', len(self.done_l) / window)
+        self.M_set('imdABCDJ_batch_audio_seconds_per_second', sum([duration for t, duration in self.done_l]) / window)
+
+        count_d = {}
+        for pid, cache_d in self.cache_d.items():
+            for namespace, count_l in cache_d.items():
+                total_l = count_d.setdefault(namespace, [0, 0])
+                total_l[0] += count_l[0]
+                total_l[1] += count_l[1]
+        for namespace, (nbHit, nbMiss) in count_d.items():
+            self.M_set('imdABCDJ_batch_cache_requests_total', nbHit, namespace=namespace, result='hit')
+            self.M_set('imdABCDJ_batch_cache_requests_total', nbMiss, namespace=namespace, result='miss')
+            self.M_set('imdABCDJ_batch_cache_hit_ratio', float(nbHit) / max(nbHit + nbMiss, 1), namespace=namespace)
+
+        # --- only the live workers are reported
+        for key in [key for key in self.value_d if key[0] in ['imdABCDJ_batch_worker_rss_bytes', 'imdABCDJ_batch_worker_peak_rss_bytes']]:
+            del self.value_d[key]
+        for pid in pid_l:
+            rss_kb = imdABCDJprofile.F_rssKb(pid)
+            if rss_kb >= 0:
+                self.M_set('imdABCDJ_batch_worker_rss_bytes', rss_kb * 1024, pid=pid)
+            if pid in self.peak_d:
+                self.M_set('imdABCDJ_batch_worker_peak_rss_bytes', self.peak_d[pid] * 1024, pid=pid)
+
+        self.M_write()
+        self.timeWrite = now
+        return
+
+
+    def M_text(self):
+        """
+            Metrics in the Prometheus text format
+        """
+
+        line_l = []
+        for name, (metricType, help) in METRIC_d.items():
+            value_l = sorted([(label_t, value) for (key, label_t), value in self.value_d.items() if key == name])
+            histo_l = sorted([(label_t, value) for (key, label_t), value in self.histo_d.items() if key == name])
+            if len(value_l) + len(histo_l) == 0:
+                continue
+            line_l.append('# HELP %s %s' % (name, help))
+            line_l.append('# TYPE %s %s' % (name, metricType))
+            for label_t, value in value_l:
+                line_l.append('%s%s %s' % (name, F_label(label_t), repr(float(value))))
+            for label_t, count_l in histo_l:
+                for bound, count in zip(BUCKET_l + ['+Inf'], count_l[:-1]):
+                    line_l.append('%s_bucket%s %d' % (name, F_label(label_t + (('le', bound),)), count))
+                line_l.append('%s_sum%s %s' % (name, F_label(label_t), repr(float(count_l[-1]))))
+                line_l.append('%s_count%s %d' % (name, F_label(label_t), count_l[len(BUCKET_l)]))
+        return '\n'.join(line_l) + '\n'
+
+
+    def M_write(self):
+        """
+            Rewrite the metrics file (atomically: a reader never sees a partial file)
+        """
+
+        with open(self.metricsFile + '.tmp', 'w') as fid:
+            fid.write(self.M_text())
+        os.rename(self.metricsFile + '.tmp', self.metricsFile)
+        return
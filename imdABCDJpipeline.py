@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJpipeline.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Bounded read / compute / write pipeline over a stream of jobs, run in one process
+
+        reader threads --(ready queue)--> calling thread --(write queue)--> writer thread
+           F_read                           F_compute                        F_write
+
+    The readers read the inputs of the next jobs (xml parsing, audio decoding: mostly waiting for
+    the storage) while the calling thread computes the current one; the writer writes the results.
+    At most depth inputs are read ahead of the one being computed, and the sum of the estimated size
+    (F_size) of these inputs stays below memCap_byte (an input larger than the cap is still read, but
+    alone); depth=0 reads the next input only once the current one is computed.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import threading
+import traceback
+import Queue
+
+
+# --- end of the stream in the queues
+END = None
+
+
+class C_pipeline:
+    """
+        class definition for the pipeline
+        F_read(job_d) -> input
+        F_compute(job_d, input, error) -> output (error: traceback of F_read, '' if it succeeded)
+        F_write(job_d, output)
+        F_size(job_d) -> estimated size of the input in bytes
+        F_compute and F_write should not raise: their errors are part of their output
+    """
+
+    F_read = None
+    F_compute = None
+    F_write = None
+    F_size = None
+    nbReader = 0
+    depth = 0
+    memCap_byte = 0
+    nbAhead = 0
+    memUsed_byte = 0
+    memCondition = None
+    jobLock = None
+    ready_q = None
+    write_q = None
+    stopEvent = None
+    error_l = []
+
+    def __init__(self, F_read, F_compute, F_write, F_size=lambda job_d: 0, nbReader=1, depth=2, memCap_byte=1<<30):
+        self.F_read = F_read
+        self.F_compute = F_compute
+        self.F_write = F_write
+        self.F_size = F_size
+        self.nbReader = nbReader
+        self.depth = max(depth, 0)
+        self.memCap_byte = memCap_byte
+        # --- number and estimated size of the inputs read (or being read) and not computed yet, the current one included
+        self.nbAhead = 0
+        self.memUsed_byte = 0
+        self.memCondition = threading.Condition()
+        self.jobLock = threading.Lock()
+        self.ready_q = Queue.Queue()
+        self.write_q = Queue.Queue()
+        self.stopEvent = threading.Event()
+        # --- errors of the pipeline threads themselves
+        self.error_l = []
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_reserve(self, size_byte):
+        """
+            Wait until one more input fits in depth and in the memory cap (always true when no input is in memory)
+            Return False if the pipeline is stopped
+        """
+
+        with self.memCondition:
+            while self.nbAhead > 0 and (self.nbAhead > self.depth or self.memUsed_byte + size_byte > self.memCap_byte):
+                if self.stopEvent.is_set():
+                    return False
+                # --- (a timeout: the stop event does not notify the condition)
+                self.memCondition.wait(1.)
+            self.nbAhead += 1
+            self.memUsed_byte += size_byte
+        return not self.stopEvent.is_set()
+
+
+    def M_release(self, size_byte):
+        with self.memCondition:
+            self.nbAhead -= 1
+            self.memUsed_byte -= size_byte
+            self.memCondition.notify_all()
+        return
+
+
+    def M_reader(self, job_it):
+        try:
+            while not self.stopEvent.is_set():
+                with self.jobLock:
+                    job_d = next(job_it, END)
+                if job_d is END:
+                    break
+                size_byte = self.F_size(job_d)
+                if not self.M_reserve(size_byte):
+                    break
+                input, error = None, ''
+                try:
+                    input = self.F_read(job_d)
+                except Exception:
+                    error = traceback.format_exc()
+                self.ready_q.put((job_d, input, error, size_byte))
+                # --- the input now belongs to the ready queue
+                input = None
+        except Exception:
+            self.error_l.append(traceback.format_exc())
+        finally:
+            self.ready_q.put(END)
+        return
+
+
+    def M_writer(self):
+        while True:
+            item_t = self.write_q.get()
+            if item_t is END:
+                break
+            try:
+                self.F_write(*item_t)
+            except Exception:
+                self.error_l.append(traceback.format_exc())
+        return
+
+
+    def M_run(self, job_it):
+        """
+            Run all the jobs of the iterator job_it (read by the reader threads) and wait until their results are written
+        """
+
+        job_it = iter(job_it)
+        reader_l = [threading.Thread(target=self.M_reader, args=(job_it,)) for num in range(self.nbReader)]
+        writer = threading.Thread(target=self.M_writer)
+        for thread in reader_l + [writer]:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            nbEnd = 0
+            while nbEnd < self.nbReader:
+                item_t = self.ready_q.get()
+                if item_t is END:
+                    nbEnd += 1
+                    continue
+                job_d, input, error, size_byte = item_t
+                item_t = None
+                output = self.F_compute(job_d, input, error)
+                # --- the input is released before the next one is taken
+                input = None
+                self.M_release(size_byte)
+                self.write_q.put((job_d, output))
+        finally:
+            self.stopEvent.set()
+            self.write_q.put(END)
+            writer.join()
+
+        if len(self.error_l):
+            raise Exception("imdABCDJpipeline: %s" % self.error_l[0])
+        return
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJprofile.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Opt-in per-stage profiling of imdABCDJhardfeatures
+
+    A stage is measured with
+        with imdABCDJprofile.F_stage('hpss/fft'):
+            ...
+    When profiling is not enabled (F_enable), F_stage does nothing.
+    Only the stages of the thread which enabled profiling are measured (the stages run by
+    other threads, e.g. the readers of imdABCDJpipeline, belong to other tracks).
+    For each stage are recorded: wall time, CPU time (user+system) of the process,
+    its resident memory at the end of the stage and its peak resident memory so far.
+    The records of a track are written as a json sidecar (M_write).
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import time
+import json
+import resource
+import threading
+
+
+# --- profiler of the current track (None: profiling disabled)
+PROFILER = None
+
+
+def F_rssKb(pid='self'):
+    """
+        Current resident memory of the process (this one by default) in kB (-1 if /proc is not available)
+    """
+
+    try:
+        with open('/proc/%s/statm' % pid, 'r') as fid:
+            return int(fid.read().split()[1]) * (os.sysconf('SC_PAGE_SIZE') // 1024)
+    except (IOError, OSError, ValueError):
+        return -1
+
+
+def F_record(name, wall0, cpu0, failed=False):
+    """
+        Record of a stage started at wall0 (time.time()) and cpu0 (user+system time of the process)
+    """
+
+    wall = time.time() - wall0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {'stage': name,
+            'wall': wall,
+            'cpu': usage.ru_utime + usage.ru_stime - cpu0,
+            'rss_kb': F_rssKb(),
+            'peak_rss_kb': usage.ru_maxrss,
+            'failed': failed}
+
+
+class C_stage:
+    """
+        class definition for a measured stage (context manager)
+    """
+
+    myProfiler = None
+    name = ''
+    wall0 = 0.
+    cpu0 = 0.
+
+    def __init__(self, myProfiler, name):
+        self.myProfiler = myProfiler
+        self.name = name
+        self.wall0 = 0.
+        self.cpu0 = 0.
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def __enter__(self):
+        self.myProfiler.name_l.append(self.name)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu0 = usage.ru_utime + usage.ru_stime
+        self.wall0 = time.time()
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.myProfiler.stage_l.append(F_record('/'.join(self.myProfiler.name_l), self.wall0, self.cpu0, excType is not None))
+        self.myProfiler.name_l.pop()
+        return False
+
+
+class C_nullStage:
+    """
+        class definition for a stage which is not measured
+    """
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+NULL_STAGE = C_nullStage()
+
+
+class C_profiler:
+    """
+        class definition for the records of the stages of one track
+    """
+
+    stage_l = []
+    name_l = []
+    info_d = {}
+    thread = None
+    wall0 = 0.
+    cpu0 = 0.
+
+    def __init__(self, info_d={}):
+        # --- stage_l[num] = {'stage', 'wall', 'cpu', 'rss_kb', 'peak_rss_kb', 'failed'} (in order of completion)
+        self.stage_l = []
+        # --- names of the stages being measured (nested stages are named 'parent/child')
+        self.name_l = []
+        self.info_d = dict(info_d)
+        self.thread = threading.current_thread()
+        # --- the whole track ('total') is measured from the creation of the profiler to M_write
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu0 = usage.ru_utime + usage.ru_stime
+        self.wall0 = time.time()
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_stage(self, name):
+        return C_stage(self, name)
+
+
+    def M_wallByStage(self):
+        """
+            Wall time of each stage (summed over the stages of the same name)
+        """
+
+        wall_d = {}
+        for stage_d in self.stage_l:
+            wall_d[stage_d['stage']] = wall_d.get(stage_d['stage'], 0.) + stage_d['wall']
+        return wall_d
+
+
+    def M_write(self, profileFile):
+        """
+            Write the records as a json sidecar
+        """
+
+        out_d = dict(self.info_d)
+        out_d['pid'] = os.getpid()
+        out_d['stage_l'] = self.stage_l + [F_record('total', self.wall0, self.cpu0)]
+        with open(profileFile + '.tmp', 'w') as fid:
+            json.dump(out_d, fid, indent=1)
+        os.rename(profileFile + '.tmp', profileFile)
+        return
+
+
+def F_enable(info_d={}):
+    """
+        Start profiling a new track
+    """
+
+    global PROFILER
+    PROFILER = C_profiler(info_d)
+    return PROFILER
+
+
+def F_disable():
+    global PROFILER
+    PROFILER = None
+    return
+
+
+def F_stage(name):
+    """
+        Measure a stage (do nothing if profiling is disabled)
+    """
+
+    if PROFILER is None or PROFILER.thread is not threading.current_thread():
+        return NULL_STAGE
+    return PROFILER.M_stage(name)
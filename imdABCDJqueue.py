@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# imdABCDJqueue.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Job queue of imdABCDJhardfeatures in a shared directory, for workers running on several hosts
+    (no coordinator: all the operations are atomic renames in the queue directory)
+
+    queueDir/todo/<key>.json     jobs waiting ({'job_d', 'attempt', 'error'})
+    queueDir/lease/<key>@<owner>.json
+                                 jobs being computed: a worker claims a job by renaming it from todo/ to lease/ under
+                                 a name of its own (owner: host, pid and a random id, new for each claim), then touches
+                                 it every leaseTime/4 seconds (heartbeat)
+    queueDir/done/<key>.json     jobs done (with their status)
+    queueDir/failed/<key>.json   jobs which failed maxAttempt times
+    queueDir/tmp/                private names used while a job file is rewritten
+
+    A lease which has not been touched for leaseTime seconds belongs to a dead worker: any worker moves it
+    back to todo/ (the attempt counts as a failure). The clocks of the hosts must agree within a fraction of leaseTime.
+    The owner of a lease only touches, completes or releases its own file name: a worker which was only
+    paused finds its lease gone and drops its result (the result is only written to the sink once the job is
+    moved out of lease/).
+    The keys start with the rank of the job (longest first, see imdABCDJbatch.F_estimate), so that the jobs
+    are claimed in this order.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import json
+import time
+import random
+import socket
+import hashlib
+import uuid
+import threading
+import traceback
+import multiprocessing
+
+import imdABCDJbatch
+import imdABCDJsink
+
+
+STATE_l = ['todo', 'lease', 'done', 'failed', 'tmp']
+
+
+def F_initQueue(queueDir):
+    for state in STATE_l:
+        try:
+            os.makedirs(os.path.join(queueDir, state))
+        except OSError:
+            pass
+    return
+
+
+def F_path(queueDir, state, key):
+    return os.path.join(queueDir, state, key + '.json')
+
+
+def F_owner():
+    """
+        Unique owner of a lease: host, pid and a random id
+    """
+
+    return '%s-%d-%s' % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:12])
+
+
+def F_writeJob(path, jobFile_d):
+    with open(path + '.tmp', 'w') as fid:
+        json.dump(jobFile_d, fid)
+    os.rename(path + '.tmp', path)
+    return
+
+
+def F_push(queueDir, job_l, model_d=imdABCDJbatch.MODEL_d):
+    """
+        Add jobs to the queue (longest first)
+    """
+
+    F_initQueue(queueDir)
+    estimate_l = sorted([(imdABCDJbatch.F_estimate(job_d, model_d)[1], num) for num, job_d in enumerate(job_l)], reverse=True)
+    prefix = '%d' % (time.time()*1000)
+    for rank, (time_sec, num) in enumerate(estimate_l):
+        job_d = job_l[num]
+        key = '%s-%06d-%s' % (prefix, rank, hashlib.sha1(json.dumps(job_d, sort_keys=True).encode('utf-8')).hexdigest()[:12])
+        F_writeJob(F_path(queueDir, 'todo', key), {'job_d': job_d, 'attempt': 0, 'error': ''})
+    return len(job_l)
+
+
+def F_age(path):
+    """
+        Seconds since the last heartbeat of a lease (rename and utime both update its ctime)
+    """
+
+    stat = os.stat(path)
+    return time.time() - max(stat.st_mtime, stat.st_ctime)
+
+
+def F_release(queueDir, path, key, error, maxAttempt):
+    """
+        Move a job (its file path, in lease/ or tmp/) back to todo/ (or to failed/ after maxAttempt attempts)
+        Return False if the lease was already taken by another worker
+    """
+
+    tmpPath = os.path.join(queueDir, 'tmp', '%s.%s.json' % (key, F_owner()))
+    try:
+        os.rename(path, tmpPath)
+    except OSError:
+        return False
+    with open(tmpPath, 'r') as fid:
+        jobFile_d = json.load(fid)
+    jobFile_d['attempt'] += 1
+    jobFile_d['error'] = error
+    with open(tmpPath, 'w') as fid:
+        json.dump(jobFile_d, fid)
+    os.rename(tmpPath, F_path(queueDir, 'todo' if jobFile_d['attempt'] < maxAttempt else 'failed', key))
+    return True
+
+
+def F_reclaim(queueDir, leaseTime, maxAttempt):
+    """
+        Move the expired leases (dead workers) back to todo/
+    """
+
+    nbReclaim = 0
+    for name in os.listdir(os.path.join(queueDir, 'lease')):
+        if not name.endswith('.json'):
+            continue
+        try:
+            if F_age(os.path.join(queueDir, 'lease', name)) < leaseTime:
+                continue
+        except OSError:
+            continue
+        if F_release(queueDir, os.path.join(queueDir, 'lease', name), name[:-len('.json')].split('@')[0], 'lease expired', maxAttempt):
+            nbReclaim += 1
+    return nbReclaim
+
+
+class C_lease:
+    """
+        class definition for a claimed job, kept alive by a heartbeat thread
+    """
+
+    queueDir = ''
+    key = ''
+    owner = ''
+    path = ''
+    jobFile_d = {}
+    stopEvent = None
+    thread = None
+
+    def __init__(self, queueDir, key, owner, leaseTime):
+        self.queueDir = queueDir
+        self.key = key
+        self.owner = owner
+        self.path = F_path(queueDir, 'lease', '%s@%s' % (key, owner))
+        os.utime(self.path, None)
+        with open(self.path, 'r') as fid:
+            self.jobFile_d = json.load(fid)
+        self.stopEvent = threading.Event()
+        self.thread = threading.Thread(target=self.M_heartbeat, args=(leaseTime/4.,))
+        self.thread.daemon = True
+        self.thread.start()
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_heartbeat(self, interval):
+        while not self.stopEvent.wait(interval):
+            try:
+                os.utime(self.path, None)
+            except OSError:
+                # --- the lease was reclaimed (this worker was considered dead)
+                return
+        return
+
+
+    def M_stop(self):
+        self.stopEvent.set()
+        self.thread.join()
+        return
+
+
+    def M_take(self):
+        """
+            Move the job out of lease/ (to tmp/): return its path, or None if the lease is not owned any more
+            (it expired and was reclaimed by another worker)
+        """
+
+        tmpPath = os.path.join(self.queueDir, 'tmp', '%s.%s.json' % (self.key, self.owner))
+        try:
+            os.rename(self.path, tmpPath)
+        except OSError:
+            return None
+        return tmpPath
+
+
+def F_claim(queueDir, leaseTime):
+    """
+        Claim the first job of todo/ (None if the queue is empty)
+    """
+
+    name_l = sorted([name for name in os.listdir(os.path.join(queueDir, 'todo')) if name.endswith('.json')])
+    # --- the workers start at different positions among the first jobs, to avoid contending for the same file
+    offset = random.randint(0, min(len(name_l), 8)-1) if len(name_l) else 0
+    for name in name_l[offset:] + name_l[:offset]:
+        key = name[:-len('.json')]
+        owner = F_owner()
+        try:
+            os.rename(F_path(queueDir, 'todo', key), F_path(queueDir, 'lease', '%s@%s' % (key, owner)))
+        except OSError:
+            continue
+        try:
+            return C_lease(queueDir, key, owner, leaseTime)
+        except (OSError, IOError):
+            # --- reclaimed before the first heartbeat
+            continue
+    return None
+
+
+def F_work(queueDir, TMP_DIR='', cacheDir='', cacheSize_mb=10240, do_profile=False, sinkType='json', sinkDir='', leaseTime=600., maxAttempt=3, pollTime=10.):
+    """
+        Worker loop: claim and compute jobs until todo/ and lease/ are empty
+        (while other workers hold leases, wait: they may die and their jobs come back)
+        The extraction modules, cache and sink are set up once, as in a worker of imdABCDJbatch
+    """
+
+    imdABCDJbatch.F_initWorker(cacheDir, cacheSize_mb, sinkType, sinkDir)
+    # --- forked workers inherit the same random state
+    random.seed()
+    host = socket.gethostname()
+    nbJob = 0
+    while True:
+        F_reclaim(queueDir, leaseTime, maxAttempt)
+        myLease = F_claim(queueDir, leaseTime)
+        if myLease is None:
+            if len(os.listdir(os.path.join(queueDir, 'lease'))) == 0:
+                break
+            time.sleep(pollTime)
+            continue
+
+        job_d = myLease.jobFile_d['job_d']
+        # --- the result is kept in memory until the job is moved out of its lease
+        myBuffer = imdABCDJsink.C_bufferSink()
+        try:
+            status_d = imdABCDJbatch.F_runJob((job_d, TMP_DIR, do_profile), None, myBuffer)
+        finally:
+            myLease.M_stop()
+        status_d['host'] = host
+        nbJob += 1
+        print("%s\t%s\t%s\t%f" % (status_d['status'], host, status_d['id'], status_d['time']))
+
+        tmpPath = myLease.M_take()
+        if tmpPath is None:
+            # --- the lease expired meanwhile: the job is in todo/ again (or being recomputed), the result is dropped
+            print("lease of %s lost: result dropped" % (status_d['id']))
+            continue
+        if status_d['status'] == 'ok':
+            try:
+                myBuffer.M_flush(imdABCDJbatch.mySink)
+            except Exception:
+                status_d['status'] = 'failed'
+                status_d['error'] = traceback.format_exc()
+        if status_d['status'] == 'ok':
+            F_writeJob(tmpPath, {'job_d': job_d, 'attempt': myLease.jobFile_d['attempt']+1, 'status': status_d})
+            os.rename(tmpPath, F_path(queueDir, 'done', myLease.key))
+        else:
+            print(status_d['error'])
+            F_release(queueDir, tmpPath, myLease.key, status_d['error'], maxAttempt)
+
+    return nbJob
+
+
+def F_status(queueDir):
+    """
+        Number of jobs in each state
+    """
+
+    return dict((state, len([name for name in os.listdir(os.path.join(queueDir, state)) if name.endswith('.json')])) for state in STATE_l[:-1])
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJqueue.py --push -q /shared/queue -m ./jobs.ndjson
+                  ./imdABCDJqueue.py --work -q /shared/queue -j 8 -t ./_tmp/     (on each host)
+    """
+
+    try:
+        opts, args = getopt.getopt(argv, "hq:m:j:b:t:c:p", ["push", "work", "status", "queue=", "manifest=", "jobs=", "blasthreads=", "tmpdir=", "cachedir=", "cachesize=", "profile",
+                                                           "sink=", "sinkdir=", "lease=", "maxattempt=", "poll=", "model="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    command = ''
+    queueDir = ''
+    manifestFile = ''
+    nbWorker = multiprocessing.cpu_count()
+    nbThread = 1
+    TMP_DIR = ''
+    cacheDir = ''
+    cacheSize_mb = 10240
+    do_profile = False
+    sinkType = 'json'
+    sinkDir = ''
+    leaseTime = 600.
+    maxAttempt = 3
+    pollTime = 10.
+    model_d = imdABCDJbatch.MODEL_d
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt in ("--push", "--work", "--status"):
+            command = opt[2:]
+        elif opt in ("-q", "--queue"):
+            queueDir = arg
+        elif opt in ("-m", "--manifest"):
+            manifestFile = arg
+        elif opt in ("-j", "--jobs"):
+            nbWorker = int(arg)
+        elif opt in ("-b", "--blasthreads"):
+            nbThread = int(arg)
+        elif opt in ("-t", "--tmpdir"):
+            TMP_DIR = arg + '/'
+        elif opt in ("-c", "--cachedir"):
+            cacheDir = arg
+        elif opt == "--cachesize":
+            cacheSize_mb = float(arg)
+        elif opt in ("-p", "--profile"):
+            do_profile = True
+        elif opt == "--sink":
+            sinkType = arg
+        elif opt == "--sinkdir":
+            sinkDir = arg
+        elif opt == "--lease":
+            leaseTime = float(arg)
+        elif opt == "--maxattempt":
+            maxAttempt = int(arg)
+        elif opt == "--poll":
+            pollTime = float(arg)
+        elif opt == "--model":
+            with open(arg, 'r') as fid:
+                model_d = json.load(fid)
+
+    if len(queueDir) == 0 or len(command) == 0:
+        usage()
+        sys.exit(2)
+
+    if command == 'push':
+        nbJob = F_push(queueDir, imdABCDJbatch.F_readManifest(manifestFile), model_d)
+        print("F_push\t%d jobs" % nbJob)
+
+    elif command == 'work':
+        F_initQueue(queueDir)
+        imdABCDJbatch.F_setBlasThread(nbThread)
+        process_l = [multiprocessing.Process(target=F_work, args=(queueDir, TMP_DIR, cacheDir, cacheSize_mb, do_profile, sinkType, sinkDir, leaseTime, maxAttempt, pollTime))
+                     for num in range(nbWorker)]
+        for process in process_l:
+            process.start()
+        for process in process_l:
+            process.join()
+
+    status_d = F_status(queueDir)
+    print("todo %d\tlease %d\tdone %d\tfailed %d" % (status_d['todo'], status_d['lease'], status_d['done'], status_d['failed']))
+    if status_d['failed']:
+        sys.exit(1)
+
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJqueue.py --push -q <queueDir> -m <manifestFile> [--model <modelFile>]')
+    print('imdABCDJqueue.py --work -q <queueDir> [-j <nbWorker>] [-b <nbBlasThread>] [-t <tmpDir>] [-c <cacheDir>] [--cachesize <MB>] [-p] [--sink json|ndjson|columnar --sinkdir <outDir>]')
+    print('                 [--lease <sec>] [--maxattempt <n>] [--poll <sec>]')
+    print('imdABCDJqueue.py --status -q <queueDir>')
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJseries.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Store of the frame-level TimbreToolbox time series of the tracks (descHub_d of F_computeOneFile),
+    from which the statistics and the TT* features are computed again (re-aggregation: other statistics,
+    percentiles, other features) without decoding the audio nor computing the STFT again
+
+    storeDir/series-<pid>-<time>.f32      the time series (float32) of the tracks written by one process, one after the other
+    storeDir/series-<pid>-<time>.ndjson   one line per track, written once its time series are on disk:
+        {'filepath', 'window_t', 'series_l': [[family, descriptor, offset, nbDim, nbFrame, step], ...]}
+        (offset in number of float32 values in the .f32 file, the series of one descriptor is (nbDim, nbFrame))
+
+    Each process writes its own pair of files (no locking, as imdABCDJsink.C_ndjsonSink); a track stored
+    several times (e.g. a job run again) is read from its last line. The series are read memory-mapped.
+    The descriptors of decimate_d only keep one frame every step frames: the energy envelope TEE/RMSEnv
+    (one value per sample, low-pass filtered at 5 Hz) is kept at sr_hz/8 (without it, it would be 90% of the store;
+    a coarser step biases the standard deviation TTT_Enst by more than 1e-3).
+    The degraded time series (time budget of C_deadline) are not stored.
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import getopt
+import glob
+import json
+import time
+from collections import OrderedDict
+import numpy as np
+
+import imdABCDJsink
+
+
+# --- DECIMATE_d[(family, descriptor)] = one frame kept every step frames
+DECIMATE_d = {('TEE', 'RMSEnv'): 8}
+
+
+class C_seriesStore:
+    """
+        class definition for the store of time series
+    """
+
+    storeDir = ''
+    prefix = ''
+    decimate_d = {}
+    dataFid = None
+    indexFid = None
+    offset = 0
+    data_d = {}
+
+    def __init__(self, storeDir, decimate_d=DECIMATE_d):
+        self.storeDir = storeDir
+        # --- files named after the process and its start time: several processes (or runs) never share them
+        self.prefix = os.path.join(storeDir, 'series-%d-%d' % (os.getpid(), int(time.time()*1000)))
+        self.decimate_d = decimate_d
+        self.dataFid = None
+        self.indexFid = None
+        self.offset = 0
+        # --- data_d[name of the .f32 file] = memmap (float32) of its values
+        self.data_d = {}
+        if not os.path.exists(storeDir):
+            try:
+                os.makedirs(storeDir)
+            except OSError:
+                pass
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_write(self, descHub_d, filepath, window_t=(-1., -1.)):
+        """
+            Append the time series of a track (descHub_d[family][descriptor]['value'], the statistics are not stored)
+        """
+
+        if self.dataFid is None:
+            self.dataFid = open(self.prefix + '.f32', 'ab')
+            self.indexFid = open(self.prefix + '.ndjson', 'a')
+            self.offset = 0
+
+        series_l = []
+        for family in sorted(descHub_d):
+            for descriptor in sorted(descHub_d[family]):
+                step = self.decimate_d.get((family, descriptor), 1)
+                value_m = np.atleast_2d(descHub_d[family][descriptor]['value'])[:, ::step]
+                value_m = np.ascontiguousarray(value_m, dtype=np.float32)
+                self.dataFid.write(value_m.tostring())
+                series_l.append([family, descriptor, self.offset, value_m.shape[0], value_m.shape[1], step])
+                self.offset += value_m.size
+        # --- the line is written once the series are on disk: a reader never sees a line without its series
+        self.dataFid.flush()
+        self.indexFid.write(json.dumps({'filepath': filepath, 'window_t': list(window_t), 'series_l': series_l}) + '\n')
+        self.indexFid.flush()
+        return
+
+
+    def M_close(self):
+        if self.dataFid is not None:
+            self.dataFid.close()
+            self.indexFid.close()
+            self.dataFid = None
+            self.indexFid = None
+        return
+
+
+    def M_records(self):
+        """
+            Index of the store: OrderedDict record_d[filepath] = last line of the track (plus the name of its .f32 file in 'dataFile')
+        """
+
+        record_d = OrderedDict()
+        for indexFile in sorted(glob.glob(os.path.join(self.storeDir, 'series-*.ndjson'))):
+            with open(indexFile, 'r') as fid:
+                for line in fid:
+                    # --- (the last line of a process which is still writing may be partial)
+                    if not line.endswith('\n'):
+                        break
+                    record = json.loads(line)
+                    record['dataFile'] = indexFile[:-len('.ndjson')] + '.f32'
+                    record_d.pop(record['filepath'], None)
+                    record_d[record['filepath']] = record
+        return record_d
+
+
+    def M_descHub(self, record):
+        """
+            Time series of a track (record of M_records) as a descHub_d of peeTimbreToolbox.F_computeAllDescriptor
+            (float64 copies of the memory-mapped values)
+        """
+
+        data_v = self.data_d.get(record['dataFile'])
+        end = max([offset + nbDim * nbFrame for family, descriptor, offset, nbDim, nbFrame, step in record['series_l']] + [0])
+        if data_v is None or len(data_v) < end:
+            # --- (the file has grown since it was mapped)
+            data_v = np.memmap(record['dataFile'], dtype=np.float32, mode='r')
+            self.data_d[record['dataFile']] = data_v
+
+        descHub_d = {}
+        for family, descriptor, offset, nbDim, nbFrame, step in record['series_l']:
+            value_m = np.array(data_v[offset:offset + nbDim * nbFrame], dtype=np.float64).reshape(nbDim, nbFrame)
+            descHub_d.setdefault(family, {})[descriptor] = {'value': value_m}
+        return descHub_d
+
+
+def F_reaggregate(storeDir, feature_l, mySink, outDir=''):
+    """
+        Compute the TimbreToolbox features feature_l (see imdABCDJhardfeatures.F_timbreAddress, e.g. TTM_Scp90)
+        of all the tracks of the store from their time series, and write them to mySink
+        (for a C_jsonSink: one file <outDir>/<name of the track>.timbre.json per track)
+        Return the number of tracks
+    """
+
+    import imdABCDJhardfeatures
+
+    myStore = C_seriesStore(storeDir)
+    nbTrack = 0
+    for filepath, record in myStore.M_records().items():
+        myResult = OrderedDict([('filepath', filepath)])
+        if record['window_t'][0] >= 0:
+            myResult['window_t'] = record['window_t']
+        myResult = imdABCDJhardfeatures.F_computeTimbre(myStore.M_descHub(record), myResult, feature_l)
+        mySink.M_write(myResult, os.path.join(outDir, os.path.splitext(os.path.basename(filepath))[0] + '.timbre.json'))
+        nbTrack += 1
+    mySink.M_close()
+    return nbTrack
+
+
+def main(argv):
+    """
+        Main command line function
+        Example:  ./imdABCDJseries.py -s ./series/ -f 'TTM_Scp10,TTM_Scp90,TTT_Enmd' --sink ndjson --sinkdir ./_out/
+    """
+
+    try:
+        opts, args = getopt.getopt(argv, "hs:f:", ["store=", "features=", "sink=", "sinkdir="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    import imdABCDJhardfeatures
+
+    storeDir = ''
+    feature_l = imdABCDJhardfeatures.TTB_FEATURE_l
+    sinkType = 'ndjson'
+    sinkDir = ''
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit()
+        elif opt in ("-s", "--store"):
+            storeDir = arg
+        elif opt in ("-f", "--features"):
+            feature_l = arg.split(',')
+        elif opt == "--sink":
+            sinkType = arg
+        elif opt == "--sinkdir":
+            sinkDir = arg
+
+    if len(storeDir) == 0 or len(sinkDir) == 0:
+        usage()
+        sys.exit(2)
+
+    if sinkType == 'json' and not os.path.exists(sinkDir):
+        os.makedirs(sinkDir)
+    t = time.time()
+    nbTrack = F_reaggregate(storeDir, feature_l, imdABCDJsink.F_createSink(sinkType, sinkDir), sinkDir)
+    print("F_reaggregate\t%d tracks\t%d features\t%.1f sec" % (nbTrack, len(feature_l), time.time()-t))
+    return
+
+
+def usage():
+    """
+        Usage function
+    """
+    print('imdABCDJseries.py -s <storeDir> [-f <feature,...>] [--sink json|ndjson|columnar] --sinkdir <outDir>')
+    return
+
+
+# ---------------------------------------------
+# ---------------------------------------------
+# ---------------------------------------------
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJsink.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Result sinks of imdABCDJhardfeatures: where the features of each track (myResult) are written
+
+    - C_jsonSink: one json file per track (the default of F_computeOneFile)
+    - C_ndjsonSink: append-only NDJSON shards, one line per track, one shard per process
+    - C_columnarSink: feature matrix (float64 .npy, memory-mappable) written by chunks of rows,
+      with a json index giving the column order (the keys of myResult) and the non-numeric values
+      (filepath) of each row; F_loadColumnar concatenates the chunks of a folder
+    - C_bufferSink: keeps the results in memory, to be written later to another sink (by the writer
+      thread of imdABCDJpipeline)
+
+    All the sinks have the same methods: M_write(myResult, jsonFile='', record_d=None) and M_close().
+    If F_persist is set, F_persist(record_d, output_l, append_l) is called once the row of record_d is on disk
+    (imdABCDJbatch journals the job as done then): output_l [path, size] of files which are not modified any
+    more, append_l [path, size] of the files to which rows are appended (the row is before size).
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import time
+import json
+import threading
+import glob
+import numpy as np
+
+
+def F_isColumn(value):
+    """
+        Values of myResult which go to the feature matrix of C_columnarSink: the numbers, and None
+        (feature degraded by the time budget of the job, see imdABCDJhardfeatures.C_deadline), written as NaN
+    """
+
+    return value is None or isinstance(value, (int, long, float))
+
+
+class C_jsonSink:
+    """
+        class definition for the one-json-file-per-track sink
+    """
+
+    F_persist = None
+
+    def M_write(self, myResult, jsonFile='', record_d=None):
+        with open(jsonFile, 'w') as fid:
+            json.dump(myResult, fid, indent=4)
+        if self.F_persist is not None and record_d is not None:
+            self.F_persist(record_d, [[jsonFile, os.path.getsize(jsonFile)]], [])
+        return
+
+
+    def M_close(self):
+        return
+
+
+class C_bufferSink:
+    """
+        class definition for the in-memory sink
+    """
+
+    result_l = []
+    F_persist = None
+
+    def __init__(self):
+        # --- result_l[num] = (myResult, jsonFile, record_d)
+        self.result_l = []
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_write(self, myResult, jsonFile='', record_d=None):
+        self.result_l.append((myResult, jsonFile, record_d))
+        return
+
+
+    def M_flush(self, mySink, record_d=None):
+        """
+            Write the results to mySink
+            record_d: if given, replaces the record of the results
+        """
+
+        for myResult, jsonFile, resultRecord_d in self.result_l:
+            mySink.M_write(myResult, jsonFile, resultRecord_d if record_d is None else record_d)
+        self.result_l = []
+        return
+
+
+    def M_close(self):
+        return
+
+
+class C_ndjsonSink:
+    """
+        class definition for the NDJSON shard sink
+        Each process appends to its own shard (no locking); a new shard is started every maxLine lines
+    """
+
+    outDir = ''
+    prefix = ''
+    maxLine = 0
+    nbLine = 0
+    numShard = 0
+    fid = None
+    F_persist = None
+
+    def __init__(self, outDir, maxLine=100000):
+        self.outDir = outDir
+        # --- shards are named after the process and its start time: several processes (or runs) never share a shard
+        self.prefix = os.path.join(outDir, 'features-%d-%d' % (os.getpid(), int(time.time()*1000)))
+        self.maxLine = maxLine
+        self.nbLine = 0
+        self.numShard = 0
+        self.fid = None
+        if not os.path.exists(outDir):
+            try:
+                os.makedirs(outDir)
+            except OSError:
+                pass
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_write(self, myResult, jsonFile='', record_d=None):
+        if self.fid is None or self.nbLine >= self.maxLine:
+            self.M_close()
+            self.numShard += 1
+            self.nbLine = 0
+            self.fid = open('%s-%d.ndjson' % (self.prefix, self.numShard), 'a')
+        # --- flushed at each line: a crash can only truncate the last line
+        self.fid.write(json.dumps(myResult) + '\n')
+        self.fid.flush()
+        self.nbLine += 1
+        if self.F_persist is not None and record_d is not None:
+            self.F_persist(record_d, [], [[self.fid.name, self.fid.tell()]])
+        return
+
+
+    def M_close(self):
+        if self.fid is not None:
+            self.fid.close()
+            self.fid = None
+        return
+
+
+class C_columnarSink:
+    """
+        class definition for the columnar sink
+        The rows are kept in memory and written as a chunk every maxRow rows, or maxAge_sec seconds after the
+        first row kept in memory (by a timer thread, without waiting for another row):
+            features-<pid>-<time>-<num>.npy (nbRow, nbColumn) float64, features-<pid>-<time>-<num>.json {'column_l', 'row_l'}
+        The columns are column_l (imdABCDJhardfeatures.HARD_FEATURE_l for the batch), followed by the other numeric
+        keys of the first result (the tags, whose names depend on the dictionary of imdABCDJ); they are the same
+        for all the chunks of the sink. Degraded features (None) are NaN; the other non-numeric values go to row_l.
+    """
+
+    outDir = ''
+    prefix = ''
+    maxRow = 0
+    maxAge_sec = 0.
+    column_l = []
+    isFixed = False
+    data_l = []
+    row_l = []
+    record_l = []
+    numChunk = 0
+    lock = None
+    timer = None
+    F_persist = None
+
+    def __init__(self, outDir, maxRow=1000, column_l=[], maxAge_sec=60.):
+        self.outDir = outDir
+        self.prefix = os.path.join(outDir, 'features-%d-%d' % (os.getpid(), int(time.time()*1000)))
+        self.maxRow = maxRow
+        self.maxAge_sec = maxAge_sec
+        self.column_l = list(column_l)
+        self.isFixed = False
+        self.data_l = []
+        self.row_l = []
+        self.record_l = []
+        self.numChunk = 0
+        # --- M_write (writer thread of imdABCDJpipeline) and M_flush (timer thread) share the rows in memory
+        self.lock = threading.RLock()
+        self.timer = None
+        if not os.path.exists(outDir):
+            try:
+                os.makedirs(outDir)
+            except OSError:
+                pass
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_write(self, myResult, jsonFile='', record_d=None):
+        with self.lock:
+            if not self.isFixed:
+                self.column_l += [key for key, value in myResult.items() if F_isColumn(value) and key not in self.column_l]
+                self.isFixed = True
+
+            unknown_l = [key for key, value in myResult.items() if F_isColumn(value) and key not in self.column_l]
+            if len(unknown_l):
+                raise Exception("columns %s are not part of the feature matrix" % (','.join(unknown_l)))
+
+            # --- missing and degraded features are NaN
+            self.data_l.append([np.nan if myResult.get(key) is None else myResult[key] for key in self.column_l])
+            self.row_l.append(dict((key, value) for key, value in myResult.items() if not F_isColumn(value)))
+            self.record_l.append(record_d)
+
+            if len(self.data_l) >= self.maxRow:
+                self.M_flush()
+            elif self.timer is None and self.maxAge_sec > 0:
+                self.timer = threading.Timer(self.maxAge_sec, self.M_flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return
+
+
+    def M_flush(self):
+        """
+            Write the rows in memory as a chunk
+        """
+
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if len(self.data_l) == 0:
+                return
+            self.numChunk += 1
+            prefix = '%s-%d' % (self.prefix, self.numChunk)
+            np.save(prefix + '.tmp.npy', np.array(self.data_l, dtype=np.float64))
+            with open(prefix + '.tmp.json', 'w') as fid:
+                json.dump({'column_l': self.column_l, 'row_l': self.row_l}, fid)
+            # --- the index is renamed last: a chunk is complete when its .json exists
+            os.rename(prefix + '.tmp.npy', prefix + '.npy')
+            os.rename(prefix + '.tmp.json', prefix + '.json')
+            if self.F_persist is not None:
+                output_l = [[prefix + '.npy', os.path.getsize(prefix + '.npy')], [prefix + '.json', os.path.getsize(prefix + '.json')]]
+                for record_d in self.record_l:
+                    if record_d is not None:
+                        self.F_persist(record_d, output_l, [])
+            self.data_l = []
+            self.row_l = []
+            self.record_l = []
+        return
+
+
+    def M_close(self):
+        self.M_flush()
+        return
+
+
+def F_loadColumnar(outDir, mmap_mode='r'):
+    """
+        Load all the chunks of a columnar folder
+        Return data_m (nbRow, nbColumn), column_l, row_l
+        With a single chunk, data_m is memory-mapped; otherwise the chunks are concatenated
+    """
+
+    data_l = []
+    row_l = []
+    column_l = None
+    for indexFile in sorted(glob.glob(os.path.join(outDir, 'features-*.json'))):
+        if indexFile.endswith('.tmp.json'):
+            continue
+        with open(indexFile, 'r') as fid:
+            index_d = json.load(fid)
+        if column_l is None:
+            column_l = index_d['column_l']
+        elif column_l != index_d['column_l']:
+            raise Exception("%s: columns differ from the other chunks" % indexFile)
+        data_l.append(np.load(indexFile[:-len('.json')] + '.npy', mmap_mode=mmap_mode))
+        row_l += index_d['row_l']
+
+    if len(data_l) == 0:
+        return np.zeros((0, 0)), [], []
+    if len(data_l) == 1:
+        return data_l[0], column_l, row_l
+    return np.concatenate(data_l, axis=0), column_l, row_l
+
+
+def F_createSink(sinkType='json', outDir='', column_l=[]):
+    """
+        Create a sink by name: 'json', 'ndjson' or 'columnar'
+        column_l: fixed columns of the columnar sink
+    """
+
+    if sinkType == 'json':
+        return C_jsonSink()
+    elif sinkType == 'ndjson':
+        return C_ndjsonSink(outDir)
+    elif sinkType == 'columnar':
+        return C_columnarSink(outDir, column_l=column_l)
+    raise Exception("unknown sink '%s'" % sinkType)
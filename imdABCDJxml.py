@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# imdABCDJxml.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Streaming reader of the XML file produced by the imdABCDJ executable
+
+    Only the nodes used by the hard features are kept:
+    - global: @length, @samplingrate, rhythmtype/*, harmonictype/*
+    - global/lowleveltype: as numpy vectors (in document order)
+    - global/tagtype: confidence indexed by (@id, @value)
+    - descriptiondefinition: @id and the list of label/@name (in document order)
+    - segment: @time, @length and @value, grouped by segment type (chordtype, structtype, ...)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import numpy as np
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+class C_musicDescription:
+    """
+        class definition for the content of an imdABCDJ XML file
+    """
+
+    length_sec = 0.
+    samplingRate = 0.
+    global_d = {}
+    lowlevel_l = []
+    tagtype_d = {}
+    descriptionDefinition_l = []
+    segment_d = {}
+
+    def __init__(self):
+        self.length_sec = 0.
+        self.samplingRate = 0.
+        # --- global_d[node][child] = text of global/node/child (e.g. global_d['rhythmtype']['meter'])
+        self.global_d = {}
+        # --- lowlevel_l[num] = values of the num-th global/lowleveltype (np.array)
+        self.lowlevel_l = []
+        # --- tagtype_d[(id, value)] = confidence
+        self.tagtype_d = {}
+        # --- descriptionDefinition_l[num] = (id, [label names])
+        self.descriptionDefinition_l = []
+        # --- segment_d[type] = {'time_v': np.array, 'length_v': np.array, 'value_l': list}
+        self.segment_d = {}
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def M_segment(self, segmentType):
+        """
+            Return the segments of a given type (empty arrays if there is none)
+        """
+
+        if segmentType in self.segment_d:
+            return self.segment_d[segmentType]
+        return {'time_v': np.zeros(0), 'length_v': np.zeros(0), 'value_l': []}
+
+
+def F_parseXml(xmlFile):
+    """
+        Parse the imdABCDJ XML file incrementally and keep only the nodes used by the hard features
+    """
+
+    myDescription = C_musicDescription()
+
+    segment_d = {}
+    depth = 0
+    path_l = []
+    root = None
+
+    for event, elem in ET.iterparse(xmlFile, events=('start', 'end')):
+
+        if event == 'start':
+            path_l.append(elem.tag)
+            depth += 1
+            if depth == 1:
+                root = elem
+            elif depth == 2 and elem.tag == 'global':
+                myDescription.length_sec = float(elem.get('length', 0.))
+                myDescription.samplingRate = float(elem.get('samplingrate', 0.))
+            continue
+
+        # --- event == 'end'
+        if depth == 2:
+            if elem.tag == 'descriptiondefinition':
+                label_l = [label.get('name') for label in elem.iter('label')]
+                myDescription.descriptionDefinition_l.append((elem.get('id'), label_l))
+
+            elif elem.tag == 'segment':
+                time_sec = float(elem.get('time'))
+                length_sec = float(elem.get('length'))
+                for child in elem:
+                    if 'value' in child.attrib:
+                        seg_d = segment_d.setdefault(child.tag, {'time_v': [], 'length_v': [], 'value_l': []})
+                        seg_d['time_v'].append(time_sec)
+                        seg_d['length_v'].append(length_sec)
+                        seg_d['value_l'].append(child.get('value'))
+
+            # --- the top-level node is processed: release it (and its siblings) from the tree
+            root.clear()
+
+        elif depth == 3 and path_l[1] == 'global':
+            if elem.tag == 'lowleveltype':
+                myDescription.lowlevel_l.append(np.fromstring(elem.text or '', sep=' '))
+            elif elem.tag == 'tagtype':
+                key = (elem.get('id'), elem.get('value'))
+                if key not in myDescription.tagtype_d:
+                    myDescription.tagtype_d[key] = float(elem.get('confidence'))
+            else:
+                myDescription.global_d[elem.tag] = dict((child.tag, (child.text or '').strip()) for child in elem)
+            elem.clear()
+
+        path_l.pop()
+        depth -= 1
+
+    for segmentType in segment_d.keys():
+        myDescription.segment_d[segmentType] = {'time_v': np.array(segment_d[segmentType]['time_v']),
+                                                'length_v': np.array(segment_d[segmentType]['length_v']),
+                                                'value_l': segment_d[segmentType]['value_l']}
+
+    return myDescription
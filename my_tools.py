@@ -22,7 +22,7 @@
 # Author: D Fourer <dominique@fourer.fr> http://www.fourer.fr
 
 import numpy
-import scipy
+# --- scipy (interpolate, signal) is imported by the functions which use it
 #import matplotlib
 #import matplotlib.pyplot as plt
 #import ipdb
@@ -194,6 +194,7 @@ def erbs2hz(erbs):
 
 
 def my_interpolate(x, y, xi, kind='linear'):
+    import scipy.interpolate
     f = scipy.interpolate.interp1d(x, y, kind, 0, False, 0.0)
     y_tmp = f(xi)
     return y_tmp
@@ -222,6 +223,7 @@ def specgram(x, nfft, Fs, window, noverlap):
 
 
 def my_specgram(x, nfft, Fs, window, noverlap):
+    import scipy
     if nfft != len(window):
         padding = nfft
         nfft = len(window)
@@ -339,6 +341,8 @@ def frames(a, fsize, hopsize, nframes=0):
 def gtfbank(a, Fs, cfarray, bwfactor):
     """
     """
+    import scipy.signal
+
     lo = 30.
     hi = 16000.
     hi = min(hi, (Fs / 2. - numpy.squeeze(ERB(Fs/2.))/2.))
@@ -29,10 +29,8 @@
 import numpy as np
 from collections import namedtuple
 import scipy
-import scipy.signal
-from scipy.io import wavfile
-
-import swipep as swp                # used for single-F0 estimation
+# --- scipy.signal and swipep (used for single-F0 estimation) are imported by the functions which use them:
+# --- importing them costs more than the analysis of a short excerpt
 import my_tools as mt
 
 import sys
@@ -46,6 +44,41 @@ import math # for trunc
 
 
 EPS = mt.EPS
+
+
+class C_noStage:
+    """
+        class definition for a stage which is not measured
+    """
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+NO_STAGE = C_noStage()
+
+
+def F_stage(name):
+    """
+        Measure a stage of the computation (F_computeAllDescriptor): hook set by the application with F_setStage
+        (e.g. imdABCDJprofile.F_stage), nothing is measured by default
+    """
+
+    return NO_STAGE
+
+
+def F_setStage(F_hook):
+    """
+        Set the hook measuring the stages: F_hook(name) returns a context manager
+    """
+
+    global F_stage
+    F_stage = F_hook
+    return
 NB_DESC = 164
 desc_settings = namedtuple("desc_settings", "b_AS b_TEE b_TEE_global b_STFTmag b_STFTpow b_Harmonic b_ERBfft b_ERBgam xcorr_nb_coeff threshold_harmo nb_harmo")
 dPart = namedtuple("dPart", "f_Freq_v f_Ampl_v");
@@ -131,152 +164,189 @@ def F_load(filename):
 #  @return
 
 
-def F_temporalModeling(descHub_d):
+# --- statistics computed by F_temporalModeling (when no plan is given)
+STAT_l = ['min', 'max', 'mean', 'std', 'median', 'iqr', 'crest']
 
-    for key1 in descHub_d.keys():
-        for key2 in descHub_d[key1].keys():
-            if ((descHub_d[key1][key2]['value'].shape[0] == 1) & (descHub_d[key1][key2]['value'].shape[1] > 1)):
 
-                descHub_d[key1][key2]['min'] = np.amin(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['max'] = np.amax(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['mean'] = np.mean(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['std'] = np.std(descHub_d[key1][key2]['value'], axis=1)
-
-                descHub_d[key1][key2]['median'] = np.median(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['iqr'] = 0.7413 * (np.percentile(descHub_d[key1][key2]['value'], 75, axis=1) - np.percentile(descHub_d[key1][key2]['value'], 25, axis=1))
-                # --- crest= max / mean
-                descHub_d[key1][key2]['crest'] = np.max(descHub_d[key1][key2]['value'], axis=1) / np.mean(descHub_d[key1][key2]['value'], axis=1)
+def F_computeStatistic(value_m, stat):
+    """
+        Compute one statistic over time (axis=1) of a descriptor time series value_m (nbDim, nbFrame)
+        stat: one of STAT_l, or 'p<NN>' for the NN-th percentile (e.g. 'p90')
+        For a single frame, the statistic is the value itself (0 for std/iqr, undefined for crest), of shape (nbDim, )
+    """
 
+    if value_m.shape[1] > 1:
+        if stat == 'min':
+            return np.amin(value_m, axis=1)
+        elif stat == 'max':
+            return np.amax(value_m, axis=1)
+        elif stat == 'mean':
+            return np.mean(value_m, axis=1)
+        elif stat == 'std':
+            return np.std(value_m, axis=1)
+        elif stat == 'median':
+            return np.median(value_m, axis=1)
+        elif stat == 'iqr':
+            return 0.7413 * (np.percentile(value_m, 75, axis=1) - np.percentile(value_m, 25, axis=1))
+        elif stat == 'crest':
+            # --- crest= max / mean
+            return np.divide(np.max(value_m, axis=1), np.mean(value_m, axis=1))
+        elif stat[0] == 'p' and stat[1:].isdigit():
+            return np.percentile(value_m, int(stat[1:]), axis=1)
+    else:
+        if stat in ['std', 'iqr']:
+            return np.zeros(value_m.shape[0])
+        elif stat == 'crest':
+            return None
+        return value_m[:, 0]
 
-            elif ((descHub_d[key1][key2]['value'].shape[0] > 1) & (descHub_d[key1][key2]['value'].shape[1] > 1)):
+    raise Exception("unknown statistic %s" % stat)
 
-                descHub_d[key1][key2]['min'] = np.amin(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['max'] = np.amax(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['mean'] = np.mean(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['std'] = np.std(descHub_d[key1][key2]['value'], axis=1)
 
-                descHub_d[key1][key2]['median'] = np.median(descHub_d[key1][key2]['value'], axis=1)
-                descHub_d[key1][key2]['iqr'] = 0.7413 * (np.percentile(descHub_d[key1][key2]['value'], 75, axis=1) - np.percentile(descHub_d[key1][key2]['value'], 25, axis=1))
-                # --- crest= max / mean
-                descHub_d[key1][key2]['crest'] = np.divide(np.max(descHub_d[key1][key2]['value'], axis=1), np.mean(descHub_d[key1][key2]['value'], axis=1))
+def F_temporalModeling(descHub_d, plan_d=None):
+    """
+        Compute statistics from time series (min/max/mean/std/median/iqr/crest)
+        plan_d[family][descriptor] = list of the statistics to compute (default: all of them, for all the descriptors)
+    """
 
+    for key1 in descHub_d.keys():
+        for key2 in descHub_d[key1].keys():
+            if plan_d is None:
+                stat_l = STAT_l
+            elif key1 in plan_d and key2 in plan_d[key1]:
+                stat_l = plan_d[key1][key2]
             else:
+                continue
 
-                descHub_d[key1][key2]['min'] = descHub_d[key1][key2]['value']
-                descHub_d[key1][key2]['max'] = descHub_d[key1][key2]['value']
-                descHub_d[key1][key2]['mean'] = descHub_d[key1][key2]['value']
-                descHub_d[key1][key2]['std'] = 0.0
-
-                descHub_d[key1][key2]['median'] = descHub_d[key1][key2]['value']
-                descHub_d[key1][key2]['iqr'] = 0.0
-
-
-            if False:
-                # -------------------------------------------
-                # -------------------------------------------
-                # -------------------------------------------
-                nbFrame = descHub_d[key1][key2]['value'].shape[1]
-                if nbFrame>1:
-                    for numDim in range(0,descHub_d[key1][key2]['value'].shape[0]):
-                        plt.figure(1)
-                        plt.clf()
-                        plt.subplot(111)
-                        plt.plot(range(0,nbFrame), descHub_d[key1][key2]['value'][numDim,:])
-                        m_v = np.ones((nbFrame))*descHub_d[key1][key2]['median'][numDim]
-                        s_v = np.ones((nbFrame))*descHub_d[key1][key2]['iqr'][numDim]
-                        plt.plot(range(0,nbFrame), m_v, 'g')
-                        plt.plot(range(0,nbFrame), m_v-s_v, 'r')
-                        plt.plot(range(0,nbFrame), m_v+s_v, 'r')
-                        plt.title("%s/%s/%d" % (key1, key2,numDim))
-                        plt.grid(True)
-                        plt.show(block=False)
-                        plt.draw()
-                        #raw_input()
-                else:
-                    print "%s/%s: %f" % (key1, key2, descHub_d[key1][key2]['value'])
+            for stat in stat_l:
+                value = F_computeStatistic(descHub_d[key1][key2]['value'], stat)
+                if value is not None:
+                    descHub_d[key1][key2][stat] = value
 
     return descHub_d
 
 
+# --- hop size (in samples at 44100 Hz) of the time series of the families which can be sliced in time
+# --- (TEE: one value per sample; STFT: frame i is centred on sample i*hop, see F_representationFft)
+FRAME_HOP_d = {'TEE': 1., 'STFTmag': 256., 'STFTpow': 256.}
+
+# --- descriptors depending on the amplitude of the (normalized) signal: value ~ amplitude**exponent
+AMPLITUDE_EXPONENT_d = {('TEE', 'RMSEnv'): 1, ('STFTmag', 'FrameErg'): 1, ('STFTpow', 'FrameErg'): 2}
 
-def F_computeAllDescriptor(audio_v, sr_hz):
+
+def F_frameTime(family, nbFrame, sr_hz):
+    """
+        Time (in seconds) of the frames of the time series of a family
+    """
+
+    if family not in FRAME_HOP_d:
+        raise Exception("the time series of %s cannot be sliced" % family)
+    if family == 'TEE':
+        hop_n = 1
+    else:
+        hop_n = int(FRAME_HOP_d[family]/44100.*sr_hz)
+    return np.arange(0, nbFrame) * float(hop_n) / sr_hz
+
+
+def F_sliceDescriptor(descHub_d, sr_hz, start_sec, stop_sec, gain=1.):
+    """
+        Time series of the frames of [start_sec, stop_sec[ (at least one frame; stop_sec < 0: until the end)
+        gain: amplitude ratio between the normalization of the slice and the one of the whole signal
+              (F_computeAllDescriptor normalizes the signal by its maximum)
+    """
+
+    slice_d = {}
+    for family in descHub_d.keys():
+        slice_d[family] = {}
+        for descriptor in descHub_d[family].keys():
+            value_m = descHub_d[family][descriptor]['value']
+            time_v = F_frameTime(family, value_m.shape[1], sr_hz)
+            start, stop = np.searchsorted(time_v, [start_sec, stop_sec])
+            if stop_sec < 0:
+                stop = value_m.shape[1]
+            start = min(start, value_m.shape[1]-1)
+            stop = max(stop, start+1)
+            value_m = value_m[:, start:stop]
+            if (family, descriptor) in AMPLITUDE_EXPONENT_d:
+                value_m = value_m * gain**AMPLITUDE_EXPONENT_d[(family, descriptor)]
+            slice_d[family][descriptor] = {'value': value_m}
+    return slice_d
+
+
+
+def F_computeAllDescriptor(audio_v, sr_hz, plan_d=None, config_s=config_s):
     """
         Main Function : compute all descriptor for given signal trame_s
         name: unknown
-        @param
+        @param plan_d: plan_d[family][descriptor] = statistics; only the families/descriptors of the plan are computed
+                       (default: the families enabled in config_s, with all their descriptors)
+        @param config_s: desc_settings of the computation (default: the config_s of the module)
         @return
     """
 
+    if plan_d is None:
+        do_d = {'AS': config_s.b_AS, 'TEE': config_s.b_TEE, 'STFTmag': config_s.b_STFTmag, 'STFTpow': config_s.b_STFTpow,
+                'Harmonic': config_s.b_Harmonic, 'ERBfft': config_s.b_ERBfft, 'ERBgam': config_s.b_ERBgam}
+        desc_d = {}
+    else:
+        do_d = dict((family, family in plan_d) for family in ['AS', 'TEE', 'STFTmag', 'STFTpow', 'Harmonic', 'ERBfft', 'ERBgam'])
+        desc_d = dict((family, plan_d[family].keys()) for family in plan_d)
+
     descHub_d = {}
 
     if np.isscalar(sr_hz):
         sr_hz = np.array([sr_hz])
 
-    print audio_v.shape
-    print sr_hz
-
     audio_v = audio_v / (np.max(audio_v) + EPS);  # normalize input sound
     #ret_desc    = np.zeros((1, NB_DESC), float);
 
     descHub_d = {}
 
-    import time
-
     """ 1) descriptors from the Temporal Energy Envelope (do_s.b_TEE=1)  [OK] """
-    if config_s.b_AS:
-        t = time.time()
-        descHub_d['AS'] = F_computeDescriptorSignal(audio_v, sr_hz)
-        print("F_computeDescriptorSignal\t%f" % (time.time() - t))
+    if do_d['AS']:
+        with F_stage('AS'):
+            descHub_d['AS'] = F_computeDescriptorSignal(audio_v, sr_hz, config_s)
 
-    if config_s.b_TEE:
-        t = time.time()
-        descHub_d['TEE'] = F_computeDescriptorEnv(audio_v, sr_hz)
-        print("F_computeDescriptorEnv\t%f" % (time.time() - t))
+    if do_d['TEE']:
+        with F_stage('TEE'):
+            descHub_d['TEE'] = F_computeDescriptorEnv(audio_v, sr_hz, config_s=config_s)
 
     """ 2) descriptors from the STFT magnitude and STFT power (do_s.b_STFTmag= 1) """
-    if (config_s.b_STFTmag or config_s.b_STFTpow):
-        t = time.time()
-        S_mag, S_pow, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v = F_representationFft(audio_v, sr_hz)
-        print("F_representationFft\t%f" % (time.time() - t))
+    if (do_d['STFTmag'] or do_d['STFTpow']):
+        with F_stage('representationFft'):
+            S_mag, S_pow, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v = F_representationFft(audio_v, sr_hz)
 
-    if config_s.b_STFTmag:
-        t = time.time()
-        descHub_d['STFTmag'] = F_computeDescriptorSpectrum(S_mag, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v)
-        print("F_computeDescriptorSpectrum\t%f" % (time.time() - t))
+    if do_d['STFTmag']:
+        with F_stage('STFTmag'):
+            descHub_d['STFTmag'] = F_computeDescriptorSpectrum(S_mag, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v, desc_d.get('STFTmag'))
 
-    if config_s.b_STFTpow:
-        t = time.time()
-        descHub_d['STFTpow'] = F_computeDescriptorSpectrum(S_pow, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v)
-        print("F_computeDescriptorSpectrum\t%f" % (time.time() - t))
+    if do_d['STFTpow']:
+        with F_stage('STFTpow'):
+            descHub_d['STFTpow'] = F_computeDescriptorSpectrum(S_pow, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v, desc_d.get('STFTpow'))
 
     """ 3) descriptors from Harmonic Sinusoidal Modeling representation (do_s.b_Harmonic=1) """
-    if config_s.b_Harmonic:
-        t = time.time()
-        f0_hz_v, f_DistrPts_m, PartTrax_s = F_representationHarmonic(audio_v, sr_hz)
-        print("F_representationHarmonic\t%f" % (time.time() - t))
+    if do_d['Harmonic']:
+        with F_stage('representationHarmonic'):
+            f0_hz_v, f_DistrPts_m, PartTrax_s = F_representationHarmonic(audio_v, sr_hz, config_s)
 
-        t = time.time()
-        descHub_d['Harmonic'] = F_computeDescriptorHarmonic(f0_hz_v, f_DistrPts_m, PartTrax_s)
-        print("F_computeDescriptorHarmonic\t%f" % (time.time() - t))
+        with F_stage('Harmonic'):
+            descHub_d['Harmonic'] = F_computeDescriptorHarmonic(f0_hz_v, f_DistrPts_m, PartTrax_s)
 
     #m = scipy.io.loadmat('sig_erb.mat');
     #trame_s = np.squeeze(m['f_Sig_v']);
 
     """ 4) descriptors from ERB representation (ERB being computed using FFT) """
-    if (config_s.b_ERBfft or config_s.b_ERBgam):
-        t = time.time()
-        S_erb, S_gam, i_SizeX1, i_SizeY1, f_SupX_v1, f_SupY_v1, i_SizeX2, i_SizeY2, f_SupX_v2, f_SupY_v2 = F_representationERB(audio_v, sr_hz)
-        print("F_representationERB\t%f" % (time.time() - t))
+    if (do_d['ERBfft'] or do_d['ERBgam']):
+        with F_stage('representationERB'):
+            S_erb, S_gam, i_SizeX1, i_SizeY1, f_SupX_v1, f_SupY_v1, i_SizeX2, i_SizeY2, f_SupX_v2, f_SupY_v2 = F_representationERB(audio_v, sr_hz)
 
-    if config_s.b_ERBfft:
-        t = time.time()
-        descHub_d['ERBfft'] = F_computeDescriptorSpectrum(S_erb, i_SizeX1, i_SizeY1, f_SupX_v1, f_SupY_v1)
-        print("F_computeDescriptorSpectrum\t%f" % (time.time() - t))
+    if do_d['ERBfft']:
+        with F_stage('ERBfft'):
+            descHub_d['ERBfft'] = F_computeDescriptorSpectrum(S_erb, i_SizeX1, i_SizeY1, f_SupX_v1, f_SupY_v1, desc_d.get('ERBfft'))
 
-    if config_s.b_ERBgam:
-        t = time.time()
-        descHub_d['ERBgam'] = F_computeDescriptorSpectrum(S_gam, i_SizeX2, i_SizeY2, f_SupX_v2, f_SupY_v2)
-        print("F_computeDescriptorSpectrum\t%f" % (time.time() - t))
+    if do_d['ERBgam']:
+        with F_stage('ERBgam'):
+            descHub_d['ERBgam'] = F_computeDescriptorSpectrum(S_gam, i_SizeX2, i_SizeY2, f_SupX_v2, f_SupY_v2, desc_d.get('ERBgam'))
 
     return descHub_d
 
@@ -284,13 +354,16 @@ def F_computeAllDescriptor(audio_v, sr_hz):
 
 
 
-def F_computeDescriptorEnv(audio_v, sr_hz, do_Global=True):
+def F_computeDescriptorEnv(audio_v, sr_hz, do_Global=True, config_s=config_s):
     """
         Compute Temporal escriptors from input trame_s signal
         name: time_desc(trame_s, Fs)
         @param
         @return
     """
+
+    import scipy.signal
+
     #print "F_computeDescriptorEnv"
 
     sr_hz = float(sr_hz)
@@ -351,13 +424,16 @@ def F_computeDescriptorEnv(audio_v, sr_hz, do_Global=True):
 
 
 
-def F_computeDescriptorSignal(audio_v, sr_hz):
+def F_computeDescriptorSignal(audio_v, sr_hz, config_s=config_s):
     """
         Compute Temporal escriptors from input trame_s signal
         name: time_desc(trame_s, Fs)
         @param
         @return
     """
+
+    import scipy.signal
+
     #print "F_computeDescriptorSignal"
 
     f_hopSize_sec = 128.0/44100         # === is 0.0029s at 44100Hz
@@ -397,97 +473,111 @@ def F_computeDescriptorSignal(audio_v, sr_hz):
 
 
 
-def F_computeDescriptorSpectrum( f_DistrPts_m, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v ):
+# --- descriptors computed by F_computeDescriptorSpectrum
+SPECTRUM_DESC_l = ['SpecCent', 'SpecSpread', 'SpecSkew', 'SpecKurt', 'SpecSlope', 'SpecDecr', 'SpecRollOff', 'SpecVar', 'FrameErg', 'SpecFlat', 'SpecCrest']
+
+
+def F_computeDescriptorSpectrum( f_DistrPts_m, i_SizeX, i_SizeY, f_SupX_v, f_SupY_v, desc_l=None ):
     """
         Compute descriptor from spectral representation (FFT/ERB/GAM)
         name: F_computeDescriptor
-        @param
+        @param desc_l: list of the descriptors to compute (default: SPECTRUM_DESC_l)
         @return
     """
     #print "F_computeDescriptorSpectrum"
 
     # --- f_DistrPts_m (i_SizeY=N, i_SizeX=nbFrame)
 
-    #i_SizeY, i_SizeX    = f_DistrPts_m.shape;
-    x_tmp = sum(f_DistrPts_m, 0) + EPS
-    f_ProbDistrY_m = f_DistrPts_m / np.repeat( [x_tmp,], i_SizeY, 0)    # === normalize distribution in Y dim
-    i_NumMoments = 4                                                # === Number of moments to compute
-    f_Moments_m = np.zeros((i_NumMoments, i_SizeX), float)        # === create empty output array for moments
+    if desc_l is None:
+        desc_l = SPECTRUM_DESC_l
 
-    """ Calculate moments """
-    # === f_Moments_m must be empty on first iter.
-    f_MeanCntr_m = np.repeat( np.array([f_SupY_v,]).T, i_SizeX, 1) - np.repeat( np.array([f_Moments_m[0,:],]), i_SizeY, 0)
+    descHub_d = {}
 
-    for i in xrange(0, i_NumMoments):
-        f_Moments_m[i, :] = sum(pow(f_MeanCntr_m, float(i+1)) * f_ProbDistrY_m)
+    #i_SizeY, i_SizeX    = f_DistrPts_m.shape;
+    if len(set(desc_l) & set(['SpecCent', 'SpecSpread', 'SpecSkew', 'SpecKurt', 'SpecSlope'])):
+        x_tmp = sum(f_DistrPts_m, 0) + EPS
+        f_ProbDistrY_m = f_DistrPts_m / np.repeat( [x_tmp,], i_SizeY, 0)    # === normalize distribution in Y dim
+
+    """ Calculate moments (only up to the highest one needed) """
+    i_NumMoments = 0                                                # === Number of moments to compute
+    for i, desc in enumerate(['SpecCent', 'SpecSpread', 'SpecSkew', 'SpecKurt']):
+        if desc in desc_l:
+            i_NumMoments = i+1
+    if i_NumMoments:
+        f_Moments_m = np.zeros((i_NumMoments, i_SizeX), float)        # === create empty output array for moments
+        # === f_Moments_m must be empty on first iter.
+        f_MeanCntr_m = np.repeat( np.array([f_SupY_v,]).T, i_SizeX, 1) - np.repeat( np.array([f_Moments_m[0,:],]), i_SizeY, 0)
+
+        for i in xrange(0, i_NumMoments):
+            f_Moments_m[i, :] = sum(pow(f_MeanCntr_m, float(i+1)) * f_ProbDistrY_m)
 
     """ Descriptors from first 4 moments """
-    f_Centroid_v = f_Moments_m[0, :]
-    f_StdDev_v = np.sqrt(f_Moments_m[1, :])
-    f_Skew_v = f_Moments_m[2, :] / pow(f_StdDev_v+EPS, 3.)
-    f_Kurtosis_v = f_Moments_m[3, :] / pow(f_StdDev_v+EPS, 4.)
+    if 'SpecCent' in desc_l:
+        f_Centroid_v = f_Moments_m[0, :]
+        descHub_d['SpecCent'] = {'value': f_Centroid_v.reshape(1, f_Centroid_v.shape[0])}    # spectral centroid - OK
+    if i_NumMoments >= 2:
+        f_StdDev_v = np.sqrt(f_Moments_m[1, :])
+    if 'SpecSpread' in desc_l:
+        descHub_d['SpecSpread'] = {'value': f_StdDev_v.reshape(1, f_StdDev_v.shape[0])}    # spectral standard deviation - OK
+    if 'SpecSkew' in desc_l:
+        f_Skew_v = f_Moments_m[2, :] / pow(f_StdDev_v+EPS, 3.)
+        descHub_d['SpecSkew'] = {'value': f_Skew_v.reshape(1, f_Skew_v.shape[0])}        # spectral skew - OK
+    if 'SpecKurt' in desc_l:
+        f_Kurtosis_v = f_Moments_m[3, :] / pow(f_StdDev_v+EPS, 4.)
+        descHub_d['SpecKurt'] = {'value': f_Kurtosis_v.reshape(1, f_Kurtosis_v.shape[0])}    # spectral kurtosis - OK
 
     """ Spectral slope (linear regression) """
-    f_Num_v = i_SizeY * (f_SupY_v.dot(f_ProbDistrY_m)) - np.sum(f_SupY_v) * sum(f_ProbDistrY_m)
-    f_Den = i_SizeY * sum(f_SupY_v ** 2.) - pow(sum(f_SupY_v), 2.)
-    f_Slope_v = f_Num_v / (EPS + f_Den)
+    if 'SpecSlope' in desc_l:
+        f_Num_v = i_SizeY * (f_SupY_v.dot(f_ProbDistrY_m)) - np.sum(f_SupY_v) * sum(f_ProbDistrY_m)
+        f_Den = i_SizeY * sum(f_SupY_v ** 2.) - pow(sum(f_SupY_v), 2.)
+        f_Slope_v = f_Num_v / (EPS + f_Den)
+        descHub_d['SpecSlope'] = {'value': f_Slope_v.reshape(1, f_Slope_v.shape[0])}        # spectral slope - OK
 
     """ Spectral decrease (according to peeters report) """
-    f_Num_m = f_DistrPts_m[1:i_SizeY, :] - np.repeat( [f_DistrPts_m[0,:] ,], i_SizeY-1, 0)
-    ## a verifier
-    #print sum(f_DistrPts_m[0,:])
-    #my_plot(f_DistrPts_m[0,:])
-    f_Den_v = 1. / np.arange(1, i_SizeY, 1.)
-    f_SpecDecr_v = np.dot(f_Den_v, f_Num_m) / np.sum(f_DistrPts_m+EPS, axis=0); #[1:i_SizeY,:]
-
-    #print  "chatt: ", np.shape(f_Num_m), " - ", np.shape(f_Den_v)
-    #print "SUM:", np.sum(f_DistrPts_m[1:i_SizeY, :])
-    #print "SUM:", np.sum(np.repeat([f_DistrPts_m[0,:],], i_SizeY-1, 0))
-    #my_plot(f_DistrPts_m[0,:])
+    if 'SpecDecr' in desc_l:
+        f_Num_m = f_DistrPts_m[1:i_SizeY, :] - np.repeat( [f_DistrPts_m[0,:] ,], i_SizeY-1, 0)
+        f_Den_v = 1. / np.arange(1, i_SizeY, 1.)
+        f_SpecDecr_v = np.dot(f_Den_v, f_Num_m) / np.sum(f_DistrPts_m+EPS, axis=0); #[1:i_SizeY,:]
+        descHub_d['SpecDecr'] = {'value': f_SpecDecr_v.reshape(1, f_SpecDecr_v.shape[0])}    # spectral decrease - ?
 
     """ Spectral roll-off """
-    f_Thresh = 0.95
-    f_CumSum_m = np.cumsum(f_DistrPts_m, axis=0)
-    f_Sum_v = f_Thresh * np.sum(f_DistrPts_m, axis=0)
-    i_Bin_m = f_CumSum_m > np.repeat( [f_Sum_v,], i_SizeY, 0 )
-    tmp = np.cumsum(i_Bin_m, axis=0)
-    trash, i_Ind_v = ( tmp.T == 1 ).nonzero()
-    f_SpecRollOff_v = f_SupY_v[i_Ind_v]
+    if 'SpecRollOff' in desc_l:
+        f_Thresh = 0.95
+        f_CumSum_m = np.cumsum(f_DistrPts_m, axis=0)
+        f_Sum_v = f_Thresh * np.sum(f_DistrPts_m, axis=0)
+        i_Bin_m = f_CumSum_m > np.repeat( [f_Sum_v,], i_SizeY, 0 )
+        tmp = np.cumsum(i_Bin_m, axis=0)
+        trash, i_Ind_v = ( tmp.T == 1 ).nonzero()
+        f_SpecRollOff_v = f_SupY_v[i_Ind_v]
+        descHub_d['SpecRollOff'] = {'value': f_SpecRollOff_v.reshape(1, f_SpecRollOff_v.shape[0])}# spectral roll-off  - OK
 
     """ Spectral variation (Spect. Flux) """
-    f_CrossProd_v = np.sum( f_DistrPts_m * np.concatenate( (np.zeros((1, i_SizeY), float), f_DistrPts_m[:,0:(i_SizeX-1)].T ) ).T , axis=0)
-    f_AutoProd_v = np.sum( pow(f_DistrPts_m, 2.), axis=0 ) * np.sum( pow( np.concatenate( (np.zeros((1,i_SizeY), float), f_DistrPts_m[:,0:(i_SizeX-1)].T)).T , 2. ) , axis=0)
+    if 'SpecVar' in desc_l:
+        f_CrossProd_v = np.sum( f_DistrPts_m * np.concatenate( (np.zeros((1, i_SizeY), float), f_DistrPts_m[:,0:(i_SizeX-1)].T ) ).T , axis=0)
+        f_AutoProd_v = np.sum( pow(f_DistrPts_m, 2.), axis=0 ) * np.sum( pow( np.concatenate( (np.zeros((1,i_SizeY), float), f_DistrPts_m[:,0:(i_SizeX-1)].T)).T , 2. ) , axis=0)
 
-    f_SpecVar_v = 1. - f_CrossProd_v / (np.sqrt(f_AutoProd_v) + EPS)
-    f_SpecVar_v[0] = f_SpecVar_v[1]    # === the first value is alway incorrect because of "c.f_DistrPts_m .* [zeros(c.i_SizeY,1)"
+        f_SpecVar_v = 1. - f_CrossProd_v / (np.sqrt(f_AutoProd_v) + EPS)
+        f_SpecVar_v[0] = f_SpecVar_v[1]    # === the first value is alway incorrect because of "c.f_DistrPts_m .* [zeros(c.i_SizeY,1)"
+        descHub_d['SpecVar'] = {'value': f_SpecVar_v.reshape(1, f_SpecVar_v.shape[0])}    # spectral variation - OK
 
     """ Energy """
-    f_Energy_v = np.sum(f_DistrPts_m, axis=0)
+    if 'FrameErg' in desc_l:
+        f_Energy_v = np.sum(f_DistrPts_m, axis=0)
+        descHub_d['FrameErg'] = {'value': f_Energy_v.reshape(1, f_Energy_v.shape[0])}    # frame energy - OK
+
+    if 'SpecFlat' in desc_l or 'SpecCrest' in desc_l:
+        f_ArthMean_v = np.sum(f_DistrPts_m, axis=0) / float(i_SizeY)
 
     """ Spectral Flatness """
-    f_GeoMean_v = np.exp( (1. / i_SizeY) * np.sum(np.log( f_DistrPts_m+EPS ), axis=0) )
-    f_ArthMean_v = np.sum(f_DistrPts_m, axis=0) / float(i_SizeY)
-    f_SpecFlat_v = f_GeoMean_v / (f_ArthMean_v+EPS)
+    if 'SpecFlat' in desc_l:
+        f_GeoMean_v = np.exp( (1. / i_SizeY) * np.sum(np.log( f_DistrPts_m+EPS ), axis=0) )
+        f_SpecFlat_v = f_GeoMean_v / (f_ArthMean_v+EPS)
+        descHub_d['SpecFlat'] = {'value': f_SpecFlat_v.reshape(1, f_SpecFlat_v.shape[0])}    # spectral flatness - OK
 
     """ Spectral Crest Measure """
-    f_SpecCrest_v = np.max(f_DistrPts_m, axis=0) / (f_ArthMean_v + EPS)
-
-    # ==============================
-    # ||| Build output structure |||
-    # ==============================
-    descHub_d = {}
-    descHub_d['SpecCent'] = {'value': f_Centroid_v.reshape(1, f_Centroid_v.shape[0])}    # spectral centroid - OK
-    descHub_d['SpecSpread'] = {'value': f_StdDev_v.reshape(1, f_StdDev_v.shape[0])}    # spectral standard deviation - OK
-    descHub_d['SpecSkew'] = {'value': f_Skew_v.reshape(1, f_Skew_v.shape[0])}        # spectral skew - OK
-    descHub_d['SpecKurt'] = {'value': f_Kurtosis_v.reshape(1, f_Kurtosis_v.shape[0])}    # spectral kurtosis - OK
-    descHub_d['SpecSlope'] = {'value': f_Slope_v.reshape(1, f_Slope_v.shape[0])}        # spectral slope - OK
-    descHub_d['SpecDecr'] = {'value': f_SpecDecr_v.reshape(1, f_SpecDecr_v.shape[0])}    # spectral decrease - ?
-    descHub_d['SpecRollOff'] = {'value': f_SpecRollOff_v.reshape(1, f_SpecRollOff_v.shape[0])}# spectral roll-off  - OK
-    descHub_d['SpecVar'] = {'value': f_SpecVar_v.reshape(1, f_SpecVar_v.shape[0])}    # spectral variation - OK
-    descHub_d['FrameErg'] = {'value': f_Energy_v.reshape(1, f_Energy_v.shape[0])}    # frame energy - OK
-
-    descHub_d['SpecFlat'] = {'value': f_SpecFlat_v.reshape(1, f_SpecFlat_v.shape[0])}    # spectral flatness - OK
-    descHub_d['SpecCrest'] = {'value': f_SpecCrest_v.reshape(1, f_SpecCrest_v.shape[0])}    # spectral crest - OK
+    if 'SpecCrest' in desc_l:
+        f_SpecCrest_v = np.max(f_DistrPts_m, axis=0) / (f_ArthMean_v + EPS)
+        descHub_d['SpecCrest'] = {'value': f_SpecCrest_v.reshape(1, f_SpecCrest_v.shape[0])}    # spectral crest - OK
 
     return descHub_d
 
@@ -664,6 +754,8 @@ def F_representationFft(audio_v, sr_hz):
     """
     """
 
+    import scipy.signal
+
     #print "F_representationFft"
 
     #i_FFTSize    = 2048;
@@ -721,7 +813,7 @@ def F_representationFft(audio_v, sr_hz):
 
 
 
-def F_representationHarmonic(f_Sig_v, Fs):
+def F_representationHarmonic(f_Sig_v, Fs, config_s=config_s):
     """
         Compute Harmonic representation (seems Ok)
         name: unknown
@@ -729,6 +821,8 @@ def F_representationHarmonic(f_Sig_v, Fs):
         @return
     """
 
+    import swipep as swp
+
     #print "F_representationHarmonic"
 
     f0_hz_v = []
@@ -1044,6 +1138,8 @@ def F_evalbp(bp, x_v):
 #  @return
 #
 def outmidear(x, Fs):
+    import scipy.signal
+
     maf, f    = isomaf([], 'killion');                        # minimum audible field sampled at f
     g,tg     = isomaf([1000])-maf;                            # gain re: 1kHz
     g        = pow(10., g/20.);                                # dB to lin
@@ -1399,6 +1495,7 @@ def F_comparepics2(input_v, lag_n=2, do_affiche=0, lag2_n=0, seuil=0):
 
 # ==========================
 def main(argv):
+    from scipy.io import wavfile
     filename = '/Users/peeters/_work/_sound/_collection/adobe_soundFX/Cartoon/Cartoon Balloon Air Release 01.wav'
     sr_hz, audio_m = wavfile.read(filename)
     audio_v = np.mean(audio_m, axis=1)
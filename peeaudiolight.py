@@ -31,22 +31,9 @@
 """
 
 
-import sys, getopt
 import numpy as np
-#from scipy.fftpack import *
-import scipy.io.wavfile
-from scipy.signal import *
-# median filtering
-import scipy as sp
-
 import os
-from subprocess import Popen, PIPE
-import time
-import cPickle as pickle
-#import ipdb
-import math
-from scipy.ndimage import median_filter
-import ipdb
+# --- scipy modules are imported by the methods which use them (scipy.io.wavfile, scipy.ndimage): importing them costs more than most excerpts analysis
 
 
 
@@ -216,6 +203,16 @@ class C_Descriptor():
     # ===============================================
     def M_fitzGerald(self, L_sec=0.08, STEP_sec=0.02):
         """
+            Harmonic/Percussive/Residual ratios (mean over the frames)
+        """
+
+        return F_hpssRatio(self.M_fitzGeraldFrame(L_sec, STEP_sec))
+
+
+    def M_fitzGeraldFrame(self, L_sec=0.08, STEP_sec=0.02):
+        """
+            Total/Harmonic/Percussive/Residual energies of each frame: ener_m (4, nbFrame)
+            (frame i at time self.x_start + i/self.x_sr_hz)
         """
 
         # === PARAM ===
@@ -229,6 +226,8 @@ class C_Descriptor():
         param_beta = 1.5    # === Driegder
         # === PARAM ===
 
+        from scipy.ndimage import median_filter
+
         nbChannel = self.data_v.shape[0]
         NN = self.data_v.shape[1]
         nbFrame = self.data_v.shape[2]
@@ -273,12 +272,21 @@ class C_Descriptor():
         enerPercu_v = np.mean(np.mean(np.multiply(amfft_3m, MaskP_3m), axis=0), axis=0)
         enerResi_v = np.mean(np.mean(np.multiply(amfft_3m, MaskR_3m), axis=0), axis=0)
 
-        pos_v = np.where(enerTotal_v > 0.0)
-        C1 = np.mean(np.divide(enerHarmo_v[pos_v], enerTotal_v[pos_v]), axis=0)
-        C2 = np.mean(np.divide(enerPercu_v[pos_v], enerTotal_v[pos_v]), axis=0)
-        C3 = np.mean(np.divide(enerResi_v[pos_v], enerTotal_v[pos_v]), axis=0)
+        return np.vstack((enerTotal_v, enerHarmo_v, enerPercu_v, enerResi_v))
+
+
+def F_hpssRatio(ener_m):
+    """
+        Harmonic/Percussive/Residual ratios from the energies of the frames (see M_fitzGeraldFrame)
+    """
 
-        return C1, C2, C3
+    enerTotal_v, enerHarmo_v, enerPercu_v, enerResi_v = ener_m
+    pos_v = np.where(enerTotal_v > 0.0)
+    C1 = np.mean(np.divide(enerHarmo_v[pos_v], enerTotal_v[pos_v]), axis=0)
+    C2 = np.mean(np.divide(enerPercu_v[pos_v], enerTotal_v[pos_v]), axis=0)
+    C3 = np.mean(np.divide(enerResi_v[pos_v], enerTotal_v[pos_v]), axis=0)
+
+    return C1, C2, C3
 
 
 class C_AudioAnalysis(C_Descriptor):
@@ -290,19 +298,35 @@ class C_AudioAnalysis(C_Descriptor):
     **Status:** OK
     """
 
-    def __init__(self, audioFile, do_stereo2mono=False):
+    def __init__(self, audioFile, do_stereo2mono=False, start_sec=-1., stop_sec=-1., decoder_l=[]):
+        """
+            start_sec, stop_sec: if start_sec >= 0, only the samples of [start_sec, stop_sec[ are read
+            (stop_sec < 0: until the end); the file is memory-mapped, the rest of it is never read
+            decoder_l: command line of a decoder writing audioFile as wav on its standard output (e.g. mp3, flac),
+            the decoded samples are read from the pipe (no temporary file)
+        """
 
         assert(os.path.isfile(audioFile)), "file '%s' does not exist" % (audioFile)
-        assert(audioFile.endswith('wav')), "file '%s' must be a .wav file" % (audioFile)
-
-        sr_hz, data_v = scipy.io.wavfile.read(audioFile)
+        assert(audioFile.endswith('wav') or len(decoder_l)), "file '%s' must be a .wav file (or a decoder must be given)" % (audioFile)
+
+        x_start = 0.
+        if len(decoder_l):
+            sr_hz, data_v = F_decodeWav(decoder_l + [audioFile])
+            if start_sec >= 0:
+                startSample = min(max(int(round(start_sec * sr_hz)), 0), len(data_v))
+                stopSample = len(data_v) if stop_sec < 0 else min(max(int(round(stop_sec * sr_hz)), startSample), len(data_v))
+                data_v = data_v[startSample:stopSample]
+                x_start = float(startSample) / sr_hz
+        elif start_sec >= 0:
+            sr_hz, data_v, startSample = F_readWavSegment(audioFile, start_sec, stop_sec)
+            x_start = float(startSample) / sr_hz
+        else:
+            import scipy.io.wavfile
+            sr_hz, data_v = scipy.io.wavfile.read(audioFile)
 
         # --- 2018/07/09: to speed up computation: only consider first 30sec
         #data_v = data_v[:10*sr_hz, :]
 
-        # --- data_v (LT_n, nbChannel)
-        data_v = data_v / 32767.0
-
         # --- data_v (length, nbChannel)
         # --- ou
         # --- data_v (length, )
@@ -310,16 +334,136 @@ class C_AudioAnalysis(C_Descriptor):
             data_v = np.reshape(data_v, (len(data_v), 1))
         else:
             if do_stereo2mono:
-                # --- reduce stereo -> mono
+                # --- reduce stereo -> mono (before scaling: avoids a float copy of all channels)
                 data_v = np.mean(data_v, axis=1)
                 data_v = np.reshape(data_v, (len(data_v), 1))
 
+        # --- data_v (LT_n, nbChannel)
+        data_v = data_v / 32767.0
+
         # --- convert to data_v (nbChannel, LT_n)
         data_v = data_v.T
 
 
         # --- C_Descriptor.__init__(self, audioFile, data_v, 'Time [sec]', sr_hz, 0., 'Audio-value', 1., 0.)
-        C_Descriptor.__init__(self, 'audio', data_v, 'Time [sec]', sr_hz, 0., 'Audio-value', 1., 0.)
+        C_Descriptor.__init__(self, 'audio', data_v, 'Time [sec]', sr_hz, x_start, 'Audio-value', 1., 0.)
+
+
+def F_parseWavHeader(fid, name=''):
+    """
+        Read the header of a RIFF/WAVE stream up to the start of the samples (fid is not seeked: it can be a pipe)
+        Return a dict with sr_hz, nbChannel, dtype (numpy), blockAlign, dataOffset and dataSize (as written in the header, bytes)
+    """
+
+    import struct
+
+    riff, riffSize, wave = struct.unpack('<4sI4s', fid.read(12))
+    if riff != b'RIFF' or wave != b'WAVE':
+        raise ValueError("'%s' is not a RIFF/WAVE file" % name)
+
+    header_d = {}
+    offset = 12
+    while True:
+        chunk = fid.read(8)
+        if len(chunk) < 8:
+            raise ValueError("'%s' has no data chunk" % name)
+        chunkId, chunkSize = struct.unpack('<4sI', chunk)
+        offset += 8
+        if chunkId == b'data':
+            if len(header_d) == 0:
+                raise ValueError("'%s': data chunk before fmt chunk" % name)
+            header_d['dataOffset'] = offset
+            header_d['dataSize'] = chunkSize
+            return header_d
+        content = fid.read(chunkSize + (chunkSize % 2))
+        offset += chunkSize + (chunkSize % 2)
+        if chunkId == b'fmt ':
+            audioFormat, nbChannel, sr_hz, byteRate, blockAlign, bitsPerSample = struct.unpack('<HHIIHH', content[0:16])
+            if audioFormat == 0xFFFE and chunkSize >= 26:
+                # --- WAVE_FORMAT_EXTENSIBLE: the format is the first 2 bytes of the sub-format GUID
+                audioFormat = struct.unpack('<H', content[24:26])[0]
+            if audioFormat == 1 and bitsPerSample in [8, 16, 32]:
+                dtype = {8: 'u1', 16: '<i2', 32: '<i4'}[bitsPerSample]
+            elif audioFormat == 3 and bitsPerSample in [32, 64]:
+                dtype = {32: '<f4', 64: '<f8'}[bitsPerSample]
+            else:
+                raise ValueError("'%s': unsupported format %d/%d bits" % (name, audioFormat, bitsPerSample))
+            header_d = {'sr_hz': sr_hz, 'nbChannel': nbChannel, 'dtype': dtype, 'blockAlign': blockAlign}
+
+
+def F_readWavHeader(audioFile):
+    """
+        Read the header of a wav file (without reading the samples)
+        Return a dict with sr_hz, nbChannel, dtype (numpy), blockAlign, dataOffset (bytes), nbSample (per channel)
+    """
+
+    with open(audioFile, 'rb') as fid:
+        header_d = F_parseWavHeader(fid, audioFile)
+    # --- streamed files may have a wrong data size: trust the file size
+    dataSize = min(header_d['dataSize'], os.path.getsize(audioFile) - header_d['dataOffset'])
+    header_d['nbSample'] = dataSize // header_d['blockAlign']
+    return header_d
+
+
+def F_decodeWav(command_l):
+    """
+        Run a decoder writing a wav stream on its standard output and read the samples from the pipe
+        Return sr_hz, data_v (nbSample, nbChannel) or (nbSample, ) (same as scipy.io.wavfile.read)
+    """
+
+    import struct
+    import subprocess
+
+    # --- unbuffered: the header is read from the pipe, then communicate() reads the samples (and stderr) from the same position
+    process = subprocess.Popen(command_l, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    try:
+        header_d = F_parseWavHeader(process.stdout, command_l[-1])
+    except (ValueError, struct.error):
+        if process.poll() is None:
+            process.kill()
+        data, error = process.communicate()
+        raise ValueError("decoder '%s' did not write a wav stream for '%s': %s" % (command_l[0], command_l[-1], error.strip()))
+    data, error = process.communicate()
+    if process.returncode != 0:
+        raise Exception("decoder '%s' failed on '%s': %s" % (command_l[0], command_l[-1], error.strip()))
+
+    # --- the data size of a stream is unknown when the header is written (0 or a placeholder): trust the stream length
+    dataSize = len(data)
+    if 0 < header_d['dataSize'] < dataSize:
+        dataSize = header_d['dataSize']
+    dataSize -= dataSize % header_d['blockAlign']
+    data_v = np.frombuffer(data, dtype=header_d['dtype'], count=dataSize // np.dtype(header_d['dtype']).itemsize)
+    data_v = np.reshape(data_v, (-1, header_d['nbChannel']))
+    if header_d['nbChannel'] == 1:
+        data_v = data_v[:, 0]
+    return header_d['sr_hz'], data_v
+
+
+def F_readWavSegment(audioFile, start_sec, stop_sec=-1.):
+    """
+        Read the samples of [start_sec, stop_sec[ of a wav file through a memory map
+        Return sr_hz, data_v (nbSample, nbChannel) or (nbSample, ), startSample
+    """
+
+    header_d = F_readWavHeader(audioFile)
+    sr_hz = header_d['sr_hz']
+    startSample = min(max(int(round(start_sec * sr_hz)), 0), header_d['nbSample'])
+    stopSample = header_d['nbSample']
+    if stop_sec >= 0:
+        stopSample = min(max(int(round(stop_sec * sr_hz)), startSample), header_d['nbSample'])
+
+    nbSample = stopSample - startSample
+    if nbSample == 0:
+        data_v = np.zeros((0, header_d['nbChannel']), dtype=header_d['dtype'])
+    else:
+        data_m = np.memmap(audioFile, dtype=header_d['dtype'], mode='r', offset=header_d['dataOffset'] + startSample * header_d['blockAlign'],
+                           shape=(nbSample, header_d['nbChannel']))
+        data_v = np.array(data_m)
+        del data_m
+    # --- same shapes as scipy.io.wavfile.read
+    if header_d['nbChannel'] == 1:
+        data_v = data_v[:, 0]
+    return sr_hz, data_v, startSample
 
 
 def F_nextPow2(i):
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# imdtest.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Fixtures of the tests: synthetic audio files, stand-in executables (imdABCDJ, decoders)
+    and the imdABCDJ description of tests/data
+
+    The tests are run from the root of the repository with
+        python -m unittest discover -s tests
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import stat
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# --- imdABCDJ description (xml) of the tests
+XML_FILE = os.path.join(ROOT_DIR, 'tests', 'data', 'description.xml')
+
+
+def F_writeWav(audioFile, duration_sec=2., sr_hz=44100, nbChannel=1, seed=0):
+    """
+        Write a 16 bits wav file: a few harmonics plus noise
+    """
+
+    import scipy.io.wavfile
+
+    rng = np.random.RandomState(seed)
+    time_v = np.arange(int(duration_sec * sr_hz)) / float(sr_hz)
+    audio_v = sum([np.sin(2 * np.pi * 220. * h * time_v) / h for h in range(1, 6)]) + 0.1 * rng.randn(len(time_v))
+    audio_v = np.round(audio_v / np.max(np.abs(audio_v)) * 20000.).astype(np.int16)
+    if nbChannel > 1:
+        audio_v = np.tile(audio_v[:, np.newaxis], (1, nbChannel))
+    scipy.io.wavfile.write(audioFile, sr_hz, audio_v)
+    return audioFile
+
+
+def F_writeScript(scriptFile, text):
+    """
+        Write an executable shell script
+    """
+
+    with open(scriptFile, 'w') as fid:
+        fid.write('#!/bin/sh\n' + text)
+    os.chmod(scriptFile, os.stat(scriptFile).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return scriptFile
+
+
+class C_testCase(unittest.TestCase):
+    """
+        class definition for a test with its own temporary folder (self.tmpDir, removed afterwards)
+    """
+
+    tmpDir = ''
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp(prefix='imdABCDJtest-') + '/'
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir, ignore_errors=True)
+
+
+    def M_path(self, name):
+        return os.path.join(self.tmpDir, name)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# test_batch.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the batch driver (imdABCDJbatch): worker processes which die
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import time
+import signal
+import unittest
+
+import imdtest
+import imdABCDJbatch
+
+
+def F_runJob(arg_t, input_d=None, jobSink=None):
+    """ stand-in F_runJob: the job 'die' kills its worker """
+    job_d, TMP_DIR, do_profile = arg_t
+    if job_d['id'] == 'die':
+        os.kill(os.getpid(), signal.SIGKILL)
+    time.sleep(0.2)
+    return {'id': job_d['id'], 'status': 'ok', 'error': '', 'pid': os.getpid(), 'time': 0.2}
+
+
+class C_testPool(imdtest.C_testCase):
+
+    def setUp(self):
+        imdtest.C_testCase.setUp(self)
+        self.F_runJob, self.grace_sec = imdABCDJbatch.F_runJob, imdABCDJbatch.DEAD_GRACE_sec
+        # --- (inherited by the forked workers)
+        imdABCDJbatch.F_runJob = F_runJob
+        imdABCDJbatch.DEAD_GRACE_sec = 1.
+
+
+    def tearDown(self):
+        imdABCDJbatch.F_runJob, imdABCDJbatch.DEAD_GRACE_sec = self.F_runJob, self.grace_sec
+        imdtest.C_testCase.tearDown(self)
+
+
+    def test_workerDeath(self):
+        """ the job of a dead worker is failed, the other jobs run, the pool does not hang """
+        pending_l = [(1., 1., num, {'id': id}) for num, id in enumerate(['a', 'die', 'b', 'c'])]
+        status_l = []
+        t = time.time()
+        imdABCDJbatch.F_computePool(pending_l, status_l.append, 2, self.tmpDir, False, 1000., None, ('', 10240, 'json', '', '', ''))
+        self.assertTrue(time.time() - t < 30.)
+        status_d = dict((status_d['id'], status_d) for status_d in status_l)
+        self.assertEqual(sorted(status_d.keys()), ['a', 'b', 'c', 'die'])
+        self.assertEqual(status_d['die']['status'], 'failed')
+        self.assertTrue('died' in status_d['die']['error'])
+        self.assertEqual([status_d[id]['status'] for id in ['a', 'b', 'c']], ['ok', 'ok', 'ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
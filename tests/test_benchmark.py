@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# test_benchmark.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the measures of the benchmark (imdABCDJbenchmark)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import unittest
+import numpy as np
+
+import imdtest
+import imdABCDJbenchmark
+
+
+class C_testBenchmark(imdtest.C_testCase):
+
+    def test_peakBeforeStage(self):
+        """ peak memory of the process reached before the stage: the memory of the stage is sampled """
+        wavFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        # --- 400 MB resident, then released
+        data_v = np.ones(50 * 1000 * 1000)
+        del data_v
+        record_d = imdABCDJbenchmark.F_runStage('F_computeDescriptorEnv', wavFile)
+        self.assertTrue(record_d['mem_sampled'])
+        self.assertGreaterEqual(record_d['mem_kb'], 0)
+        self.assertLess(record_d['mem_kb'], 200 * 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
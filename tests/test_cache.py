@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# test_cache.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the on-disk cache (imdABCDJcache) shared by the threads of a process
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import unittest
+import multiprocessing.pool
+
+import imdtest
+import imdABCDJcache
+import imdABCDJhardfeatures
+
+
+class C_testCache(imdtest.C_testCase):
+
+    def M_extract(self, audioFile, myCache):
+        return imdABCDJhardfeatures.F_extract(audioFile, imdtest.XML_FILE, myCache=myCache)
+
+
+    def test_threadPool(self):
+        """ F_extract from a pool of threads sharing one cache: same results and counters as serial runs """
+        audioFile_l = [imdtest.F_writeWav(self.M_path('%d.wav' % num), seed=num) for num in range(2)]
+        serialCache = imdABCDJcache.C_cache(self.M_path('serial'))
+        serial_l = [self.M_extract(audioFile, serialCache) for audioFile in audioFile_l]
+
+        sharedCache = imdABCDJcache.C_cache(self.M_path('shared'))
+        pool = multiprocessing.pool.ThreadPool(2)
+        try:
+            thread_l = pool.map(lambda audioFile: self.M_extract(audioFile, sharedCache), audioFile_l)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertEqual(repr(thread_l), repr(serial_l))
+        self.assertEqual((sharedCache.nbHit, sharedCache.nbMiss), (serialCache.nbHit, serialCache.nbMiss))
+        self.assertEqual(sharedCache.count_d, serialCache.count_d)
+        self.assertEqual(sharedCache.size_byte, sum([size for path, mtime, size in sharedCache.M_listEntry()]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# test_catalog.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the catalog (imdABCDJcatalog): reading the outputs of imdABCDJhardfeatures
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import json
+import unittest
+
+import imdtest
+import imdABCDJsink
+import imdABCDJcatalog
+
+
+class C_testReadResult(imdtest.C_testCase):
+
+    def test_folder(self):
+        """ only the results are read from a folder shared with manifests, journals, profiles and time series indexes """
+        mySink = imdABCDJsink.C_ndjsonSink(self.tmpDir)
+        mySink.M_write({'filepath': 'a.wav', 'ICB_BPM_Mean': 120.})
+        mySink.M_close()
+        imdABCDJsink.C_jsonSink().M_write({'filepath': 'b.wav', 'ICB_BPM_Mean': 90.}, self.M_path('b.hardFeatures.json'))
+        other_d = {'jobs.ndjson': {'audioFileFull': 'c.wav', 'xmlFile': 'c.xml'},
+                   'journal.ndjson': {'fingerprint': 'f1', 'id': '1', 'state': 'done'},
+                   'series-1-2.ndjson': {'filepath': 'd.wav', 'offset': 0},
+                   'b.hardFeatures.json.profile.json': {'stage_d': {}},
+                   'settings.json': {'nlist': 16}}
+        for name, record_d in other_d.items():
+            with open(self.M_path(name), 'w') as fid:
+                fid.write(json.dumps(record_d) + '\n')
+        result_l = sorted(imdABCDJcatalog.F_readResult(self.tmpDir), key=lambda result_d: result_d['filepath'])
+        self.assertEqual(result_l, [{'filepath': 'a.wav', 'ICB_BPM_Mean': 120.}, {'filepath': 'b.wav', 'ICB_BPM_Mean': 90.}])
+
+
+if __name__ == '__main__':
+    unittest.main()
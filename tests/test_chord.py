@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# test_chord.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the count of the chord progressions (imdABCDJhardfeatures.C_progressionMatcher)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import unittest
+import numpy as np
+
+import imdtest
+import imdABCDJhardfeatures
+
+
+def F_countLoop(chord_l, interval_l):
+    """
+        Count of a progression by the loop over the chords of F_parseChord before C_progressionMatcher
+    """
+
+    chordName_l = imdABCDJhardfeatures.C_harmonicInformation().chordName_l
+    count = 0
+    for numChord in range(len(interval_l), len(chord_l)):
+        rootNote_l = [chordName_l.index(chord) % 12 for chord in chord_l[numChord-len(interval_l):numChord+1]]
+        if all([imdABCDJhardfeatures.F_isIntervalDown(rootNote_l[num], rootNote_l[num+1], interval) for num, interval in enumerate(interval_l)]):
+            count += 1
+    return count
+
+
+class C_testChord(unittest.TestCase):
+
+    def test_progression(self):
+        """ same counts as the loops, on chords containing every progression of PROGRESSION_l """
+        myHarmonicInformation = imdABCDJhardfeatures.C_harmonicInformation()
+        chordName_l = myHarmonicInformation.chordName_l
+        rng = np.random.RandomState(0)
+        chord_l = []
+        for repeat in range(3):
+            for name, interval_l in imdABCDJhardfeatures.PROGRESSION_l:
+                # --- the progression from a random root (random chord types), then random chords
+                rootNote = rng.randint(12)
+                rootNote_l = [rootNote]
+                for interval in interval_l:
+                    rootNote_l.append((rootNote_l[-1] - interval) % 12)
+                chord_l += [chordName_l[12 * rng.randint(4) + rootNote] for rootNote in rootNote_l]
+                chord_l += [chordName_l[num] for num in rng.randint(len(chordName_l), size=rng.randint(4))]
+
+        rootNote_v = np.array([myHarmonicInformation.chordIndex_d[chord] for chord in chord_l]) % 12
+        count_v = imdABCDJhardfeatures.PROGRESSION_MATCHER.M_count(rootNote_v)
+        loopCount_l = [F_countLoop(chord_l, interval_l) for name, interval_l in imdABCDJhardfeatures.PROGRESSION_l]
+        self.assertEqual(list(count_v), loopCount_l)
+        self.assertTrue(all([count >= 3 for count in loopCount_l]))
+
+
+    def test_shortSequence(self):
+        """ no progression in less than two chords """
+        for rootNote_l in [[], [7]]:
+            count_v = imdABCDJhardfeatures.PROGRESSION_MATCHER.M_count(rootNote_l)
+            self.assertEqual(list(count_v), [0] * len(imdABCDJhardfeatures.PROGRESSION_l))
+
+
+if __name__ == '__main__':
+    unittest.main()
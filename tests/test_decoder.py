@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# test_decoder.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the decoding of compressed files through a pipe (imdABCDJhardfeatures.F_decoder, peeaudiolight.F_decodeWav),
+    with a stand-in decoder which writes a wav file on its standard output
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import struct
+import unittest
+import numpy as np
+
+import imdtest
+import imdABCDJhardfeatures
+
+
+class C_testDecoder(imdtest.C_testCase):
+
+    def M_execD(self, text='for f; do :; done; cat "$f"\n'):
+        """ stand-in mpg123: writes its last argument (a wav file named .mp3) on stdout """
+        exec_d = dict(imdABCDJhardfeatures.exec_d)
+        exec_d['MPG123'] = imdtest.F_writeScript(self.M_path('mpg123'), text)
+        return exec_d
+
+
+    def M_compare(self, wavFile, mp3File, exec_d):
+        """ the samples read from the pipe are the ones read from the wav file, for the whole track and an excerpt """
+        for window_t in [(-1., -1.), (0.5, 1.2), (1.5, -1.)]:
+            wavAudio = imdABCDJhardfeatures.F_loadAudio(wavFile, window_t=window_t)
+            mp3Audio = imdABCDJhardfeatures.F_loadAudio(mp3File, window_t=window_t, exec_d=exec_d)
+            self.assertEqual(mp3Audio.x_sr_hz, wavAudio.x_sr_hz)
+            self.assertEqual(mp3Audio.x_start, wavAudio.x_start)
+            self.assertTrue(np.array_equal(mp3Audio.data_v, wavAudio.data_v))
+
+
+    def test_pipe(self):
+        for nbChannel in [1, 2]:
+            wavFile = imdtest.F_writeWav(self.M_path('a%d.wav' % nbChannel), nbChannel=nbChannel)
+            mp3File = imdtest.F_writeWav(self.M_path('a%d.mp3' % nbChannel), nbChannel=nbChannel)
+            self.M_compare(wavFile, mp3File, self.M_execD())
+
+
+    def test_streamHeader(self):
+        """ a stream header has no data size (0xFFFFFFFF or 0 placeholder): the stream length is used """
+        wavFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        with open(wavFile, 'rb') as fid:
+            data = fid.read()
+        pos = data.index(b'data') + 4
+        for placeholder in [0xFFFFFFFF, 0]:
+            mp3File = self.M_path('a-%d.mp3' % placeholder)
+            with open(mp3File, 'wb') as fid:
+                fid.write(data[:4] + struct.pack('<I', placeholder) + data[8:pos] + struct.pack('<I', placeholder) + data[pos+4:])
+            self.M_compare(wavFile, mp3File, self.M_execD())
+
+
+    def test_failure(self):
+        mp3File = imdtest.F_writeWav(self.M_path('a.mp3'))
+        with self.assertRaisesRegexp(Exception, 'did not write a wav stream'):
+            imdABCDJhardfeatures.F_loadAudio(mp3File, exec_d=self.M_execD('echo "cannot decode" >&2; exit 1\n'))
+        with self.assertRaisesRegexp(Exception, 'failed on'):
+            imdABCDJhardfeatures.F_loadAudio(mp3File, exec_d=self.M_execD('for f; do :; done; cat "$f"; exit 1\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
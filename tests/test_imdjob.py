@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# test_imdjob.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of imdABCDJhardfeatures.C_imdJob with a stand-in imdABCDJ executable
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import json
+import shutil
+import subprocess
+import unittest
+
+import imdtest
+import imdABCDJhardfeatures
+
+
+class C_testImdJob(imdtest.C_testCase):
+
+    def M_execD(self, text):
+        exec_d = dict(imdABCDJhardfeatures.exec_d)
+        exec_d['imdABCDJ'] = imdtest.F_writeScript(self.M_path('imdABCDJ'), text)
+        return exec_d
+
+
+    def test_output(self):
+        """ the description written by imdABCDJ (-i audioFile -o xmlFile) is parsed """
+        exec_d = self.M_execD('cp %s "$4"\n' % imdtest.XML_FILE)
+        audioFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        info_d = imdABCDJhardfeatures.F_decodeAndCompute(audioFile, self.M_path('tmp/'), exec_d=exec_d)
+        self.assertTrue(info_d['description'] is not None)
+        self.assertTrue(os.path.exists(info_d['xmlFile']))
+
+
+    def test_noOutput(self):
+        """ imdABCDJ exits without error but writes nothing: clear error, no temporary file left """
+        exec_d = self.M_execD('exit 0\n')
+        audioFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        with self.assertRaisesRegexp(Exception, 'imdABCDJ wrote no output'):
+            imdABCDJhardfeatures.F_decodeAndCompute(audioFile, self.M_path('tmp/'), exec_d=exec_d)
+        self.assertEqual(os.listdir(self.M_path('tmp/')), [])
+
+
+    def test_failure(self):
+        exec_d = self.M_execD('exit 3\n')
+        audioFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        with self.assertRaisesRegexp(Exception, r'imdABCDJ failed \(3\)'):
+            imdABCDJhardfeatures.F_decodeAndCompute(audioFile, self.M_path('tmp/'), exec_d=exec_d)
+
+
+class C_testUsage1(imdtest.C_testCase):
+    """
+        Usage 1 (audioFileFull, audioFileExtract) with stand-in imdABCDJ and mpg123
+    """
+
+    def M_configS(self, imdText):
+        exec_d = dict(imdABCDJhardfeatures.exec_d)
+        exec_d['imdABCDJ'] = imdtest.F_writeScript(self.M_path('imdABCDJ'), imdText)
+        # --- stand-in mpg123: logs its calls, writes its last argument (a wav file named .mp3) on stdout
+        exec_d['MPG123'] = imdtest.F_writeScript(self.M_path('mpg123'), 'for f; do :; done; echo "$f" >> %s; cat "$f"\n' % self.M_path('decoder.log'))
+        return imdABCDJhardfeatures.config_s._replace(exec_d=exec_d)
+
+
+    def M_compute(self, ext, config_s, sliceExtract=False):
+        audioFileFull = imdtest.F_writeWav(self.M_path('full' + ext), duration_sec=4.)
+        audioFileExtract = imdtest.F_writeWav(self.M_path('extract' + ext), duration_sec=1., seed=1)
+        jsonFile = self.M_path('out%s-%d.json' % (ext, sliceExtract))
+        imdABCDJhardfeatures.F_computeOneFile(audioFileFull=audioFileFull, audioFileExtract=audioFileExtract, startExtract=1., stopExtract=2., jsonFile=jsonFile,
+                                              TMP_DIR=self.M_path('tmp/'), sliceExtract=sliceExtract, config_s=config_s)
+        with open(jsonFile, 'r') as fid:
+            myResult = json.load(fid)
+        del myResult['filepath']
+        return myResult
+
+
+    def test_decodedOnce(self):
+        """ each mp3 is decoded once: the audio stages read the wav decoded for imdABCDJ; the features are those of the wav files """
+        config_s = self.M_configS('cp %s "$4"\n' % imdtest.XML_FILE)
+        for sliceExtract in [False, True]:
+            wavResult = self.M_compute('.wav', config_s, sliceExtract)
+            if os.path.exists(self.M_path('decoder.log')):
+                os.remove(self.M_path('decoder.log'))
+            shutil.rmtree(self.M_path('tmp/'))
+            mp3Result = self.M_compute('.mp3', config_s, sliceExtract)
+            with open(self.M_path('decoder.log'), 'r') as fid:
+                self.assertEqual(sorted(fid.read().split()), [self.M_path('extract.mp3'), self.M_path('full.mp3')])
+            self.assertEqual(mp3Result, wavResult)
+            self.assertEqual([name for name in os.listdir(self.M_path('tmp/')) if name.endswith('.wav')], [])
+
+
+    def test_secondJobFails(self):
+        """ the imdABCDJ process of the full track is stopped when the job of the extract cannot be created """
+        config_s = self.M_configS('sleep 60\n')
+        imdtest.F_writeWav(self.M_path('extract.ogg'))
+        process_l = []
+
+        def F_popen(*arg_l, **arg_d):
+            process_l.append(Popen(*arg_l, **arg_d))
+            return process_l[-1]
+
+        Popen = subprocess.Popen
+        subprocess.Popen = F_popen
+        try:
+            with self.assertRaisesRegexp(Exception, 'no decoder'):
+                imdABCDJhardfeatures.F_computeOneFile(audioFileFull=imdtest.F_writeWav(self.M_path('full.wav')), audioFileExtract=self.M_path('extract.ogg'),
+                                                      startExtract=0., stopExtract=1., jsonFile=self.M_path('out.json'), TMP_DIR=self.M_path('tmp/'), config_s=config_s)
+        finally:
+            subprocess.Popen = Popen
+        # --- the process was started, then killed and reaped
+        self.assertEqual(len(process_l), 1)
+        self.assertTrue(process_l[0].returncode is not None)
+        with self.assertRaises(OSError):
+            os.kill(process_l[0].pid, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# test_journal.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the journal of imdABCDJbatch (imdABCDJjournal): resuming a run with the bulk sinks
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import glob
+import unittest
+
+import imdtest
+import imdABCDJsink
+import imdABCDJjournal
+import imdABCDJbatch
+
+
+class C_testJournal(imdtest.C_testCase):
+
+    def M_persist(self, myJournal):
+        def F_persist(record_d, output_l, append_l):
+            myJournal.M_append(dict(record_d, state='done', output_l=output_l, append_l=append_l))
+        return F_persist
+
+
+    def test_noOutput(self):
+        """ a job journaled as done without any output is not done """
+        myJournal = imdABCDJjournal.C_journal(self.M_path('journal.ndjson'))
+        myJournal.M_append({'fingerprint': 'f1', 'id': '1', 'state': 'done', 'output_l': []})
+        self.assertFalse(myJournal.M_isDone('f1'))
+
+
+    def test_columnarBuffered(self):
+        """ a row kept in memory by the columnar sink is not done; it is once its chunk is written, until the chunk is removed """
+        myJournal = imdABCDJjournal.C_journal(self.M_path('journal.ndjson'))
+        mySink = imdABCDJsink.C_columnarSink(self.M_path('out'), maxAge_sec=0.)
+        mySink.F_persist = self.M_persist(myJournal)
+        mySink.M_write({'filepath': 'a.wav', 'ICB_BPM_Mean': 120.}, '', {'fingerprint': 'f1', 'id': '1'})
+        self.assertFalse(myJournal.M_isDone('f1'))
+        mySink.M_close()
+        self.assertTrue(myJournal.M_isDone('f1'))
+        for path in glob.glob(self.M_path('out/*.npy')):
+            os.remove(path)
+        self.assertFalse(imdABCDJjournal.C_journal(self.M_path('journal.ndjson')).M_isDone('f1'))
+
+
+    def test_ndjsonTruncated(self):
+        """ a NDJSON shard may grow (later jobs), but a job whose line was cut off is not done """
+        myJournal = imdABCDJjournal.C_journal(self.M_path('journal.ndjson'))
+        mySink = imdABCDJsink.C_ndjsonSink(self.M_path('out'))
+        mySink.F_persist = self.M_persist(myJournal)
+        mySink.M_write({'filepath': 'a.wav'}, '', {'fingerprint': 'f1', 'id': '1'})
+        mySink.M_write({'filepath': 'b.wav'}, '', {'fingerprint': 'f2', 'id': '2'})
+        mySink.M_close()
+        self.assertTrue(myJournal.M_isDone('f1'))
+        self.assertTrue(myJournal.M_isDone('f2'))
+        shardFile = glob.glob(self.M_path('out/*.ndjson'))[0]
+        with open(shardFile, 'r+') as fid:
+            fid.truncate(os.path.getsize(shardFile) - 2)
+        self.assertTrue(myJournal.M_isDone('f1'))
+        self.assertFalse(myJournal.M_isDone('f2'))
+
+
+    def test_resumeBatch(self):
+        """ a batch written to a columnar sink is resumed: nothing is run again while its chunk exists """
+        job_l = [{'id': str(num), 'audioFileFull': imdtest.F_writeWav(self.M_path('%d.wav' % num), seed=num), 'xmlFile': imdtest.XML_FILE} for num in range(0, 2)]
+        param_d = {'nbWorker': 1, 'TMP_DIR': self.M_path('tmp/'), 'sinkType': 'columnar', 'sinkDir': self.M_path('out'), 'journalFile': self.M_path('journal.ndjson')}
+        status_l = imdABCDJbatch.F_computeBatch([dict(job_d) for job_d in job_l], **param_d)
+        self.assertEqual([status_d['status'] for status_d in status_l], ['ok', 'ok'])
+        status_l = imdABCDJbatch.F_computeBatch([dict(job_d) for job_d in job_l], **param_d)
+        self.assertEqual([status_d['status'] for status_d in status_l], ['done', 'done'])
+        data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(self.M_path('out'))
+        self.assertEqual(data_m.shape[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
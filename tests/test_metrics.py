@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# test_metrics.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the Prometheus metrics file of a batch run (imdABCDJmetrics)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import re
+import unittest
+
+import imdtest
+import imdABCDJmetrics
+
+
+# --- a sample line of the text format: name{label="value",...} value
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)",?')
+UNESCAPE_d = {'\\\\': '\\', '\\"': '"', '\\n': '\n'}
+
+
+def F_parse(metricsFile):
+    """
+        Samples of a metrics file: sample_d[(name, label_t)] = value (label_t sorted, label values unescaped)
+    """
+
+    sample_d = {}
+    with open(metricsFile, 'r') as fid:
+        for line in fid.read().splitlines():
+            if line.startswith('#'):
+                continue
+            name, label, value = SAMPLE_RE.match(line).groups()
+            label_l = []
+            if label is not None:
+                # --- (the whole label set is made of valid label pairs)
+                assert ''.join([pair.group(0) for pair in LABEL_RE.finditer(label)]) == label, line
+                label_l = [(key, re.sub(r'\\.', lambda escape: UNESCAPE_d[escape.group(0)], text)) for key, text in LABEL_RE.findall(label)]
+            sample_d[(name, tuple(sorted(label_l)))] = float(value)
+    return sample_d
+
+
+class C_clock:
+    """
+        class definition for a stand-in of the time module
+    """
+
+    now = 0.
+
+    def time(self):
+        return self.now
+
+
+class C_testMetrics(imdtest.C_testCase):
+
+    def setUp(self):
+        imdtest.C_testCase.setUp(self)
+        self.time = imdABCDJmetrics.time
+        self.clock = C_clock()
+        self.clock.now = 1000.
+        imdABCDJmetrics.time = self.clock
+
+
+    def tearDown(self):
+        imdABCDJmetrics.time = self.time
+        imdtest.C_testCase.tearDown(self)
+
+
+    def test_text(self):
+        """ histograms, counters, escaped labels and throughput over the last RATE_WINDOW seconds """
+        stage = 'quote" back\\slash\nline'
+        metricsFile = self.M_path('batch.prom')
+        myMetrics = imdABCDJmetrics.C_metrics(metricsFile, interval=10., nbJob=4)
+        self.clock.now = 1010.
+        myMetrics.M_jobDone({'id': 'a', 'status': 'ok', 'pid': 11, 'stage_d': {'total': 0.3, stage: 0.07}, 'cache_d': {'ttb': [1, 3]}}, 30.)
+        self.clock.now = 1080.
+        myMetrics.M_jobDone({'id': 'b', 'status': 'ok', 'pid': 12, 'stage_d': {'total': 3.}, 'cache_d': {'ttb': [2, 0]}}, 60.)
+        myMetrics.M_jobDone({'id': 'c', 'status': 'failed', 'pid': 12}, 0.)
+        self.clock.now = 1100.
+        myMetrics.M_update(1, 0, do_force=True)
+        sample_d = F_parse(metricsFile)
+
+        self.assertEqual(sample_d[('imdABCDJ_batch_jobs', ())], 4.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_jobs_completed_total', (('status', 'ok'),))], 2.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_jobs_completed_total', (('status', 'failed'),))], 1.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_audio_seconds_total', ())], 90.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_queue_depth', ())], 1.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_elapsed_seconds', ())], 100.)
+        # --- job a was completed more than RATE_WINDOW seconds ago
+        self.assertAlmostEqual(sample_d[('imdABCDJ_batch_files_per_second', ())], 1. / imdABCDJmetrics.RATE_WINDOW)
+        self.assertAlmostEqual(sample_d[('imdABCDJ_batch_audio_seconds_per_second', ())], 60. / imdABCDJmetrics.RATE_WINDOW)
+        self.assertEqual(sample_d[('imdABCDJ_batch_cache_requests_total', (('namespace', 'ttb'), ('result', 'hit')))], 3.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_cache_requests_total', (('namespace', 'ttb'), ('result', 'miss')))], 3.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_cache_hit_ratio', (('namespace', 'ttb'),))], 0.5)
+
+        # --- cumulative buckets, up to +Inf = _count
+        bound_l = imdABCDJmetrics.BUCKET_l + ['+Inf']
+        count_l = [sample_d[('imdABCDJ_batch_stage_seconds_bucket', (('le', str(bound)), ('stage', 'total')))] for bound in bound_l]
+        self.assertEqual(count_l, [2. if bound == '+Inf' or bound >= 3. else 1. if bound >= 0.3 else 0. for bound in bound_l])
+        self.assertEqual(sample_d[('imdABCDJ_batch_stage_seconds_count', (('stage', 'total'),))], 2.)
+        self.assertAlmostEqual(sample_d[('imdABCDJ_batch_stage_seconds_sum', (('stage', 'total'),))], 3.3)
+        self.assertEqual(sample_d[('imdABCDJ_batch_stage_seconds_count', (('stage', stage),))], 1.)
+        self.assertEqual(sample_d[('imdABCDJ_batch_stage_seconds_bucket', (('le', '0.1'), ('stage', stage)))], 1.)
+
+
+    def test_interval(self):
+        """ the file is rewritten only every interval seconds """
+        metricsFile = self.M_path('batch.prom')
+        myMetrics = imdABCDJmetrics.C_metrics(metricsFile, interval=10.)
+        myMetrics.M_update(3, 0)
+        self.clock.now = 1005.
+        myMetrics.M_update(2, 0)
+        self.assertEqual(F_parse(metricsFile)[('imdABCDJ_batch_queue_depth', ())], 3.)
+        self.clock.now = 1010.
+        myMetrics.M_update(1, 0)
+        self.assertEqual(F_parse(metricsFile)[('imdABCDJ_batch_queue_depth', ())], 1.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# test_parallel.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the low-latency mode (F_computeAudioStage with do_parallel): HPSS in a forked child process
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import threading
+import unittest
+
+import imdtest
+import imdABCDJhardfeatures
+
+
+class C_testParallel(imdtest.C_testCase):
+
+    def setUp(self):
+        imdtest.C_testCase.setUp(self)
+        self.sysconf, self.C_forkCall = os.sysconf, imdABCDJhardfeatures.C_forkCall
+        self.fork_l = []
+
+        def F_forkCall(F_function, arg_t):
+            self.fork_l.append(F_function)
+            return self.C_forkCall(F_function, arg_t)
+
+        # --- two cores, even on a single-core host
+        os.sysconf = lambda name: 2
+        imdABCDJhardfeatures.C_forkCall = F_forkCall
+
+
+    def tearDown(self):
+        os.sysconf, imdABCDJhardfeatures.C_forkCall = self.sysconf, self.C_forkCall
+        imdtest.C_testCase.tearDown(self)
+
+
+    def test_fork(self):
+        """ same results in the forked child as in the process """
+        myAudio = imdABCDJhardfeatures.F_loadAudio(imdtest.F_writeWav(self.M_path('a.wav')))
+        hpss_t, descHub_d = imdABCDJhardfeatures.F_computeAudioStage('', myAudio=myAudio)
+        forkHpss_t, forkDescHub_d = imdABCDJhardfeatures.F_computeAudioStage('', myAudio=myAudio, do_parallel=True)
+        self.assertEqual(len(self.fork_l), 1)
+        self.assertEqual(forkHpss_t, hpss_t)
+        self.assertEqual(sorted(forkDescHub_d.keys()), sorted(descHub_d.keys()))
+
+
+    def test_noForkWithThread(self):
+        """ no fork while another thread runs (its locks would stay held in the child) """
+        myAudio = imdABCDJhardfeatures.F_loadAudio(imdtest.F_writeWav(self.M_path('a.wav')))
+        stopEvent = threading.Event()
+        thread = threading.Thread(target=stopEvent.wait)
+        thread.start()
+        try:
+            imdABCDJhardfeatures.F_computeAudioStage('', myAudio=myAudio, do_parallel=True)
+        finally:
+            stopEvent.set()
+            thread.join()
+        self.assertEqual(self.fork_l, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# test_pipeline.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the bounded read / compute / write pipeline (imdABCDJpipeline)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import time
+import threading
+import unittest
+
+import imdtest
+import imdABCDJpipeline
+
+
+class C_heldReader:
+    """
+        class definition for a stand-in reader which records the number and size of the inputs held at once
+        (from the start of F_read to the end of F_compute)
+    """
+
+    lock = None
+    nbHeld = 0
+    heldSize_byte = 0
+    maxHeld = 0
+    maxHeldSize_byte = 0
+    output_l = []
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.nbHeld = 0
+        self.heldSize_byte = 0
+        self.maxHeld = 0
+        self.maxHeldSize_byte = 0
+        self.output_l = []
+
+
+    def __setattr__(self, attrName, val):
+        if hasattr(self, attrName):
+            self.__dict__[attrName] = val
+        else:
+            raise Exception("self.%s note part of the fields" % attrName)
+
+
+    def F_read(self, job_d):
+        with self.lock:
+            self.nbHeld += 1
+            self.heldSize_byte += job_d['size']
+            self.maxHeld = max(self.maxHeld, self.nbHeld)
+            self.maxHeldSize_byte = max(self.maxHeldSize_byte, self.heldSize_byte)
+        return job_d['num']
+
+
+    def F_compute(self, job_d, input, error):
+        # --- (slower than the readers: they are always ahead)
+        time.sleep(0.01)
+        with self.lock:
+            self.nbHeld -= 1
+            self.heldSize_byte -= job_d['size']
+        return input
+
+
+    def F_write(self, job_d, output):
+        self.output_l.append(output)
+        return
+
+
+    def M_run(self, size_l, depth, memCap_byte):
+        myPipeline = imdABCDJpipeline.C_pipeline(self.F_read, self.F_compute, self.F_write, lambda job_d: job_d['size'],
+                                                 nbReader=3, depth=depth, memCap_byte=memCap_byte)
+        myPipeline.M_run([{'num': num, 'size': size} for num, size in enumerate(size_l)])
+        return
+
+
+class C_testPipeline(imdtest.C_testCase):
+
+    def test_depth(self):
+        """ at most depth inputs read ahead of the one being computed """
+        myReader = C_heldReader()
+        myReader.M_run([10] * 20, depth=2, memCap_byte=1000)
+        self.assertEqual(sorted(myReader.output_l), list(range(20)))
+        self.assertLessEqual(myReader.maxHeld, 3)
+        self.assertGreater(myReader.maxHeld, 1)
+
+
+    def test_noReadAhead(self):
+        """ depth=0: the next input is read once the current one is computed """
+        myReader = C_heldReader()
+        myReader.M_run([10] * 10, depth=0, memCap_byte=1000)
+        self.assertEqual(sorted(myReader.output_l), list(range(10)))
+        self.assertEqual(myReader.maxHeld, 1)
+
+
+    def test_memCap(self):
+        """ the size of the inputs held stays below memCap_byte """
+        myReader = C_heldReader()
+        myReader.M_run([40, 30, 40, 20, 60, 10, 40, 40, 30, 20], depth=5, memCap_byte=100)
+        self.assertEqual(sorted(myReader.output_l), list(range(10)))
+        self.assertLessEqual(myReader.maxHeldSize_byte, 100)
+        self.assertLessEqual(myReader.maxHeld, 6)
+
+
+    def test_largerThanCap(self):
+        """ an input larger than memCap_byte is still read, but alone """
+        myReader = C_heldReader()
+        myReader.M_run([10, 200, 10, 10], depth=2, memCap_byte=100)
+        self.assertEqual(sorted(myReader.output_l), list(range(4)))
+        # --- (with any other input, 210 bytes would be held)
+        self.assertEqual(myReader.maxHeldSize_byte, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
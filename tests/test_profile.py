@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# test_profile.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the stage profiler (imdABCDJprofile) and of its hook in peeTimbreToolbox
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import json
+import sys
+import subprocess
+import unittest
+
+import imdtest
+import imdABCDJprofile
+import imdABCDJhardfeatures
+
+
+class C_testProfile(imdtest.C_testCase):
+
+    def test_disabledAfterFailure(self):
+        """ a failed job does not leave its profiler enabled (its records would go to the next job) """
+        audioFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        with self.assertRaises(Exception):
+            imdABCDJhardfeatures.F_computeOneFile(audioFileFull=audioFile, xmlFile=self.M_path('missing.xml'), jsonFile=self.M_path('a.json'),
+                                                  profileFile=self.M_path('a.profile.json'))
+        self.assertTrue(imdABCDJprofile.PROFILER is None)
+        self.assertFalse(os.path.exists(self.M_path('a.profile.json')))
+
+
+    def test_profile(self):
+        audioFile = imdtest.F_writeWav(self.M_path('a.wav'))
+        imdABCDJhardfeatures.F_computeOneFile(audioFileFull=audioFile, xmlFile=imdtest.XML_FILE, jsonFile=self.M_path('a.json'),
+                                              profileFile=self.M_path('a.profile.json'))
+        self.assertTrue(imdABCDJprofile.PROFILER is None)
+        with open(self.M_path('a.profile.json'), 'r') as fid:
+            stage_l = [stage_d['stage'] for stage_d in json.load(fid)['stage_l']]
+        # --- the stages of the TimbreToolbox are measured through its hook
+        self.assertTrue('ttb/TEE' in stage_l)
+        self.assertTrue('total' in stage_l)
+
+
+    def test_toolboxStandalone(self):
+        """ peeTimbreToolbox does not need imdABCDJprofile """
+        code = "import sys; sys.modules['imdABCDJprofile'] = None; import peeTimbreToolbox; print(peeTimbreToolbox.F_stage('x').__class__.__name__)"
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=imdtest.ROOT_DIR)
+        self.assertEqual(output.strip(), 'C_noStage')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# test_queue.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the shared-directory job queue (imdABCDJqueue): leases of paused workers
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import json
+import glob
+import time
+import signal
+import unittest
+import multiprocessing
+
+import imdtest
+import imdABCDJbatch
+import imdABCDJqueue
+
+
+def F_runJob(arg_t, input_d=None, jobSink=None):
+    """ stand-in F_runJob: tells it started, takes 2 s, writes the pid of its worker """
+    job_d, TMP_DIR, do_profile = arg_t
+    open(os.path.join(TMP_DIR, 'started-%d' % os.getpid()), 'w').close()
+    time.sleep(2.)
+    jobSink.M_write({'filepath': job_d['id'], 'pid': os.getpid()})
+    return {'id': job_d['id'], 'status': 'ok', 'error': '', 'pid': os.getpid(), 'time': 2.}
+
+
+class C_testQueue(imdtest.C_testCase):
+
+    def setUp(self):
+        imdtest.C_testCase.setUp(self)
+        self.F_runJob = imdABCDJbatch.F_runJob
+        # --- (inherited by the forked workers)
+        imdABCDJbatch.F_runJob = F_runJob
+
+
+    def tearDown(self):
+        imdABCDJbatch.F_runJob = self.F_runJob
+        imdtest.C_testCase.tearDown(self)
+
+
+    def M_worker(self):
+        process = multiprocessing.Process(target=imdABCDJqueue.F_work, args=(self.M_path('queue'), self.tmpDir),
+                                          kwargs={'sinkType': 'ndjson', 'sinkDir': self.M_path('out'), 'leaseTime': 1., 'pollTime': 0.2})
+        process.start()
+        return process
+
+
+    def test_expiredLease(self):
+        """ worker A is paused until its lease expires: worker B reclaims and computes the job, A drops its result """
+        imdABCDJqueue.F_push(self.M_path('queue'), [{'id': 'job', 'audioFileFull': self.M_path('a.wav')}])
+        workerA = self.M_worker()
+        while not os.path.exists(self.M_path('started-%d' % workerA.pid)):
+            time.sleep(0.05)
+        os.kill(workerA.pid, signal.SIGSTOP)
+        time.sleep(1.5)
+        workerB = self.M_worker()
+        while not os.path.exists(self.M_path('started-%d' % workerB.pid)):
+            time.sleep(0.05)
+        # --- A wakes up while B computes the job: its heartbeat and its completion find the lease gone
+        os.kill(workerA.pid, signal.SIGCONT)
+        workerA.join(30.)
+        workerB.join(30.)
+        self.assertEqual([workerA.exitcode, workerB.exitcode], [0, 0])
+
+        self.assertEqual(imdABCDJqueue.F_status(self.M_path('queue')), {'todo': 0, 'lease': 0, 'done': 1, 'failed': 0})
+        with open(glob.glob(self.M_path('queue/done/*.json'))[0], 'r') as fid:
+            jobFile_d = json.load(fid)
+        self.assertEqual(jobFile_d['status']['pid'], workerB.pid)
+        self.assertEqual(jobFile_d['attempt'], 2)
+        line_l = []
+        for shardFile in glob.glob(self.M_path('out/*.ndjson')):
+            with open(shardFile, 'r') as fid:
+                line_l += [json.loads(line) for line in fid]
+        self.assertEqual(line_l, [{'filepath': 'job', 'pid': workerB.pid}])
+
+
+if __name__ == '__main__':
+    unittest.main()
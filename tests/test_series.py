@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# test_series.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the store of time series (imdABCDJseries)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import json
+import unittest
+from collections import OrderedDict
+import numpy as np
+
+import imdtest
+import imdABCDJsink
+import imdABCDJseries
+import imdABCDJhardfeatures
+import peeTimbreToolbox
+
+
+def F_descHub(value):
+    return {'STFTmag': {'SpecCent': {'value': np.array([[value, value + 1.]])}}}
+
+
+class C_testSeries(imdtest.C_testCase):
+
+    def test_reaggregate(self):
+        """ features re-aggregated from the store within 1e-3 of those of the original time series (RMSEnv decimated) """
+        myAudio = imdABCDJhardfeatures.F_loadAudio(imdtest.F_writeWav(self.M_path('a.wav')))
+        descHub_d = peeTimbreToolbox.F_computeAllDescriptor(myAudio.data_v[0,:], myAudio.x_sr_hz, imdABCDJhardfeatures.TTB_PLAN_d)
+        feature_l = imdABCDJhardfeatures.TTB_FEATURE_l + ['TTM_Scp10', 'TTM_Scp90', 'TTM_Scmd', 'TTT_Enp50']
+        myResult = imdABCDJhardfeatures.F_computeTimbre(descHub_d, OrderedDict(), feature_l)
+
+        myStore = imdABCDJseries.C_seriesStore(self.M_path('series'))
+        myStore.M_write(descHub_d, 'a.wav')
+        myStore.M_close()
+        mySink = imdABCDJsink.C_bufferSink()
+        self.assertEqual(imdABCDJseries.F_reaggregate(self.M_path('series'), feature_l, mySink), 1)
+        storeResult = mySink.result_l[0][0]
+        for nom in feature_l:
+            self.assertLessEqual(abs(storeResult[nom] - myResult[nom]), 1e-3 * abs(myResult[nom]), nom)
+
+
+    def test_lastWrite(self):
+        """ a track written twice is read from its last write """
+        myStore = imdABCDJseries.C_seriesStore(self.M_path('series'))
+        myStore.M_write(F_descHub(1.), 'a.wav')
+        myStore.M_write(F_descHub(5.), 'a.wav', (1., 2.))
+        myStore.M_close()
+        record_d = myStore.M_records()
+        self.assertEqual(list(record_d.keys()), ['a.wav'])
+        self.assertEqual(record_d['a.wav']['window_t'], [1., 2.])
+        self.assertEqual(myStore.M_descHub(record_d['a.wav'])['STFTmag']['SpecCent']['value'].tolist(), [[5., 6.]])
+
+
+    def test_partialLine(self):
+        """ the last line of a process which is still writing (no trailing newline) is ignored """
+        myStore = imdABCDJseries.C_seriesStore(self.M_path('series'))
+        myStore.M_write(F_descHub(1.), 'a.wav')
+        myStore.M_close()
+        with open(myStore.prefix + '.ndjson', 'a') as fid:
+            fid.write(json.dumps({'filepath': 'b.wav', 'window_t': [-1., -1.], 'series_l': []}))
+        self.assertEqual(list(myStore.M_records().keys()), ['a.wav'])
+
+
+if __name__ == '__main__':
+    unittest.main()
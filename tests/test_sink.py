@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# test_sink.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the result sinks (imdABCDJsink)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import os
+import sys
+import time
+import signal
+import subprocess
+import unittest
+import numpy as np
+
+import imdtest
+import imdABCDJsink
+import imdABCDJhardfeatures
+
+
+def F_result(num, **tag_d):
+    myResult = {'filepath': 'track%d.wav' % num, 'ICB_BPM_Mean': 100. + num, 'Chords_Func': float(num)}
+    myResult.update(tag_d)
+    return myResult
+
+
+class C_testColumnarSink(imdtest.C_testCase):
+
+    def test_flushByAge(self):
+        """ the rows kept in memory are written maxAge_sec after the first one, without another write """
+        mySink = imdABCDJsink.C_columnarSink(self.tmpDir, column_l=imdABCDJhardfeatures.HARD_FEATURE_l, maxAge_sec=0.2)
+        mySink.M_write(F_result(0))
+        time.sleep(1.)
+        data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(self.tmpDir)
+        self.assertEqual(data_m.shape[0], 1)
+        self.assertEqual(row_l, [{'filepath': 'track0.wav'}])
+        mySink.M_close()
+
+
+    def test_fixedColumn(self):
+        """ all the chunks have the columns of the feature list (then the tags of the first row) """
+        mySink = imdABCDJsink.C_columnarSink(self.tmpDir, maxRow=2, column_l=imdABCDJhardfeatures.HARD_FEATURE_l)
+        for num in range(0, 5):
+            mySink.M_write(F_result(num, **{'genre-pop': 0.5}))
+        mySink.M_close()
+        data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(self.tmpDir)
+        self.assertEqual(column_l, imdABCDJhardfeatures.HARD_FEATURE_l + ['genre-pop'])
+        self.assertEqual(data_m.shape, (5, len(column_l)))
+        self.assertEqual(list(data_m[:, column_l.index('ICB_BPM_Mean')]), [100., 101., 102., 103., 104.])
+        self.assertTrue(np.all(np.isnan(data_m[:, column_l.index('ICB_BPM_SD')])))
+
+
+    def test_degradedFirstRow(self):
+        """ the features degraded in the first row (None) are columns, NaN in this row """
+        for column_l in [[], imdABCDJhardfeatures.HARD_FEATURE_l]:
+            outDir = self.M_path('out%d' % len(column_l))
+            mySink = imdABCDJsink.C_columnarSink(outDir, column_l=column_l)
+            mySink.M_write(dict(F_result(0), Chords_Func=None, degradation={'Chords_Func': 'skipped'}))
+            mySink.M_write(F_result(1))
+            mySink.M_close()
+            data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(outDir)
+            self.assertTrue(np.isnan(data_m[0, column_l.index('Chords_Func')]))
+            self.assertEqual(data_m[1, column_l.index('Chords_Func')], 1.)
+            self.assertEqual(row_l, [{'filepath': 'track0.wav', 'degradation': {'Chords_Func': 'skipped'}}, {'filepath': 'track1.wav'}])
+
+
+    def test_flushOnTerminate(self):
+        """ a worker terminated by SIGTERM writes the rows kept in memory """
+        code = ("import sys; sys.path.insert(0, %r); import imdABCDJbatch; "
+                "imdABCDJbatch.F_initWorker(sinkType='columnar', sinkDir=%r); "
+                "imdABCDJbatch.mySink.M_write({'filepath': 'a.wav', 'ICB_BPM_Mean': 120.}); "
+                "sys.stdout.write('ready\\n'); sys.stdout.flush(); "
+                "import time; time.sleep(60)") % (imdtest.ROOT_DIR, self.tmpDir)
+        process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE)
+        self.assertEqual(process.stdout.readline(), 'ready\n')
+        os.kill(process.pid, signal.SIGTERM)
+        self.assertEqual(process.wait(), 128 + signal.SIGTERM)
+        data_m, column_l, row_l = imdABCDJsink.F_loadColumnar(self.tmpDir)
+        self.assertEqual(data_m.shape[0], 1)
+        self.assertEqual(data_m[0, column_l.index('ICB_BPM_Mean')], 120.)
+
+
+if __name__ == '__main__':
+    unittest.main()
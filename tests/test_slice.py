@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# test_slice.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+"""
+    Tests of the slicing of the frame-level results of a full track (imdABCDJhardfeatures.C_trackFrame, sliceExtract)
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import json
+import unittest
+import numpy as np
+from collections import OrderedDict
+
+import imdtest
+import imdABCDJhardfeatures
+import peeTimbreToolbox
+
+
+class C_testSlice(imdtest.C_testCase):
+
+    myTrackFrame = None
+
+    def setUp(self):
+        imdtest.C_testCase.setUp(self)
+        myAudio = imdABCDJhardfeatures.F_loadAudio(imdtest.F_writeWav(self.M_path('a.wav'), duration_sec=3.))
+        self.myTrackFrame = imdABCDJhardfeatures.C_trackFrame(myAudio, imdABCDJhardfeatures.config_s)
+
+
+    def M_timbre(self, descHub_d):
+        myResult = imdABCDJhardfeatures.F_computeTimbre(descHub_d, OrderedDict())
+        # --- the features are numbers (json)
+        return json.loads(json.dumps(myResult))
+
+
+    def test_openEnded(self):
+        """ stop_sec < 0: until the end of the track """
+        hpss_t, descHub_d = self.myTrackFrame.M_slice(1., -1.)
+        endHpss_t, endDescHub_d = self.myTrackFrame.M_slice(1., 100.)
+        self.assertEqual(hpss_t, endHpss_t)
+        self.assertEqual(self.M_timbre(descHub_d), self.M_timbre(endDescHub_d))
+        self.assertTrue(descHub_d['STFTmag']['SpecCent']['value'].shape[1] > 1)
+
+
+    def test_oneFrame(self):
+        """ a slice shorter than a frame has one frame: std/iqr are 0, the other statistics are its values """
+        hpss_t, descHub_d = self.myTrackFrame.M_slice(1., 1.)
+        self.assertEqual(descHub_d['STFTmag']['SpecCent']['value'].shape[1], 1)
+        myResult = self.M_timbre(descHub_d)
+        self.assertEqual(sorted(myResult.keys()), sorted(imdABCDJhardfeatures.TTB_FEATURE_l))
+        for nom, value in myResult.items():
+            self.assertTrue(isinstance(value, float) and np.isfinite(value), nom)
+            if imdABCDJhardfeatures.F_timbreAddress(nom)[2] in ['std', 'iqr']:
+                self.assertEqual(value, 0.)
+
+
+    def test_crestOneFrame(self):
+        """ the crest of a single frame is undefined: the feature is None """
+        descHub_d = {'STFTmag': {'SpecCent': {'value': np.array([[3.]])}}}
+        myResult = imdABCDJhardfeatures.F_computeTimbre(descHub_d, OrderedDict(), ['TTM_Sccr', 'TTM_Scmd'])
+        self.assertEqual(myResult, OrderedDict([('TTM_Sccr', None), ('TTM_Scmd', 3.)]))
+
+
+    def test_statisticOneFrame(self):
+        value_m = np.array([[1.], [2.]])
+        self.assertEqual(list(peeTimbreToolbox.F_computeStatistic(value_m, 'std')), [0., 0.])
+        self.assertEqual(list(peeTimbreToolbox.F_computeStatistic(value_m, 'median')), [1., 2.])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# test_xml.py
+#
+# Copyright (c) 2026 agent <agent@local>
+
+# This file is part of ircamABCDJhardfeatures.
+
+# ircamABCDJhardfeatures is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# ircamABCDJhardfeatures is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with ircamABCDJhardfeatures.  If not, see <http://www.gnu.org/licenses/>.
+
+# Author: agent <agent@local>
+
+
+"""
+    Tests of the streaming reader of the imdABCDJ XML file (imdABCDJxml) against xmltodict
+
+:author: agent@local
+:version: 1.0
+:last-edit: 2026/10/18
+"""
+
+import unittest
+
+import imdtest
+import imdABCDJxml
+
+try:
+    import xmltodict
+except ImportError:
+    xmltodict = None
+
+
+def F_list(node):
+    """
+        A node of xmltodict as a list (a single child is not in a list)
+    """
+
+    if node is None:
+        return []
+    if isinstance(node, list):
+        return node
+    return [node]
+
+
+@unittest.skipIf(xmltodict is None, 'xmltodict is not installed')
+class C_testXml(unittest.TestCase):
+
+    def setUp(self):
+        with open(imdtest.XML_FILE, 'rb') as fid:
+            self.doc_d = xmltodict.parse(fid.read())['musicdescription']
+        self.myDescription = imdABCDJxml.F_parseXml(imdtest.XML_FILE)
+
+
+    def test_global(self):
+        """ length, sampling rate, rhythm and harmonic nodes, low-level vectors and tags """
+        global_d = self.doc_d['global']
+        self.assertEqual(self.myDescription.length_sec, float(global_d['@length']))
+        self.assertEqual(self.myDescription.samplingRate, float(global_d['@samplingrate']))
+        for node in ['rhythmtype', 'harmonictype']:
+            self.assertEqual(self.myDescription.global_d[node], dict(global_d[node]))
+
+        lowlevel_l = F_list(global_d['lowleveltype'])
+        self.assertEqual(len(self.myDescription.lowlevel_l), len(lowlevel_l))
+        for value_v, lowlevel in zip(self.myDescription.lowlevel_l, lowlevel_l):
+            self.assertEqual(value_v.tolist(), [float(value) for value in lowlevel['#text'].split(' ')])
+
+        # --- (the first tag of an (id, value) is used, as F_parseTag did)
+        tagtype_d = {}
+        for tagtype in F_list(global_d['tagtype']):
+            tagtype_d.setdefault((tagtype['@id'], tagtype['@value']), float(tagtype['@confidence']))
+        self.assertEqual(self.myDescription.tagtype_d, tagtype_d)
+
+
+    def test_descriptionDefinition(self):
+        """ ids and label names of the description definitions, in document order """
+        definition_l = [(definition['@id'], [label['@name'] for label in F_list(definition['dictionary']['label'])])
+                        for definition in F_list(self.doc_d['descriptiondefinition'])]
+        self.assertEqual(self.myDescription.descriptionDefinition_l, definition_l)
+
+
+    def test_segment(self):
+        """ time, length and value of the segments of each type """
+        segment_l = F_list(self.doc_d['segment'])
+        for segmentType in ['chordtype', 'structtype']:
+            seg_l = [seg for seg in segment_l if segmentType in seg]
+            self.assertGreater(len(seg_l), 0)
+            mySegment = self.myDescription.M_segment(segmentType)
+            self.assertEqual(mySegment['time_v'].tolist(), [float(seg['@time']) for seg in seg_l])
+            self.assertEqual(mySegment['length_v'].tolist(), [float(seg['@length']) for seg in seg_l])
+            self.assertEqual(mySegment['value_l'], [seg[segmentType]['@value'] for seg in seg_l])
+
+
+if __name__ == '__main__':
+    unittest.main()